@@ -0,0 +1,197 @@
+"""
+Streamlit arayüzünün kullandığı API istemcisi.
+
+Tek bir `requests.Session` bağlantı havuzuyla paylaşılır; her istekte
+bağlantı ve okuma zaman aşımı uygulanır, bağlantı hataları ile 502/503/504
+yanıtları (Retry-After başlığına uyularak) yeniden denenir. Aynı içerik
+sunucuda sha256 özetiyle tekilleştirildiğinden yükleme isteğinin yeniden
+denenmesi ikinci bir iş açmaz. Modül Streamlit'e bağlı değildir.
+"""
+from app.config import API_URL, API_CONNECT_TIMEOUT, API_READ_TIMEOUT, API_MAX_RETRIES, UI_UPLOAD_WORKERS
+from app.job_status import COMPLETED, FAILED
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+from urllib3.util.retry import Retry
+import hashlib
+import requests
+import time
+
+# Yeniden denenen geçici hata kodları
+RETRY_STATUSES = (502, 503, 504)
+
+
+class APIError(Exception):
+    """API hata döndürdüğünde veya ulaşılamadığında fırlatılır."""
+
+    def __init__(self, detail: str, status_code: Optional[int] = None):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class UploadResult(NamedTuple):
+    filename: str
+    content_hash: str
+    status: Optional[str] = None
+    message: str = ""
+    job: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+def content_hash(content: bytes) -> str:
+    """Dosya içeriğinin sunucunun tekilleştirmede kullandığı sha256 özeti."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class APIClient:
+    def __init__(
+        self,
+        base_url: str = API_URL,
+        timeout: Tuple[float, float] = (API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
+        retries: int = API_MAX_RETRIES,
+        backoff_factor: float = 0.5,
+        pool_size: int = UI_UPLOAD_WORKERS
+    ):
+        """
+        Args:
+            base_url (str): API adresi
+            timeout (Tuple[float, float]): (bağlantı, okuma) zaman aşımı, saniye
+            retries (int): Geçici hatalarda en fazla yeniden deneme sayısı
+            backoff_factor (float): Denemeler arası üstel bekleme katsayısı
+            pool_size (int): Havuzda tutulacak en fazla bağlantı (eşzamanlı yükleme sayısından az olmamalı)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            # Son deneme de başarısızsa yanıt döner; hata ayrıntısı APIError'a taşınır
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1), max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise APIError(f"Bağlantı hatası: {e}") from e
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise APIError(str(detail) or "Bilinmeyen bir hata oluştu.", response.status_code)
+        return response
+
+    def upload(self, filename: str, content: bytes, content_type: str = "text/plain") -> Dict[str, Any]:
+        """
+        Dökümanı yükler.
+
+        Returns:
+            Dict[str, Any]: Sunucu yanıtı; status "unchanged" ise içerik zaten güncel, aksi halde job_id içerir
+        """
+        response = self._request("POST", "/documents/upload", files={"file": (filename, content, content_type)})
+        return response.json()
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/documents/jobs/{job_id}").json()
+
+    def wait_for_job(self, job_id: str, timeout: float = 300, interval: float = 0.5) -> Dict[str, Any]:
+        """
+        Yükleme işi tamamlanana veya başarısız olana kadar durumunu sorgular.
+
+        Raises:
+            APIError: İş süresinde bitmezse
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.job(job_id)
+            if job["status"] in (COMPLETED, FAILED):
+                return job
+            if time.monotonic() >= deadline:
+                raise APIError(f"İş {timeout:g} saniyede tamamlanmadı: {job_id}")
+            time.sleep(interval)
+
+    def upload_and_wait(
+        self, filename: str, content: bytes, content_type: str = "text/plain", timeout: float = 300
+    ) -> UploadResult:
+        """Dosyayı yükler ve iş varsa bitmesini bekler; hatalar sonuç içinde döner."""
+        digest = content_hash(content)
+        try:
+            body = self.upload(filename, content, content_type)
+            job = self.wait_for_job(body["job_id"], timeout) if "job_id" in body else None
+        except APIError as e:
+            return UploadResult(filename, digest, error=e.detail)
+        if job is None:
+            return UploadResult(filename, digest, body["status"], body["message"])
+        return UploadResult(filename, digest, job["status"], body["message"], job, job.get("error"))
+
+    def upload_many(
+        self,
+        files: Iterable[Tuple[str, bytes, str]],
+        max_workers: int = UI_UPLOAD_WORKERS,
+        timeout: float = 300
+    ) -> Iterator[UploadResult]:
+        """
+        Dosyaları eşzamanlı yükler; sonuçları biten sırayla üretir.
+
+        Args:
+            files (Iterable[Tuple[str, bytes, str]]): (dosya adı, içerik, içerik tipi) üçlüleri
+            max_workers (int): Aynı anda yüklenecek en fazla dosya
+            timeout (float): Her işin tamamlanması için beklenecek en uzun süre (saniye)
+        """
+        files = list(files)
+        if not files:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as executor:
+            futures = [executor.submit(self.upload_and_wait, *item, timeout=timeout) for item in files]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        include: Sequence[str] = ("content", "metadata"),
+        metadata_fields: Optional[Sequence[str]] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Vektör araması yapar.
+
+        Returns:
+            Tuple[Dict[str, Any], bool]: (yanıt gövdesi, sunucu önbelleğinden gelip gelmediği)
+        """
+        payload = {"query": query, "top_k": top_k, "include": list(include)}
+        if metadata_fields is not None:
+            payload["metadata_fields"] = list(metadata_fields)
+        if cursor is not None:
+            payload["cursor"] = cursor
+        response = self._request("POST", "/vector/search", json=payload)
+        return response.json(), response.headers.get("X-Cache") == "HIT"
+
+    def keywords(self, text: str, num_keywords: int = 5, mode: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Anahtar kelime çıkarır.
+
+        Returns:
+            Tuple[Dict[str, Any], bool]: (yanıt gövdesi, sunucu önbelleğinden gelip gelmediği)
+        """
+        payload = {"text": text, "num_keywords": num_keywords}
+        if mode is not None:
+            payload["mode"] = mode
+        response = self._request("POST", "/keywords", json=payload)
+        return response.json(), response.headers.get("X-Cache") == "HIT"
+
+    def solve(self, operation: str) -> Dict[str, Any]:
+        return self._request("POST", "/math/solve", json={"operation": operation}).json()
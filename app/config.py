@@ -0,0 +1,138 @@
+"""
+Uygulama ayarları.
+
+Tüm ayarlar ortam değişkenlerinden (veya .env dosyasından) okunur.
+"""
+import os
+from dotenv import load_dotenv
+
+# .env dosyasını yükle
+load_dotenv()
+
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Matematik motoru: trigonometrik fonksiyonlar için açı birimi ("degrees" veya "radians")
+MATH_ANGLE_MODE = os.getenv("MATH_ANGLE_MODE", "degrees")
+# /math/solve/batch sınırları: ifade sayısı, değişken başına değer ve toplam sonuç sayısı
+MATH_BATCH_MAX_EXPRESSIONS = int(os.getenv("MATH_BATCH_MAX_EXPRESSIONS", "50"))
+MATH_BATCH_MAX_VALUES = int(os.getenv("MATH_BATCH_MAX_VALUES", "10000"))
+MATH_BATCH_MAX_RESULTS = int(os.getenv("MATH_BATCH_MAX_RESULTS", "100000"))
+
+# LLM ayarları
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-pro")
+# "gemini" veya çevrimdışı testler için "fake"
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# Model başına aynı anda yürütülebilecek en fazla LLM çağrısı
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Aynı anda gelen özdeş LLM isteklerini tek çağrıda birleştir
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+# Dakikalık çağrı kotası (0: sınırsız) ve ani yük payı (token bucket kapasitesi)
+LLM_RATE_LIMIT_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", "60"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "20"))
+# Bekleyebilecek en fazla çağrı ve kuyrukta en fazla bekleme süresi (saniye)
+LLM_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_SIZE", "100"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+# Deneme başına zaman aşımı (saniye) ve geçici hatalarda yeniden deneme
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+# Devre kesici: art arda hata eşiği ve açık kalma süresi (saniye)
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# Soru-cevap (/ask): getirilecek parça sayısı ve bağlam için token bütçesi
+ASK_TOP_K = int(os.getenv("ASK_TOP_K", "8"))
+ASK_CONTEXT_TOKENS = int(os.getenv("ASK_CONTEXT_TOKENS", "2000"))
+# Token tahmini için ortalama karakter/token oranı
+ASK_CHARS_PER_TOKEN = float(os.getenv("ASK_CHARS_PER_TOKEN", "4"))
+# Örtüşen parçaları birleştirmek için gereken en kısa ortak metin (karakter)
+ASK_MIN_OVERLAP = int(os.getenv("ASK_MIN_OVERLAP", "20"))
+
+# Yanıt önbelleği (REDIS_URL yoksa süreç içi LRU kullanılır)
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+# Embedding modeli ve vektör veritabanı
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+CHROMA_PERSIST_DIRECTORY = os.getenv("CHROMA_PERSIST_DIRECTORY", "chroma_db")
+
+# Embedding önbelleği (boş bırakılırsa yalnızca bellek katmanı kullanılır)
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join(CHROMA_PERSIST_DIRECTORY, "embedding_cache.sqlite3")
+) or None
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+# Döküman yükleme kuyruğu
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "16"))
+# Bellekte tutulacak en fazla iş kaydı
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "1000"))
+# Vektör veritabanına tek seferde yazılacak parça sayısı
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Parça uzunluğu ve ardışık parçalar arasındaki örtüşme (karakter)
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+# Sorgu embedding mikro-toplama penceresi
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+
+# Büyük PDF'ler için süreç havuzu ile paralel sayfa çıkarma
+PDF_PARALLEL_THRESHOLD = int(os.getenv("PDF_PARALLEL_THRESHOLD", "50"))
+PDF_PROCESS_WORKERS = int(os.getenv("PDF_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+# /vector/search/batch isteğindeki en fazla sorgu
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "100"))
+# include=["snippet"] için varsayılan alıntı uzunluğu (karakter)
+SEARCH_SNIPPET_LENGTH = int(os.getenv("SEARCH_SNIPPET_LENGTH", "240"))
+# Cursor ile sayfalanabilecek en derin sonuç sırası
+SEARCH_MAX_DEPTH = int(os.getenv("SEARCH_MAX_DEPTH", "1000"))
+
+# Kaynak filtresi bu sayıdan az parçaya iniyorsa adaylar yerel olarak tam skorlanır
+LOCAL_FILTER_MAX_CANDIDATES = int(os.getenv("LOCAL_FILTER_MAX_CANDIDATES", "5000"))
+
+# Sözcük tabanlı (BM25) arama indeksi (boş bırakılırsa bellekte tutulur)
+BM25_INDEX_PATH = os.getenv(
+    "BM25_INDEX_PATH", os.path.join(CHROMA_PERSIST_DIRECTORY, "bm25.sqlite3")
+) or None
+# Kaynak başına son işlenen içerik özeti (boş bırakılırsa bellekte tutulur)
+SOURCE_VERSIONS_PATH = os.getenv(
+    "SOURCE_VERSIONS_PATH", os.path.join(CHROMA_PERSIST_DIRECTORY, "sources.sqlite3")
+) or None
+# Hibrit aramada her yoldan alınan en az aday sayısı ve RRF sabiti
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Vektör deposu: chroma veya numpy (bellek eşlemeli tam arama)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", os.path.join(CHROMA_PERSIST_DIRECTORY, "vectors"))
+# numpy deposunda saklama tipi: float32, float16 veya int8
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float32")
+
+# Embedding arka ucu: huggingface (PyTorch), onnx (ONNX Runtime, CPU) veya çevrimdışı ölçümler için fake
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")
+# fake arka ucunun (kelime karması) vektör boyutu
+FAKE_EMBEDDING_DIMENSION = int(os.getenv("FAKE_EMBEDDING_DIMENSION", "384"))
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("models", "onnx"))
+# int8 dinamik nicemlenmiş modeli kullan
+ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "true").lower() == "true"
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", str(os.cpu_count() or 1)))
+ONNX_BATCH_SIZE = int(os.getenv("ONNX_BATCH_SIZE", "32"))
+ONNX_MAX_LENGTH = int(os.getenv("ONNX_MAX_LENGTH", "128"))
+
+# Yerel anahtar kelime çıkarıcı: en uzun ifade ve auto modunda LLM'e düşmeden önce gereken en az kelime
+KEYWORD_MAX_NGRAM = int(os.getenv("KEYWORD_MAX_NGRAM", "3"))
+KEYWORD_AUTO_MIN_WORDS = int(os.getenv("KEYWORD_AUTO_MIN_WORDS", "30"))
+
+# Streamlit arayüzünün API istemcisi: adres, bağlantı/okuma zaman aşımı (saniye) ve geçici hatalarda yeniden deneme
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "60"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+# Aynı anda yüklenecek en fazla dosya ve arayüzde arama/anahtar kelime sonuçlarının saklanma süresi (saniye)
+UI_UPLOAD_WORKERS = int(os.getenv("UI_UPLOAD_WORKERS", "4"))
+UI_CACHE_TTL_SECONDS = int(os.getenv("UI_CACHE_TTL_SECONDS", "300"))
@@ -0,0 +1,413 @@
+"""
+Disk üzerinde, artımlı güncellenen BM25 ters indeksi.
+
+Her terimin posting listesi SQLite'ta iki sıkı dizi olarak tutulur:
+uint32 döküman numaraları ve uint16 terim frekansları. Listeler
+segmentlere bölünür: her ekleme yeni bir segment yazar, mevcut posting'ler
+okunup yeniden yazılmaz. Aynı büyüklük basamağında biriken segmentler
+birleştirilir (log-structured merge); böylece segment sayısı ve bir
+posting'in yeniden yazılma sayısı logaritmik kalır. Silinen
+parçalar işaretlenir; silinen oranı eşiği aştığında tüm segmentler tek
+segmentte sıkıştırılır. Sorgular NumPy ile vektörize skorlanır.
+"""
+from app.config import BM25_INDEX_PATH
+from app.database.ranking import smallest_k
+from collections import Counter, defaultdict
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+# Parça numaraları ve kimlikleri ile birlikte "AB-1234", "v1.2" gibi tanımlayıcıları tek terim tut
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
+# Silinmiş parça oranı bu değeri aşınca indeks sıkıştırılır
+COMPACT_RATIO = 0.3
+
+# SQLite parametre sınırı için parça boyutu
+_SQL_CHUNK = 500
+# Birleştirilmeden önce aynı basamakta biriken segment sayısı
+MERGE_FACTOR = 10
+
+_DOC_DTYPE = np.dtype("<u4")
+_FREQ_DTYPE = np.dtype("<u2")
+
+
+def fold_case(text: str) -> str:
+    """Türkçe büyük/küçük harf kurallarıyla küçültür (I -> ı, İ -> i)."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Türkçe büyük/küçük harf kurallarıyla küçültüp terimlere ayırır."""
+    return TOKEN_PATTERN.findall(fold_case(text))
+
+
+def _level(size: int) -> int:
+    """Segmentin büyüklük basamağı (MERGE_FACTOR tabanında)."""
+    level = 0
+    while size >= MERGE_FACTOR:
+        size //= MERGE_FACTOR
+        level += 1
+    return level
+
+
+def _chunks(items: List, size: int = _SQL_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BM25Index:
+    def __init__(self, path: Optional[str] = BM25_INDEX_PATH, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            path (str): SQLite dosyası; None ise bellekte tutulur
+            k1 (float): Terim frekansı doygunluk parametresi
+            b (float): Uzunluk normalizasyonu parametresi
+        """
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                num INTEGER PRIMARY KEY,
+                chunk_id TEXT UNIQUE NOT NULL,
+                length INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._create_postings()
+        self._load_stats()
+
+    def _create_postings(self) -> None:
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(postings)")]
+        # Segmentsiz eski biçim: tüm posting'ler tek segment olarak taşınır
+        legacy = bool(columns) and "segment" not in columns
+        with self._conn:
+            if legacy:
+                self._conn.execute("ALTER TABLE postings RENAME TO postings_old")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    segment INTEGER NOT NULL,
+                    docs BLOB NOT NULL,
+                    freqs BLOB NOT NULL,
+                    PRIMARY KEY (term, segment)
+                );
+                CREATE INDEX IF NOT EXISTS postings_segment ON postings (segment);
+                CREATE TABLE IF NOT EXISTS segments (
+                    segment INTEGER PRIMARY KEY,
+                    size INTEGER NOT NULL
+                );
+            """)
+            if legacy:
+                self._conn.execute("INSERT INTO postings SELECT term, 0, docs, freqs FROM postings_old")
+                self._conn.execute("INSERT INTO segments SELECT 0, COUNT(*) FROM docs")
+                self._conn.execute("DROP TABLE postings_old")
+        # (segment, içerdiği parça sayısı) - eskiden yeniye
+        self._segments: List[Tuple[int, int]] = self._conn.execute(
+            "SELECT segment, size FROM segments ORDER BY segment"
+        ).fetchall()
+
+    def _load_stats(self) -> None:
+        # Döküman uzunlukları ve silinme bitmap'i numara ile indekslenir
+        size = (self._conn.execute("SELECT MAX(num) FROM docs").fetchone()[0] or 0) + 1
+        self._lengths = np.zeros(size, dtype=np.float32)
+        self._deleted = np.ones(size, dtype=bool)
+        for num, length, deleted in self._conn.execute("SELECT num, length, deleted FROM docs"):
+            self._lengths[num] = length
+            self._deleted[num] = bool(deleted)
+        live = ~self._deleted
+        self.live_count = int(live.sum())
+        self.total_length = float(self._lengths[live].sum())
+        self.deleted_count = int(self._conn.execute("SELECT COUNT(*) FROM docs WHERE deleted = 1").fetchone()[0])
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def _grow(self, size: int) -> None:
+        if size > len(self._lengths):
+            extra = size - len(self._lengths)
+            self._lengths = np.concatenate([self._lengths, np.zeros(extra, dtype=np.float32)])
+            self._deleted = np.concatenate([self._deleted, np.ones(extra, dtype=bool)])
+
+    def add(self, items: Iterable[Tuple[str, str]]) -> int:
+        """
+        Parçaları indekse ekler.
+
+        Args:
+            items (Iterable): (parça kimliği, metin) çiftleri
+
+        Returns:
+            int: Eklenen (veya silinmişken geri alınan) parça sayısı
+        """
+        items = list(items)
+        if not items:
+            return 0
+        pending = defaultdict(lambda: ([], []))
+        added = 0
+        new_docs = 0
+
+        with self._lock, self._conn:
+            known = {}
+            for part in _chunks([chunk_id for chunk_id, _ in items]):
+                rows = self._conn.execute(
+                    f"SELECT chunk_id, num, deleted FROM docs WHERE chunk_id IN ({','.join('?' * len(part))})",
+                    part
+                )
+                known.update({chunk_id: (num, deleted) for chunk_id, num, deleted in rows})
+
+            for chunk_id, text in items:
+                if chunk_id in known:
+                    num, deleted = known[chunk_id]
+                    if deleted:
+                        # Kimlik içerikten türetildiği için posting'ler hâlâ geçerli
+                        self._conn.execute("UPDATE docs SET deleted = 0 WHERE num = ?", (num,))
+                        self._deleted[num] = False
+                        self.live_count += 1
+                        self.deleted_count -= 1
+                        self.total_length += float(self._lengths[num])
+                        added += 1
+                    continue
+
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                num = self._conn.execute(
+                    "INSERT INTO docs (chunk_id, length) VALUES (?, ?)", (chunk_id, length)
+                ).lastrowid
+                known[chunk_id] = (num, 0)
+                self._grow(num + 1)
+                self._lengths[num] = length
+                self._deleted[num] = False
+                self.live_count += 1
+                self.total_length += length
+                added += 1
+                new_docs += 1
+                for term, freq in counts.items():
+                    docs, freqs = pending[term]
+                    docs.append(num)
+                    freqs.append(min(freq, 65535))
+
+            if pending:
+                self._write_segment(pending, new_docs)
+        return added
+
+    def _write_segment(self, pending: Dict[str, Tuple[List[int], List[int]]], size: int) -> None:
+        """Yeni posting'leri tek segment olarak ekler, ardından gerekirse son segmentleri birleştirir."""
+        segment = self._segments[-1][0] + 1 if self._segments else 1
+        self._conn.executemany(
+            "INSERT INTO postings (term, segment, docs, freqs) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    term,
+                    segment,
+                    np.asarray(docs, dtype=_DOC_DTYPE).tobytes(),
+                    np.asarray(freqs, dtype=_FREQ_DTYPE).tobytes(),
+                )
+                for term, (docs, freqs) in pending.items()
+            ]
+        )
+        self._conn.execute("INSERT INTO segments (segment, size) VALUES (?, ?)", (segment, size))
+        self._segments.append((segment, size))
+
+        # Aynı büyüklük basamağındaki son MERGE_FACTOR segment birleşir; her posting en çok
+        # log_MERGE_FACTOR(n) kez yeniden yazılır, terim başına segment sayısı da logaritmik kalır
+        while len(self._segments) >= MERGE_FACTOR:
+            tail = self._segments[-MERGE_FACTOR:]
+            if len({_level(size) for _, size in tail}) > 1:
+                break
+            self._merge([segment for segment, _ in tail])
+
+    def _merge(self, segments: List[int], drop_deleted: bool = False) -> None:
+        """
+        Segmentleri, en yenisinin numarasıyla tek segmentte birleştirir.
+
+        Args:
+            segments (List[int]): Birleştirilecek segmentler (eskiden yeniye)
+            drop_deleted (bool): Silinmiş parçaların posting'leri atılsın mı (yalnızca sıkıştırmada;
+                silinen kimlik yeniden eklendiğinde posting'leri yeniden kullanılır)
+        """
+        target = segments[-1]
+        placeholders = ",".join("?" * len(segments))
+        rows = self._conn.execute(
+            f"SELECT term, docs, freqs FROM postings WHERE segment IN ({placeholders}) ORDER BY term, segment",
+            segments
+        )
+        rewrites = []
+        for term, group in groupby(rows, key=lambda row: row[0]):
+            group = list(group)
+            docs = b"".join(docs for _, docs, _ in group)
+            freqs = b"".join(freqs for _, _, freqs in group)
+            if drop_deleted:
+                doc_array = np.frombuffer(docs, dtype=_DOC_DTYPE)
+                keep = ~self._deleted[doc_array]
+                if not keep.any():
+                    continue
+                docs = doc_array[keep].tobytes()
+                freqs = np.frombuffer(freqs, dtype=_FREQ_DTYPE)[keep].tobytes()
+            rewrites.append((term, target, docs, freqs))
+
+        self._conn.execute(f"DELETE FROM postings WHERE segment IN ({placeholders})", segments)
+        self._conn.executemany("INSERT INTO postings (term, segment, docs, freqs) VALUES (?, ?, ?, ?)", rewrites)
+        size = sum(size for segment, size in self._segments if segment in segments)
+        self._conn.execute(f"DELETE FROM segments WHERE segment IN ({placeholders})", segments)
+        self._conn.execute("INSERT INTO segments (segment, size) VALUES (?, ?)", (target, size))
+        self._segments = [item for item in self._segments if item[0] not in segments] + [(target, size)]
+        self._segments.sort()
+
+    def _term_postings(self, terms: List[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Terimlerin tüm segmentlerini birleştirip (döküman numaraları, frekanslar) döndürür."""
+        parts = defaultdict(lambda: ([], []))
+        for part in _chunks(terms):
+            for term, docs, freqs in self._conn.execute(
+                f"SELECT term, docs, freqs FROM postings WHERE term IN ({','.join('?' * len(part))})", part
+            ):
+                parts[term][0].append(docs)
+                parts[term][1].append(freqs)
+        return {
+            term: (
+                np.frombuffer(b"".join(docs), dtype=_DOC_DTYPE),
+                np.frombuffer(b"".join(freqs), dtype=_FREQ_DTYPE),
+            )
+            for term, (docs, freqs) in parts.items()
+        }
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        """Parçaları silinmiş olarak işaretler."""
+        chunk_ids = list(chunk_ids)
+        removed = 0
+        with self._lock, self._conn:
+            for part in _chunks(chunk_ids):
+                placeholders = ",".join("?" * len(part))
+                nums = [num for (num,) in self._conn.execute(
+                    f"SELECT num FROM docs WHERE deleted = 0 AND chunk_id IN ({placeholders})", part
+                )]
+                self._conn.execute(f"UPDATE docs SET deleted = 1 WHERE chunk_id IN ({placeholders})", part)
+                for num in nums:
+                    self._deleted[num] = True
+                    self.total_length -= float(self._lengths[num])
+                removed += len(nums)
+            self.live_count -= removed
+            self.deleted_count += removed
+        if self.deleted_count > COMPACT_RATIO * max(self.live_count + self.deleted_count, 1):
+            self.compact()
+        return removed
+
+    def compact(self) -> None:
+        """Silinmiş parçaları temizler ve tüm segmentleri tek segmentte birleştirir."""
+        with self._lock, self._conn:
+            if self._segments:
+                self._merge([segment for segment, _ in self._segments], drop_deleted=True)
+                # Birleşen segmentin boyutu artık yalnızca canlı parçalar
+                segment = self._segments[-1][0]
+                self._conn.execute("UPDATE segments SET size = ? WHERE segment = ?", (self.live_count, segment))
+                self._segments = [(segment, self.live_count)]
+            self._conn.execute("DELETE FROM docs WHERE deleted = 1")
+            self.deleted_count = 0
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        Sorgu için en yüksek BM25 skorlu parçaları döndürür.
+
+        Returns:
+            List[Tuple[str, float]]: (parça kimliği, skor) - azalan skor sırasıyla
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.live_count:
+            return []
+
+        with self._lock:
+            postings = self._term_postings(terms)
+            lengths, deleted = self._lengths, self._deleted
+            live_count, avgdl = self.live_count, self.total_length / self.live_count
+
+        all_docs, all_scores = [], []
+        for doc_array, freq_array in postings.values():
+            live = ~deleted[doc_array]
+            doc_array = doc_array[live]
+            if not len(doc_array):
+                continue
+            tf = freq_array[live].astype(np.float32)
+            df = len(doc_array)
+            idf = math.log(1 + (live_count - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_array] / avgdl)
+            all_docs.append(doc_array)
+            all_scores.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not all_docs:
+            return []
+        scores = np.bincount(
+            np.concatenate(all_docs), weights=np.concatenate(all_scores), minlength=len(lengths)
+        )
+        matched = np.flatnonzero(scores)
+        k = min(k, len(matched))
+        top = matched[smallest_k(-scores[matched], k, matched)]
+
+        with self._lock:
+            ids = dict(self._conn.execute(
+                f"SELECT num, chunk_id FROM docs WHERE num IN ({','.join('?' * len(top))})",
+                [int(num) for num in top]
+            ))
+        return [(ids[int(num)], float(scores[num])) for num in top]
+
+    def document_frequencies(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Terimlerin kaç canlı parçada geçtiğini döndürür."""
+        terms = list(dict.fromkeys(terms))
+        frequencies = dict.fromkeys(terms, 0)
+        with self._lock:
+            for part in _chunks(terms):
+                for term, docs in self._conn.execute(
+                    f"SELECT term, docs FROM postings WHERE term IN ({','.join('?' * len(part))})", part
+                ):
+                    # Terimin her segmenti ayrı satırdır
+                    frequencies[term] += int((~self._deleted[np.frombuffer(docs, dtype=_DOC_DTYPE)]).sum())
+        return frequencies
+
+    def sync(self, vectorstore, page_size: int = 5000) -> int:
+        """
+        İndeksi koleksiyonla eşitler (ilk açılışta veya eksik kayıtlarda).
+
+        Returns:
+            int: Eklenen parça sayısı
+        """
+        added, offset = 0, 0
+        while True:
+            found = vectorstore.get(include=["documents"], limit=page_size, offset=offset)
+            added += self.add(zip(found["ids"], found["documents"]))
+            if len(found["ids"]) < page_size:
+                break
+            offset += page_size
+        return added
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Birden çok sıralamayı Reciprocal Rank Fusion ile birleştirir.
+
+    Args:
+        rankings (List[List[str]]): Her biri en iyiden kötüye sıralı kimlik listesi
+        k (int): RRF sabiti
+
+    Returns:
+        List[Tuple[str, float]]: (kimlik, birleşik skor) - azalan skor sırasıyla
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
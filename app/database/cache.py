@@ -0,0 +1,199 @@
+"""
+Yanıt önbelleği.
+
+REDIS_URL tanımlıysa Redis, değilse (veya redis paketi kurulu değilse)
+süreç içi LRU önbellek kullanılır. Anahtarlar normalize edilmiş istek ve
+koleksiyon sürümünden türetilir; koleksiyon değiştiğinde sürüm artırılarak
+eski kayıtlar geçersiz kılınır.
+"""
+from app.config import REDIS_URL, REDIS_PASSWORD, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+import re
+import time
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # redis opsiyonel bir bağımlılıktır
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Önbellek durumunu bildiren başlık
+CACHE_HEADER = "X-Cache"
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+
+
+class LRUCacheBackend:
+    """Süreli kayıtlar tutan, boyutu sınırlı süreç içi önbellek."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._data: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires_at = self.clock() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        await self.set(key, str(value))
+        return value
+
+    async def close(self) -> None:
+        self._data.clear()
+
+
+class RedisCacheBackend:
+    """redis.asyncio üzerinde çalışan önbellek."""
+
+    def __init__(self, url: str, password: Optional[str] = None):
+        self.client = redis.from_url(url, password=password, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def normalize_text(text: str) -> str:
+    """Anahtar üretimi için boşlukları sadeleştirir."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: int = CACHE_TTL_SECONDS, prefix: str = "ai-tools"):
+        """
+        Args:
+            backend: LRUCacheBackend veya RedisCacheBackend
+            ttl (int): Kayıtların varsayılan yaşam süresi (saniye)
+            prefix (str): Tüm anahtarların ön eki
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = {CACHE_HIT: 0, CACHE_MISS: 0}
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self.prefix}:collection_version"
+
+    async def collection_version(self) -> int:
+        """Koleksiyonun güncel sürüm numarasını döndürür."""
+        try:
+            return int(await self.backend.get(self._version_key) or 0)
+        except Exception as e:
+            logger.warning("Önbellek sürümü okunamadı: %s", e)
+            return -1
+
+    async def invalidate_collection(self) -> Optional[int]:
+        """
+        Koleksiyona bağlı tüm kayıtları geçersiz kılar.
+
+        Returns:
+            Optional[int]: Yeni koleksiyon sürümü; önbellek erişilemezse None
+        """
+        try:
+            return int(await self.backend.incr(self._version_key))
+        except Exception as e:
+            logger.warning("Önbellek geçersiz kılınamadı: %s", e)
+            return None
+
+    async def make_key(self, namespace: str, payload: Dict[str, Any], versioned: bool = True) -> Optional[str]:
+        """
+        İstek için önbellek anahtarı üretir.
+
+        Args:
+            namespace (str): Uç nokta adı (örn: "search")
+            payload (dict): Normalize edilmiş istek alanları
+            versioned (bool): Anahtar koleksiyon sürümüne bağlı mı
+
+        Returns:
+            Optional[str]: Anahtar; önbellek erişilemezse None
+        """
+        version = await self.collection_version() if versioned else 0
+        if version < 0:
+            return None
+        body = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{namespace}:v{version}:{digest}"
+
+    async def get(self, key: Optional[str]) -> Optional[Any]:
+        value = None
+        if key is not None:
+            try:
+                value = await self.backend.get(key)
+            except Exception as e:
+                logger.warning("Önbellekten okunamadı: %s", e)
+        self.stats[CACHE_MISS if value is None else CACHE_HIT] += 1
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: Optional[str], value: Any, ttl: Optional[int] = None) -> None:
+        if key is None:
+            return
+        try:
+            await self.backend.set(key, json.dumps(value, ensure_ascii=False), ttl or self.ttl)
+        except Exception as e:
+            logger.warning("Önbelleğe yazılamadı: %s", e)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_backend():
+    """Ayarlara göre önbellek backend'i oluşturur."""
+    if REDIS_URL and redis is not None:
+        return RedisCacheBackend(REDIS_URL, REDIS_PASSWORD)
+    if REDIS_URL:
+        logger.warning("redis paketi kurulu değil, süreç içi önbellek kullanılıyor")
+    return LRUCacheBackend()
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def init_cache(backend=None, **kwargs) -> ResponseCache:
+    """Süreç geneli önbelleği (yeniden) oluşturur."""
+    global _cache
+    _cache = ResponseCache(backend or create_backend(), **kwargs)
+    return _cache
+
+
+def get_cache() -> ResponseCache:
+    """Süreç geneli önbelleği döndürür; henüz yoksa oluşturur."""
+    if _cache is None:
+        return init_cache()
+    return _cache
+
+
+async def close_cache() -> None:
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
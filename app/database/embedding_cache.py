@@ -0,0 +1,181 @@
+"""
+İçerik adresli embedding önbelleği.
+
+Vektörler model adı + metin özetine (sha256) göre saklanır. İki katman
+vardır: boyutu sınırlı bellek içi LRU ve vektörleri float32 blob olarak
+tutan kalıcı SQLite dosyası.
+"""
+from langchain_core.embeddings import Embeddings
+from app.config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Model ve metin için içerik adresli anahtar üretir."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class SQLiteVectorStore:
+    """Vektörleri float32 blob olarak saklayan anahtar-değer deposu."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite parametre sınırına takılmamak için parça parça sorgula
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                )
+                for key, blob in rows:
+                    found[key] = _unpack(blob)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, _pack(vector)) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Herhangi bir Embeddings nesnesinin önüne konan önbellek.
+
+    Chroma için doğrudan `embedding_function` olarak kullanılabilir.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        path: Optional[str] = EMBEDDING_CACHE_PATH,
+        max_entries: int = EMBEDDING_CACHE_SIZE
+    ):
+        """
+        Args:
+            embeddings (Embeddings): Asıl embedding modeli
+            model_name (str): Anahtarlara katılan model adı
+            path (str): SQLite dosyası; None ise yalnızca bellek katmanı kullanılır
+            max_entries (int): Bellek katmanındaki en fazla vektör sayısı
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk = SQLiteVectorStore(path) if path else None
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        # Bellek katmanını ve sayaçları korur (gömme işleri threadpool'dan eşzamanlı gelir)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _count(self, name: str, value: int) -> None:
+        with self._lock:
+            self.stats[name] += value
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.stats["memory_hits"] += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.disk is not None:
+            from_disk = self.disk.get_many(missing)
+            self._count("disk_hits", len(from_disk))
+            for key, vector in from_disk.items():
+                self._remember(key, vector)
+            found.update(from_disk)
+        return found
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        for key, vector in items.items():
+            self._remember(key, vector)
+        if self.disk is not None and items:
+            self.disk.put_many(items)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        # Eksik metinleri tek seferde hesapla
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            self._count("misses", len(missing))
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = embedding_key(self.model_name, text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+
+        self._count("misses", 1)
+        vector = self.embeddings.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
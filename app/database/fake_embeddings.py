@@ -0,0 +1,51 @@
+"""
+Çevrimdışı testler ve yük ölçümleri için model gerektirmeyen embedding.
+
+Her kelime (ve kelime ikilisi) sabit bir karma ile vektörün bir boyutuna
++1/-1 olarak eklenir (feature hashing), sonuç birim uzunluğa ölçeklenir.
+Aynı metin her süreçte aynı vektörü verir; ortak kelimesi olan metinler
+birbirine yakın düşer, böylece arama sonuçları anlamlı kalır.
+"""
+from app.config import FAKE_EMBEDDING_DIMENSION
+from app.database.bm25_index import TOKEN_PATTERN, fold_case
+from langchain_core.embeddings import Embeddings
+from typing import List
+import hashlib
+import time
+
+import numpy as np
+
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, dimension: int = FAKE_EMBEDDING_DIMENSION, latency: float = 0.0):
+        """
+        Args:
+            dimension (int): Vektör boyutu
+            latency (float): Model maliyetini taklit etmek için her çağrıya eklenen gecikme (saniye)
+        """
+        self.dimension = dimension
+        self.latency = latency
+
+    def _bucket(self, feature: str) -> int:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def _embed(self, text: str) -> List[float]:
+        words = [fold_case(match.group()) for match in TOKEN_PATTERN.finditer(text)]
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            bucket = self._bucket(feature)
+            vector[bucket % self.dimension] += 1.0 if (bucket >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0] = 1.0
+            norm = 1.0
+        return (vector / norm).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
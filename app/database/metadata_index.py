@@ -0,0 +1,181 @@
+"""
+Metadata filtreleri ve kaynak -> parça kimliği ikincil indeksi.
+
+Filtreler Chroma'nın `where` sözdizimine çevrilerek veritabanına iletilir.
+Kaynak filtresi için süreç içinde tutulan indeks, aday parça sayısı
+küçükse yalnızca bu adayların vektörlerini getirip tam (exact) skorlama
+yapılmasını sağlar. Bu, HNSW'nin seçici filtrelerde k'dan az sonuç
+döndürmesini de önler. İndeks yalnızca bu süreçteki yazmaları görür; hangi
+koleksiyon sürümünü yansıttığını tutar ve sürüm geride kaldığında (ör. başka
+bir işçi döküman yüklediğinde) kullanılmaz, filtre Chroma'ya iletilir.
+"""
+from app.database.ranking import smallest_k
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import threading
+
+import numpy as np
+
+# Chroma'dan indeks yüklenirken sayfa boyutu
+LOAD_PAGE_SIZE = 10000
+
+
+def build_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Arama filtrelerini Chroma `where` ifadesine çevirir.
+
+    Args:
+        filters (dict): source (str veya liste), type, min_size, max_size,
+            uploaded_after, uploaded_before (epoch saniye), page_min, page_max
+
+    Returns:
+        Optional[dict]: Chroma where ifadesi; filtre yoksa None
+    """
+    if not filters:
+        return None
+
+    conditions = []
+    source = filters.get("source")
+    if isinstance(source, list):
+        conditions.append({"source": {"$in": source}} if len(source) > 1 else {"source": source[0]})
+    elif source is not None:
+        conditions.append({"source": source})
+
+    if filters.get("type") is not None:
+        conditions.append({"type": filters["type"]})
+
+    ranges = [
+        ("size", "min_size", "max_size"),
+        ("uploaded_at", "uploaded_after", "uploaded_before"),
+        ("page", "page_min", "page_max"),
+    ]
+    for field, lower, upper in ranges:
+        if filters.get(lower) is not None:
+            conditions.append({field: {"$gte": filters[lower]}})
+        if filters.get(upper) is not None:
+            conditions.append({field: {"$lte": filters[upper]}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def strip_source(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Kaynak koşulunu where ifadesinden çıkarır (kaynak indeksle çözüldüğünde)."""
+    if where is None:
+        return None
+    conditions = where.get("$and", [where])
+    rest = [condition for condition in conditions if "source" not in condition]
+    if not rest:
+        return None
+    return rest[0] if len(rest) == 1 else {"$and": rest}
+
+
+class SourceIndex:
+    """Kaynak adından parça kimliklerine süreç içi ikincil indeks."""
+
+    def __init__(self):
+        self._ids: Dict[str, Set[str]] = defaultdict(set)
+        self._sources: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.ready = False
+        # İndeksin yansıttığı koleksiyon sürümü (bkz. ResponseCache.collection_version); None: bilinmiyor
+        self.version: Optional[int] = None
+
+    def load(self, vectorstore, version: Optional[int] = None) -> None:
+        """
+        İndeksi koleksiyondaki mevcut parçalardan oluşturur.
+
+        Args:
+            vectorstore: LangChain Chroma nesnesi
+            version (int): Yüklemeye başlamadan önce okunan koleksiyon sürümü; yükleme sırasında
+                bu süreçte biten işler sürümü `advance` ile ilerletebilsin diye baştan atanır
+        """
+        self.version = version
+        offset = 0
+        while True:
+            found = vectorstore.get(include=["metadatas"], limit=LOAD_PAGE_SIZE, offset=offset)
+            for id_, metadata in zip(found["ids"], found["metadatas"]):
+                if metadata and "source" in metadata:
+                    self.add(metadata["source"], [id_])
+            if len(found["ids"]) < LOAD_PAGE_SIZE:
+                break
+            offset += LOAD_PAGE_SIZE
+        self.ready = True
+
+    def add(self, source: str, ids: Iterable[str]) -> None:
+        with self._lock:
+            for id_ in ids:
+                self._ids[source].add(id_)
+                self._sources[id_] = source
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for id_ in ids:
+                source = self._sources.pop(id_, None)
+                if source is not None:
+                    self._ids[source].discard(id_)
+                    if not self._ids[source]:
+                        del self._ids[source]
+
+    def advance(self, previous: int, version: int) -> None:
+        """
+        Bu süreçteki bir yazmanın ardından sürümü ilerletir.
+
+        Yalnızca indeks `previous` sürümündeyse ilerler; arada başka bir işçinin
+        yazması varsa indeks geride kalır ve artık kullanılmaz.
+        """
+        with self._lock:
+            if self.version is not None and self.version == previous:
+                self.version = version
+
+    def is_current(self, version: Optional[int]) -> bool:
+        """İndeks yüklü ve verilen koleksiyon sürümünü yansıtıyor mu?"""
+        return self.ready and version is not None and self.version == version
+
+    def candidates(self, sources: List[str]) -> Set[str]:
+        """Verilen kaynaklara ait parça kimlikleri."""
+        with self._lock:
+            return set().union(*(self._ids.get(source, set()) for source in sources))
+
+
+def distances(space: str, query: List[float], matrix: np.ndarray) -> np.ndarray:
+    """Chroma'nın mesafe tanımlarıyla sorgu ve aday vektörler arası mesafeler."""
+    q = np.asarray(query, dtype=np.float32)
+    if space == "cosine":
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(q)
+        return 1.0 - (matrix @ q) / np.where(norms == 0, 1.0, norms)
+    if space == "ip":
+        return 1.0 - matrix @ q
+    # l2: Chroma karesi alınmış öklid mesafesi kullanır
+    diff = matrix - q
+    return np.einsum("ij,ij->i", diff, diff)
+
+
+def exact_search(
+    vectorstore,
+    query: List[float],
+    candidate_ids: Set[str],
+    k: int,
+    where: Optional[Dict[str, Any]] = None
+) -> List[Tuple[str, Dict[str, Any], float]]:
+    """
+    Yalnızca aday parçaları getirip tam skorlama yapar.
+
+    Returns:
+        List[Tuple[str, dict, float]]: (içerik, metadata, mesafe) - artan mesafe sırasıyla
+    """
+    if not candidate_ids:
+        return []
+    found = vectorstore._collection.get(
+        ids=list(candidate_ids),
+        where=where,
+        include=["embeddings", "documents", "metadatas"]
+    )
+    if not found["ids"]:
+        return []
+
+    space = (vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+    scores = distances(space, query, np.asarray(found["embeddings"], dtype=np.float32))
+    top = smallest_k(scores, k, np.asarray(found["ids"]))
+    return [(found["documents"][i], found["metadatas"][i], float(scores[i])) for i in top]
@@ -0,0 +1,160 @@
+"""
+ONNX Runtime ile CPU üzerinde embedding üretimi.
+
+Aynı sentence-transformers modeli ONNX'e aktarılır (isteğe bağlı int8
+dinamik nicemleme ile) ve PyTorch olmadan çalıştırılır. Metinler uzunluğa
+göre sıralanıp gruplanır; her grup yalnızca kendi en uzun dizisine kadar
+doldurulur (padding). Çıktı sentence-transformers ile aynı şekilde maske
+ağırlıklı ortalama (mean pooling) ile hesaplanır.
+
+Modeli dışa aktarmak için (torch ve transformers gerekir):
+    python -m app.database.onnx_embeddings --output models/onnx
+"""
+from app.config import (
+    EMBEDDING_MODEL, ONNX_MODEL_DIR, ONNX_QUANTIZED, ONNX_INTRA_OP_THREADS, ONNX_BATCH_SIZE, ONNX_MAX_LENGTH
+)
+from langchain_core.embeddings import Embeddings
+from typing import List
+import argparse
+import os
+
+import numpy as np
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(
+        self,
+        model_dir: str = ONNX_MODEL_DIR,
+        quantized: bool = ONNX_QUANTIZED,
+        intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+        batch_size: int = ONNX_BATCH_SIZE,
+        max_length: int = ONNX_MAX_LENGTH
+    ):
+        """
+        Args:
+            model_dir (str): model.onnx / model_quantized.onnx ve tokenizer.json dizini
+            quantized (bool): int8 nicemlenmiş modeli kullan
+            intra_op_threads (int): Bir işlem içinde kullanılacak thread sayısı
+            batch_size (int): Tek çalıştırmadaki en fazla metin
+            max_length (int): Metin başına en fazla token (fazlası kesilir)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX modeli bulunamadı: {model_path} "
+                "(python -m app.database.onnx_embeddings --output ile oluşturun)"
+            )
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        pad_token = next(
+            (token for token in ("<pad>", "[PAD]") if self.tokenizer.token_to_id(token) is not None), None
+        )
+        # Uzunluk verilmediğinde her grup kendi en uzun dizisine kadar doldurulur
+        if pad_token is None:
+            self.tokenizer.enable_padding()
+        else:
+            self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token)
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]
+
+        # Maske ağırlıklı ortalama (sentence-transformers mean pooling)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # Benzer uzunluktaki metinler aynı gruba düşsün ki doldurma az olsun
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[List[float]] = [[] for _ in texts]
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            for i, vector in zip(indices, self._run([texts[i] for i in indices])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def quantize_model(model_path: str, output_path: str) -> None:
+    """Modeli int8 dinamik nicemleme ile küçültür (onnx paketi gerekir)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+
+
+def export_model(model_name: str = EMBEDDING_MODEL, output_dir: str = ONNX_MODEL_DIR, quantize: bool = True) -> None:
+    """
+    Hugging Face modelini ONNX'e aktarır ve tokenizer'ı yanına kaydeder.
+
+    Args:
+        model_name (str): Hugging Face model adı
+        output_dir (str): Çıktı dizini
+        quantize (bool): int8 nicemlenmiş kopyayı da üret
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, TOKENIZER_FILE))
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["Örnek cümle", "An example sentence"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+
+    if quantize:
+        quantize_model(model_path, os.path.join(output_dir, QUANTIZED_MODEL_FILE))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embedding modelini ONNX'e aktarır")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--output", default=ONNX_MODEL_DIR)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+    export_model(args.model, args.output, quantize=not args.no_quantize)
+
+
+if __name__ == "__main__":
+    main()
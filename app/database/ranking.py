@@ -0,0 +1,35 @@
+"""
+Skor dizilerinden kararlı en iyi k seçimi.
+
+`argpartition` eşit skorlar arasında k'ye göre değişen bir seçim yapar;
+cursor ile sayfalamada her sayfa aramayı daha derin k ile tekrarladığından
+eşit skorlu sonuçlar sayfalar arasında yer değiştirip tekrar edebilir veya
+atlanabilir. Burada eşitlikler satır/kimlik anahtarıyla bozulur; böylece
+k sonucu, daha büyük bir k'nin ilk k sonucuyla aynıdır.
+"""
+import numpy as np
+
+
+def smallest_k(scores: np.ndarray, k: int, keys: np.ndarray) -> np.ndarray:
+    """
+    En küçük k skorun indekslerini artan sırayla döndürür.
+
+    Args:
+        scores (np.ndarray): Skorlar (büyük olanın iyi olduğu skorlar için negatifi verilir)
+        k (int): Seçilecek en fazla sonuç
+        keys (np.ndarray): Eşit skorlarda artan sırayla öne alınacak anahtarlar (satır numarası, kimlik)
+
+    Returns:
+        np.ndarray: `scores` içindeki indeksler
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        # Sınırdaki eşitlerin hepsi aday tutulur; hangisinin seçileceğine anahtar karar verir
+        threshold = np.partition(scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores <= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    order = np.lexsort((keys[candidates], scores[candidates]))
+    return candidates[order[:k]]
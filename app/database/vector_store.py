@@ -1,15 +1,524 @@
-from chromadb import Client
-from chromadb.config import Settings
-
-class VectorStore:
-    def __init__(self):
-        self.client = Client(Settings(persist_directory="./chroma_db"))
-        self.collection = self.client.create_collection("documents")
-    
-    def add_document(self, text, metadata=None):
-        # Döküman ekleme fonksiyonu
-        pass
-
-    def search_similar(self, query, n_results=5):
-        # Benzerlik arama fonksiyonu
-        pass 
\ No newline at end of file
+"""
+NumPy tabanlı, bellek eşlemeli (memory-mapped) tam arama vektör deposu.
+
+Normalize edilmiş embedding'ler yalnızca sona eklenen ham bir matris
+dosyasında (float32, isteğe bağlı float16 veya int8) tutulur; arama tek bir
+vektörize matris-vektör çarpımı ve `argpartition` ile yapılır, eşit skorlar
+satır numarasıyla sıralanır. Parça metinleri ve metadata SQLite'ta saklanır,
+`where` filtreleri SQL'e çevrilir.
+Silmeler satır başına bir baytlık tombstone dizisiyle işaretlenir. Matris
+açılışta belleğe okunmaz, işletim sistemi gerektiğinde sayfalar.
+
+Chroma ile aynı arayüzü sunduğu için uygulamada `VECTOR_BACKEND=numpy`
+ile Chroma yerine kullanılabilir.
+"""
+from app.config import VECTOR_STORE_PATH, VECTOR_STORE_DTYPE
+from app.database.ranking import smallest_k
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore as BaseVectorStore
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+import numpy as np
+
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Geçici bellek kullanımını sınırlamak için matris bu kadar satırlık bloklarla çarpılır
+SEARCH_BLOCK_ROWS = 65536
+
+# SQLite parametre sınırı için parça boyutu
+_SQL_CHUNK = 500
+
+_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def where_to_sql(where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """
+    Chroma `where` ifadesini SQLite koşuluna çevirir.
+
+    Returns:
+        Tuple[str, list]: SQL koşulu ve parametreleri
+    """
+    if not where:
+        return "1", []
+
+    clauses, params = [], []
+    for key, value in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_to_sql(condition) for condition in value]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append(joiner.join(f"({clause})" for clause, _ in parts))
+            for _, part_params in parts:
+                params.extend(part_params)
+            continue
+
+        field = "json_extract(metadata, ?)"
+        path = f'$."{key}"'
+        conditions = value if isinstance(value, dict) else {"$eq": value}
+        for operator, operand in conditions.items():
+            if operator in ("$in", "$nin"):
+                keyword = "IN" if operator == "$in" else "NOT IN"
+                clauses.append(f"{field} {keyword} ({','.join('?' * len(operand))})")
+                params.extend([path, *operand])
+            elif operator in _OPERATORS:
+                clauses.append(f"{field} {_OPERATORS[operator]} ?")
+                params.extend([path, operand])
+            else:
+                raise ValueError(f"Desteklenmeyen filtre operatörü: {operator}")
+
+    return " AND ".join(f"({clause})" for clause in clauses), params
+
+
+def _chunks(items: List, size: int = _SQL_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class VectorStore(BaseVectorStore):
+    def __init__(
+        self,
+        embedding_function: Optional[Embeddings] = None,
+        path: str = VECTOR_STORE_PATH,
+        dtype: str = VECTOR_STORE_DTYPE
+    ):
+        """
+        Args:
+            embedding_function (Embeddings): Metinleri vektörleyen model
+            path (str): Matris, tombstone ve kayıt dosyalarının dizini
+            dtype (str): Saklama tipi: float32, float16 veya int8
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Desteklenmeyen vektör tipi: {dtype}")
+        os.makedirs(path, exist_ok=True)
+        self.embedding_function = embedding_function
+        self.path = path
+        self.dtype = dtype
+        # Vektörler normalize saklandığı için mesafe kosinüs mesafesidir
+        self.metadata = {"hnsw:space": "cosine"}
+        # Chroma'nın koleksiyon düzeyindeki çağrıları (get, update, query, count) da bu nesneye gelir
+        self._collection = self
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(path, "records.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                row INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                document TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        stored = dict(self._conn.execute("SELECT key, value FROM settings"))
+        if stored.get("dtype", dtype) != dtype:
+            raise ValueError(f"Depo {stored['dtype']} tipinde oluşturulmuş, {dtype} ile açılamaz")
+        self.dimension = int(stored["dimension"]) if "dimension" in stored else None
+
+        self._matrix_path = os.path.join(path, f"vectors.{dtype}")
+        self._scales_path = os.path.join(path, "scales.float32")
+        self._tombstones_path = os.path.join(path, "tombstones.u8")
+        for file_path in (self._matrix_path, self._scales_path, self._tombstones_path):
+            open(file_path, "ab").close()
+
+        self._item_size = np.dtype(DTYPES[dtype]).itemsize
+        self._rows = self._file_rows()
+        self._tombstones = np.fromfile(self._tombstones_path, dtype=bool)
+        self._matrix: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._recover()
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding_function
+
+    def _file_rows(self) -> int:
+        if not self.dimension:
+            return 0
+        rows = os.path.getsize(self._matrix_path) // (self.dimension * self._item_size)
+        if self.dtype == "int8":
+            rows = min(rows, os.path.getsize(self._scales_path) // 4)
+        return rows
+
+    def _recover(self) -> None:
+        # Yarım yazılmış son satırı at
+        if self.dimension:
+            with open(self._matrix_path, "r+b") as f:
+                f.truncate(self._rows * self.dimension * self._item_size)
+            if self.dtype == "int8":
+                with open(self._scales_path, "r+b") as f:
+                    f.truncate(self._rows * 4)
+        if len(self._tombstones) > self._rows:
+            with open(self._tombstones_path, "r+b") as f:
+                f.truncate(self._rows)
+            self._tombstones = self._tombstones[:self._rows]
+        # Kaydı yazılamadan kalmış (yarım kalan ekleme) satırları silinmiş say
+        last = self._conn.execute("SELECT MAX(row) FROM records").fetchone()[0]
+        live_rows = 0 if last is None else last + 1
+        if len(self._tombstones) < self._rows:
+            self._append_tombstones(self._rows - len(self._tombstones))
+        if self._rows > live_rows:
+            self._set_tombstones(range(live_rows, self._rows))
+
+    def _append_tombstones(self, count: int) -> None:
+        with open(self._tombstones_path, "ab") as f:
+            f.write(b"\0" * count)
+        self._tombstones = np.concatenate([self._tombstones, np.zeros(count, dtype=bool)])
+
+    def _set_tombstones(self, rows: Iterable[int]) -> None:
+        with open(self._tombstones_path, "r+b") as f:
+            for row in rows:
+                f.seek(row)
+                f.write(b"\1")
+                self._tombstones[row] = True
+
+    def _views(self, count: Optional[int] = None) -> Tuple[Optional[np.memmap], Optional[np.memmap]]:
+        """
+        Matrisi ilk kullanımda (veya büyüdüğünde) bellek eşlemesiyle açar.
+
+        Args:
+            count (int): Döndürülecek satır sayısı; arama sırasında eklenen satırlar
+                görünmesin diye aramanın başında okunan değer verilir
+        """
+        with self._lock:
+            if not self._rows:
+                return None, None
+            if self._matrix is None or len(self._matrix) != self._rows:
+                self._matrix = np.memmap(
+                    self._matrix_path, dtype=DTYPES[self.dtype], mode="r", shape=(self._rows, self.dimension)
+                )
+                if self.dtype == "int8":
+                    self._scales = np.memmap(self._scales_path, dtype=np.float32, mode="r", shape=(self._rows,))
+            matrix, scales = self._matrix, self._scales
+        if count is None:
+            return matrix, scales
+        return matrix[:count], None if scales is None else scales[:count]
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Normalize edilmiş vektörleri saklama tipine çevirir."""
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return vectors.astype(DTYPES[self.dtype]), None
+
+    def _decode(self, rows: np.ndarray) -> np.ndarray:
+        matrix, scales = self._views()
+        vectors = np.asarray(matrix[rows], dtype=np.float32)
+        if scales is not None:
+            vectors *= scales[rows][:, None]
+        return vectors
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """Hazır vektörleri ekler; var olan kimlikler yenisiyle değiştirilir."""
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        metadatas = metadatas or [{} for _ in ids]
+        encoded, scales = self._encode(vectors)
+
+        with self._lock, self._conn:
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                self._conn.executemany(
+                    "INSERT INTO settings (key, value) VALUES (?, ?)",
+                    [("dimension", str(self.dimension)), ("dtype", self.dtype)]
+                )
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(f"Vektör boyutu {vectors.shape[1]}, depo boyutu {self.dimension}")
+
+            self._delete_locked(ids)
+            start = self._rows
+            self._conn.executemany(
+                "INSERT INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (start + i, id_, document, json.dumps(metadata or {}, ensure_ascii=False))
+                    for i, (id_, document, metadata) in enumerate(zip(ids, documents, metadatas))
+                ]
+            )
+            # Kayıtlar matris yazıldıktan sonra işlenir (commit); yarım kalan satırlar açılışta temizlenir
+            with open(self._matrix_path, "ab") as f:
+                f.write(encoded.tobytes())
+            if scales is not None:
+                with open(self._scales_path, "ab") as f:
+                    f.write(scales.tobytes())
+            self._append_tombstones(len(ids))
+            self._rows += len(ids)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        self.add(ids, self.embedding_function.embed_documents(texts), texts, metadatas)
+        return ids
+
+    def _delete_locked(self, ids: List[str]) -> int:
+        rows = []
+        for part in _chunks(list(ids)):
+            placeholders = ",".join("?" * len(part))
+            rows.extend(row for (row,) in self._conn.execute(
+                f"SELECT row FROM records WHERE id IN ({placeholders})", part
+            ))
+            self._conn.execute(f"DELETE FROM records WHERE id IN ({placeholders})", part)
+        self._set_tombstones(rows)
+        return len(rows)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> None:
+        if not ids:
+            return
+        with self._lock, self._conn:
+            self._delete_locked(ids)
+
+    def update(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Yalnızca metadata'yı günceller (vektörler değişmez)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE records SET metadata = ? WHERE id = ?",
+                [(json.dumps(metadata or {}, ensure_ascii=False), id_) for id_, metadata in zip(ids, metadatas)]
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def _select(
+        self,
+        columns: str,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        suffix: str = "",
+        suffix_params: Tuple = ()
+    ) -> List[Tuple]:
+        clause, params = where_to_sql(where)
+        with self._lock:
+            if ids is None:
+                return self._conn.execute(
+                    f"SELECT {columns} FROM records WHERE {clause} ORDER BY row{suffix}", (*params, *suffix_params)
+                ).fetchall()
+            rows = []
+            for part in _chunks(list(ids)):
+                rows.extend(self._conn.execute(
+                    f"SELECT {columns} FROM records WHERE id IN ({','.join('?' * len(part))}) AND {clause} ORDER BY row",
+                    (*part, *params)
+                ))
+            return rows
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Chroma `get` ile aynı biçimde kayıtları döndürür."""
+        include = ["documents", "metadatas"] if include is None else include
+        if isinstance(ids, str):
+            ids = [ids]
+        suffix, suffix_params = "", ()
+        if ids is None and (limit is not None or offset):
+            suffix, suffix_params = " LIMIT ? OFFSET ?", (-1 if limit is None else limit, offset or 0)
+        rows = self._select("row, id, document, metadata", ids, where, suffix, suffix_params)
+
+        result: Dict[str, Any] = {"ids": [id_ for _, id_, _, _ in rows]}
+        result["documents"] = [document for _, _, document, _ in rows] if "documents" in include else None
+        result["metadatas"] = [json.loads(metadata) for _, _, _, metadata in rows] if "metadatas" in include else None
+        if "embeddings" in include:
+            result["embeddings"] = (
+                self._decode(np.array([row for row, _, _, _ in rows])).tolist() if rows else []
+            )
+        return result
+
+    def _allowed_rows(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        return np.array([row for (row,) in self._select("row", where=where)], dtype=np.int64)
+
+    def _scores(self, queries: np.ndarray, rows: Optional[np.ndarray], total: int) -> np.ndarray:
+        """Sorgular ile ilk `total` satırın tümü veya seçilenleri arasındaki kosinüs benzerlikleri: (satır, sorgu)."""
+        matrix, scales = self._views(total)
+        count = total if rows is None else len(rows)
+        scores = np.empty((count, len(queries)), dtype=np.float32)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, count)
+            block_rows = slice(start, end) if rows is None else rows[start:end]
+            block = matrix[block_rows]
+            if self.dtype == "float32":
+                scores[start:end] = block @ queries.T
+            else:
+                scores[start:end] = block.astype(np.float32) @ queries.T
+            if scales is not None:
+                scores[start:end] *= scales[block_rows][:, None]
+        return scores
+
+    def _top_k(
+        self,
+        queries: List[List[float]],
+        k: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """Her sorgu için en yakın k satırı (satır, kosinüs mesafesi) olarak döndürür."""
+        queries = self._normalize(queries)
+        # Satır sayısı bir kez okunur; arama sürerken add() ile eklenen satırlar bu aramada yok sayılır
+        with self._lock:
+            total = self._rows
+            rows = self._allowed_rows(where)
+            tombstones = self._tombstones[:total]
+        if not total or (rows is not None and not len(rows)):
+            return [[] for _ in queries]
+
+        scores = self._scores(queries, rows, total)
+        live = ~tombstones if rows is None else ~tombstones[rows]
+        scores[~live] = -np.inf
+        row_ids = np.arange(total) if rows is None else rows
+        k = min(k, int(live.sum()))
+        if k <= 0:
+            return [[] for _ in queries]
+
+        results = []
+        for column in scores.T:
+            top = smallest_k(-column, k, row_ids)
+            results.append([(int(row_ids[i]), float(1.0 - column[i])) for i in top])
+        return results
+
+    def _records(self, rows: List[int]) -> Dict[int, Tuple[str, str, Dict[str, Any]]]:
+        records = {}
+        with self._lock:
+            for part in _chunks(rows):
+                for row, id_, document, metadata in self._conn.execute(
+                    f"SELECT row, id, document, metadata FROM records WHERE row IN ({','.join('?' * len(part))})",
+                    part
+                ):
+                    records[row] = (id_, document, json.loads(metadata))
+        return records
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> Dict[str, List[List[Any]]]:
+        """Chroma `query` ile aynı biçimde toplu arama yapar."""
+        hits = self._top_k(query_embeddings, n_results, where)
+        records = self._records(sorted({row for query_hits in hits for row, _ in query_hits}))
+        # Arama ile kayıt okuma arasında silinen satırlar atlanır
+        hits = [[(row, distance) for row, distance in query_hits if row in records] for query_hits in hits]
+        return {
+            "ids": [[records[row][0] for row, _ in query_hits] for query_hits in hits],
+            "documents": [[records[row][1] for row, _ in query_hits] for query_hits in hits],
+            "metadatas": [[records[row][2] for row, _ in query_hits] for query_hits in hits],
+            "distances": [[distance for _, distance in query_hits] for query_hits in hits],
+        }
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """(döküman, kosinüs mesafesi) çiftleri döndürür (Chroma ile aynı)."""
+        found = self.query([embedding], n_results=k, where=filter)
+        return [
+            (Document(page_content=text, metadata=metadata), distance)
+            for text, metadata, distance in zip(found["documents"][0], found["metadatas"][0], found["distances"][0])
+        ]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self.embedding_function.embed_query(query), k=k, filter=filter
+        )
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k, filter)]
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any
+    ) -> "VectorStore":
+        store = cls(embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas)
+        return store
+
+    def add_document(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Tek bir dökümanı ekler.
+
+        Returns:
+            str: Döküman kimliği
+        """
+        return self.add_texts([text], metadatas=[metadata or {}])[0]
+
+    def search_similar(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Sorguya en benzer dökümanları döndürür.
+
+        Returns:
+            List[dict]: id, content, metadata ve similarity alanlarıyla sonuçlar
+        """
+        found = self.query([self.embedding_function.embed_query(query)], n_results=n_results)
+        return [
+            {"id": id_, "content": text, "metadata": metadata, "similarity": 1.0 - distance}
+            for id_, text, metadata, distance in zip(
+                found["ids"][0], found["documents"][0], found["metadatas"][0], found["distances"][0]
+            )
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._matrix = None
+            self._scales = None
+            self._conn.close()
@@ -0,0 +1,3 @@
+"""
+Döküman yükleme (ingestion) alt sistemi.
+"""
@@ -0,0 +1,273 @@
+"""
+Tek geçişte metin normalleştirme ve cümle sınırlarına saygılı parçalama.
+
+`normalize`, `clean_text`'in iki regex değişimi ve encode/decode turu
+yerine önceden derlenmiş tek bir desenle yalnızca değişen aralıkları
+yeniden yazar ve normalleştirilmiş metinden kaynak metne ofset haritası
+tutar. `SentenceChunker` sayfaları tembel tüketir, Türkçe/İngilizce
+cümleleri (kısaltmaları bölmeden) parça boyutuna kadar paketler ve her
+parçayı kaynak metindeki [start, end) karakter aralığıyla üretir.
+"""
+from app.metrics import record
+from bisect import bisect_right
+from collections import deque
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+import re
+import time
+
+# Korunan karakterler; geri kalanı silinir, boşluk içeren koşular tek boşluğa iner
+_KEPT = r"\w.,;!?\-"
+
+# Değişiklik gerektiren koşular: korunmayan karakter dizileri. Tek başına duran
+# boşluk zaten normaldir, eşleşmez (her konumda ileri bakıştan daha hızlı).
+_NOISE = re.compile(rf"[^{_KEPT} ][^{_KEPT}]*| [^{_KEPT}]+")
+_WHITESPACE = re.compile(r"\s")
+
+# Aday cümle sonu: noktalama + boşluk + harf veya rakam (büyük harf kontrolü Python'da)
+_SENTENCE_END = re.compile(r"[.!?]+ (?=[^\W_])")
+
+# Sonrasında büyük harf gelse de cümleyi bitirmeyen kısaltmalar (küçük harf, noktasız)
+ABBREVIATIONS = frozenset({
+    # Türkçe
+    "dr", "prof", "doç", "doc", "yrd", "öğr", "gör", "av", "müh", "sn", "bkz", "vb", "vs", "örn",
+    "no", "nr", "s", "sf", "c", "cad", "sok", "mah", "apt", "tel", "ltd", "şti", "a.ş", "t.c", "hz",
+    # İngilizce
+    "mr", "mrs", "ms", "jr", "sr", "st", "vs", "etc", "e.g", "i.e", "inc", "co", "corp", "fig",
+    "vol", "p", "pp", "approx", "dept", "est", "u.s", "u.k",
+})
+
+
+class NormalizedText:
+    """
+    Normalleştirilmiş metin ve kaynak metne ofset haritası.
+
+    Harita yalnızca değişiklik noktalarında girdi tutar; aradaki karakterler
+    kaynakta birebir ardışıktır.
+    """
+
+    __slots__ = ("text", "_targets", "_sources")
+
+    def __init__(self, text: str, targets: List[int], sources: List[int]):
+        self.text = text
+        self._targets = targets
+        self._sources = sources
+
+    def source_offset(self, offset: int) -> int:
+        """Normalleştirilmiş metindeki karakter ofsetinin kaynak metindeki karşılığı."""
+        i = bisect_right(self._targets, offset) - 1
+        return self._sources[i] + offset - self._targets[i]
+
+
+def normalize(text: str) -> NormalizedText:
+    """
+    Metni tek geçişte `clean_text` kurallarıyla normalleştirir.
+
+    Boşluk dizileri tek boşluğa iner, izin verilmeyen karakterler silinir ve
+    baştaki/sondaki boşluk atılır. `clean_text`'ten farkı, silinen bir
+    karakterin iki yanındaki boşlukların da tek boşlukta birleşmesidir.
+
+    Args:
+        text (str): Kaynak metin
+
+    Returns:
+        NormalizedText: Normal metin ve kaynak ofset haritası
+    """
+    pieces: List[str] = []
+    targets, sources = [0], [0]
+    cursor = length = 0
+    for match in _NOISE.finditer(text):
+        start, end = match.span()
+        pieces.append(text[cursor:start])
+        length += start - cursor
+        if _WHITESPACE.search(match.group()):
+            pieces.append(" ")
+            targets.append(length)
+            sources.append(start)
+            length += 1
+        targets.append(length)
+        sources.append(end)
+        cursor = end
+    if cursor == 0:
+        normalized = text
+    else:
+        pieces.append(text[cursor:])
+        normalized = "".join(pieces)
+
+    # Baştaki/sondaki tek boşluk (koşular zaten tek boşluğa indi)
+    lead = 1 if normalized.startswith(" ") else 0
+    stripped = normalized[lead:len(normalized) - 1 if normalized.endswith(" ") else None]
+    if lead:
+        i = bisect_right(targets, lead) - 1
+        sources = [sources[i] + lead - targets[i]] + sources[i + 1:]
+        targets = [0] + [target - lead for target in targets[i + 1:]]
+    return NormalizedText(stripped, targets, sources)
+
+
+def _is_sentence_end(text: str, match: "re.Match") -> bool:
+    following = text[match.end()]
+    if not (following.isupper() or following.isdigit()):
+        return False
+    if match.group() != ". ":
+        return True
+    token = text[text.rfind(" ", 0, match.start()) + 1:match.start()]
+    if token.lower() in ABBREVIATIONS:
+        return False
+    # Baş harf ("J. Smith") ve Türkçe sıra sayıları ("15. Yüzyıl")
+    if len(token) == 1 and token.isupper():
+        return False
+    return not (token.isdigit() and len(token) <= 2)
+
+
+def sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Normalleştirilmiş metindeki cümlelerin [start, end) aralıklarını üretir.
+
+    Cümle, noktalamadan sonra boşluk ve büyük harf ya da rakamla başlayan
+    kelime geldiğinde biter; kısaltmalar, baş harfler ve iki haneli sıra sayıları
+    cümleyi bitirmez.
+    """
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if _is_sentence_end(text, match):
+            yield start, match.end() - 1
+            start = match.end()
+    if start < len(text):
+        yield start, len(text)
+
+
+class Chunk(NamedTuple):
+    text: str
+    # Parçanın başladığı sayfa
+    page: int
+    # Kaynak metindeki [start, end) karakter aralığı (sayfalar arka arkaya eklenmiş kabul edilir)
+    start: int
+    end: int
+
+
+class _Buffer:
+    """Sayfa sınırlarını aşan normal metin tamponu ve kaynak ofset eşlemesi."""
+
+    def __init__(self):
+        self.text = ""
+        # Her segmentin tampondaki başlangıcı ve (kaynak tabanı, NormalizedText, iç ofset, sayfa)
+        self.starts: List[int] = []
+        self.segments: List[Tuple[int, NormalizedText, int, int]] = []
+
+    def append(self, normalized: NormalizedText, base: int, page: int) -> None:
+        if not normalized.text:
+            return
+        if self.text:
+            self.text += " "
+        self.starts.append(len(self.text))
+        self.segments.append((base, normalized, 0, page))
+        self.text += normalized.text
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """Tampondaki ofsetin (kaynak ofseti, sayfa) karşılığı."""
+        i = bisect_right(self.starts, offset) - 1
+        base, normalized, inner, page = self.segments[i]
+        return base + normalized.source_offset(inner + offset - self.starts[i]), page
+
+    def drop(self, offset: int) -> None:
+        """Tamponun ilk `offset` karakterini atar."""
+        if offset <= 0:
+            return
+        i = max(bisect_right(self.starts, offset) - 1, 0)
+        base, normalized, inner, page = self.segments[i]
+        shift = max(offset - self.starts[i], 0)
+        self.segments = [(base, normalized, inner + shift, page)] + self.segments[i + 1:]
+        self.starts = [0] + [start - offset for start in self.starts[i + 1:]]
+        self.text = self.text[offset:]
+
+
+class SentenceChunker:
+    """
+    Cümle sınırlarına saygılı, tembel ve ofset koruyan metin parçalayıcı.
+
+    Cümleler `chunk_size` karakterine kadar aynı parçaya eklenir; sonraki
+    parça öncekinin `chunk_overlap` karakterini aşmayan son cümleleriyle
+    başlar. Örtüşmeye yer bırakmayacak kadar uzun cümleler kelime
+    sınırlarında bölünür.
+
+    Args:
+        chunk_size (int): En büyük parça uzunluğu (karakter)
+        chunk_overlap (int): Ardışık parçalar arasındaki en fazla örtüşme
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap, chunk_size'dan küçük olmalı")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._words = re.compile(rf"\S{{1,{chunk_size}}}")
+
+    def split_text(self, text: str) -> List[str]:
+        """Tek metni parçalar (text splitter arayüzü)."""
+        return [chunk.text for chunk in self.iter_chunks([(1, text)])]
+
+    def _units(self, buffer: _Buffer, start: int, end: int) -> Iterator[Chunk]:
+        """Cümleyi (uzunsa kelimelerini) kaynak aralıklarıyla birim olarak üretir."""
+        # Örtüşmeye yer kalmayacak kadar uzun cümleler kelimelerine ayrılır
+        if end - start <= self.chunk_size - self.chunk_overlap:
+            spans: Iterable[Tuple[int, int]] = ((start, end),)
+        else:
+            spans = (match.span() for match in self._words.finditer(buffer.text, start, end))
+        for unit_start, unit_end in spans:
+            source_start, page = buffer.locate(unit_start)
+            source_end = buffer.locate(unit_end - 1)[0] + 1
+            yield Chunk(buffer.text[unit_start:unit_end], page, source_start, source_end)
+
+    def _iter_units(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Chunk]:
+        buffer = _Buffer()
+        base = 0
+        for number, raw in pages:
+            start = time.perf_counter()
+            normalized = normalize(raw)
+            record("upload.clean", time.perf_counter() - start)
+            buffer.append(normalized, base, number)
+            base += len(raw)
+
+            # Son cümle sonraki sayfada devam edebilir; tamponda bırak
+            spans = list(sentence_spans(buffer.text))
+            for span_start, span_end in spans[:-1]:
+                yield from self._units(buffer, span_start, span_end)
+            buffer.drop(spans[-1][0] if spans else len(buffer.text))
+
+            # Noktalamasız uzun metinlerde tamponu sınırla
+            if len(buffer.text) > 2 * self.chunk_size:
+                cut = buffer.text.rfind(" ", 0, len(buffer.text) - self.chunk_size)
+                if cut > 0:
+                    yield from self._units(buffer, 0, cut)
+                    buffer.drop(cut + 1)
+
+        for span_start, span_end in sentence_spans(buffer.text):
+            yield from self._units(buffer, span_start, span_end)
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Chunk]:
+        """
+        Ham sayfa metinlerini normalleştirip tembel olarak parçalar.
+
+        Args:
+            pages (Iterable): (sayfa numarası, ham metin) çiftleri
+
+        Yields:
+            Chunk: Parça metni, başladığı sayfa ve kaynaktaki karakter aralığı
+        """
+        window: deque = deque()
+        # " ".join(window) uzunluğu
+        length = 0
+        for unit in self._iter_units(pages):
+            size = len(unit.text)
+            if window and length + 1 + size > self.chunk_size:
+                yield self._join(window)
+                while window and (length > self.chunk_overlap or length + 1 + size > self.chunk_size):
+                    dropped = window.popleft()
+                    length = length - len(dropped.text) - 1 if window else 0
+            length += size + 1 if window else size
+            window.append(unit)
+        if window:
+            yield self._join(window)
+
+    @staticmethod
+    def _join(window: deque) -> Chunk:
+        return Chunk(" ".join(unit.text for unit in window), window[0].page, window[0].start, window[-1].end)
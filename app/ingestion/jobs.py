@@ -0,0 +1,217 @@
+"""
+Arka planda çalışan, sınırlı kapasiteli döküman yükleme kuyruğu.
+
+Yüklenen dosyalar geçici bir dosyaya kopyalanır ve iş olarak kuyruğa
+alınır. Sabit sayıda işçi, işleri olay döngüsünü bloklamadan ayrı
+thread'lerde işler. Aynı dosya adı ve içerik (sha256) bekler veya
+işlenirken ikinci bir iş açılmaz.
+"""
+from app.config import INGEST_WORKERS, INGEST_QUEUE_SIZE, INGEST_JOB_HISTORY
+from app.job_status import QUEUED, RUNNING, COMPLETED, FAILED
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Geçici dosyaya kopyalarken kullanılan blok boyutu
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class QueueFullError(Exception):
+    """Kuyruk dolu olduğunda fırlatılır (geri basınç)."""
+
+
+@dataclass
+class IngestionJob:
+    filename: str
+    content_type: str
+    content_hash: str
+    path: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = QUEUED
+    progress: Dict[str, int] = field(default_factory=lambda: {"pages": 0, "chunks": 0, "embedded": 0})
+    timings: Dict[str, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Tekrarlanan yüklemeleri tanımak için kullanılan anahtar."""
+        return f"{self.filename}\0{self.content_hash}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        queued = (self.started_at or time.time()) - self.created_at
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "content_hash": self.content_hash,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "timings": {"queued": round(queued, 4), **self.timings},
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def spool_to_tempfile(source: BinaryIO, suffix: str = "") -> Tuple[str, str]:
+    """
+    Dosya nesnesini parça parça geçici dosyaya kopyalar ve özetini hesaplar.
+
+    Returns:
+        Tuple[str, str]: (geçici dosya yolu, sha256 özeti)
+    """
+    digest = hashlib.sha256()
+    handle, path = tempfile.mkstemp(prefix="ingest-", suffix=suffix)
+    with os.fdopen(handle, "wb") as target:
+        while True:
+            block = source.read(COPY_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            target.write(block)
+    return path, digest.hexdigest()
+
+
+class IngestionQueue:
+    def __init__(
+        self,
+        processor: Callable[[IngestionJob], Any],
+        on_complete: Optional[Callable[[IngestionJob], Awaitable[None]]] = None,
+        workers: int = INGEST_WORKERS,
+        max_queue: int = INGEST_QUEUE_SIZE,
+        history: int = INGEST_JOB_HISTORY
+    ):
+        """
+        Args:
+            processor (Callable): İşi thread içinde işleyen fonksiyon; dönüş değeri job.result olur
+            on_complete (Callable): Başarılı işlerden sonra olay döngüsünde çağrılan coroutine
+            workers (int): Eşzamanlı işçi sayısı
+            max_queue (int): Bekleyebilecek en fazla iş
+            history (int): Bellekte tutulacak en fazla iş kaydı
+        """
+        self.processor = processor
+        self.on_complete = on_complete
+        self.workers = workers
+        self.max_queue = max_queue
+        self.history = history
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._by_key: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """Kuyrukta bekleyen iş sayısı."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """İşçileri çalışan olay döngüsünde başlatır (idempotent)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    def find_duplicate(self, job: IngestionJob) -> Optional[IngestionJob]:
+        """
+        Aynı dosya ve içerik için bekleyen veya işlenmekte olan işi döndürür.
+
+        Bitmiş işler eşleşmez: içerik o zamandan beri başka bir sürümle
+        değişmiş olabilir; tamamlanmış içeriğin yeniden işlenmesi gerekip
+        gerekmediğine `DocumentIndex.is_current` karar verir.
+        """
+        existing = self.jobs.get(self._by_key.get(job.key, ""))
+        if existing is None or existing.status not in (QUEUED, RUNNING):
+            return None
+        return existing
+
+    def submit(self, job: IngestionJob) -> Tuple[IngestionJob, bool]:
+        """
+        İşi kuyruğa alır.
+
+        Returns:
+            Tuple[IngestionJob, bool]: (iş, yeni oluşturuldu mu). Aynı dosya
+            zaten kuyruktaysa veya işleniyorsa mevcut iş döner.
+
+        Raises:
+            QueueFullError: Kuyruk doluysa
+        """
+        existing = self.find_duplicate(job)
+        if existing is not None:
+            _remove(job.path)
+            return existing, False
+
+        self.start()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            _remove(job.path)
+            raise QueueFullError("Yükleme kuyruğu dolu, lütfen daha sonra tekrar deneyin")
+
+        self.jobs[job.id] = job
+        self._by_key[job.key] = job.id
+        self._trim()
+        return job, True
+
+    def _trim(self) -> None:
+        # Sadece bitmiş işler silinebilir
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.history:
+                break
+            job = self.jobs[job_id]
+            if job.status in (COMPLETED, FAILED):
+                del self.jobs[job_id]
+                if self._by_key.get(job.key) == job_id:
+                    del self._by_key[job.key]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestionJob) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await asyncio.to_thread(self.processor, job) or {}
+            if self.on_complete is not None:
+                await self.on_complete(job)
+            job.status = COMPLETED
+        except Exception as e:
+            logger.exception("Yükleme işi başarısız: %s", job.filename)
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            job.timings["total"] = round(job.finished_at - job.started_at, 4)
+            _remove(job.path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
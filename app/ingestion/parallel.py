@@ -0,0 +1,128 @@
+"""
+Büyük PDF'ler için süreç havuzu ile paralel sayfa çıkarma.
+
+pdfplumber'ın yerleşim analizi saf Python ve CPU yoğundur. Sayfa
+aralıkları bir ProcessPoolExecutor'a dağıtılır; her işçi aynı geçici
+dosyayı kendi açar (PDF baytları görevlerle taşınmaz). Sonuçlar sayfa
+sırasına göre birleştirilir.
+"""
+from app.config import PDF_PARALLEL_THRESHOLD, PDF_PROCESS_WORKERS, PDF_PAGES_PER_TASK
+from app.ingestion.pipeline import clean_text, is_pdf, iter_pages
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import multiprocessing
+import threading
+
+import pdfplumber
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Paylaşılan süreç havuzunu döndürür; henüz yoksa oluşturur."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Çok thread'li sunucu sürecinden fork etmemek için spawn kullan
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def count_pages(path: str) -> int:
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(path: str, start: int, end: int, clean: bool = True) -> List[Tuple[int, str]]:
+    """
+    [start, end) aralığındaki sayfaları çıkarır (işçi sürecinde çalışır).
+
+    Returns:
+        List[Tuple[int, str]]: (1'den başlayan sayfa numarası, temiz metin; clean False ise ham metin)
+    """
+    pages = []
+    with pdfplumber.open(path) as pdf:
+        for index in range(start, end):
+            page = pdf.pages[index]
+            text = page.extract_text() or ""
+            page.flush_cache()
+            pages.append((index + 1, clean_text(text) if clean else text))
+    return pages
+
+
+def iter_pages_parallel(
+    path: str,
+    page_count: int,
+    executor: ProcessPoolExecutor,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    max_pending: Optional[int] = None,
+    progress: Optional[Dict[str, int]] = None,
+    clean: bool = True
+) -> Iterator[Tuple[int, str]]:
+    """
+    Sayfaları paralel çıkarır ve sayfa sırasıyla üretir.
+
+    Bellek kullanımını sınırlamak için aynı anda en fazla `max_pending`
+    görev havuzda bekler.
+    """
+    ranges = iter([
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ])
+    max_pending = max_pending or 2 * PDF_PROCESS_WORKERS
+    pending = deque()
+
+    def submit_next() -> None:
+        page_range = next(ranges, None)
+        if page_range is not None:
+            pending.append(executor.submit(extract_page_range, path, *page_range, clean))
+
+    try:
+        for _ in range(max_pending):
+            submit_next()
+        while pending:
+            pages = pending.popleft().result()
+            submit_next()
+            for page in pages:
+                if progress is not None:
+                    progress["pages"] += 1
+                yield page
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def iter_document_pages(
+    path: str,
+    filename: str,
+    progress: Optional[Dict[str, int]] = None,
+    threshold: int = PDF_PARALLEL_THRESHOLD,
+    clean: bool = True
+) -> Iterator[Tuple[int, str]]:
+    """
+    Dosyadan temizlenmiş metni sayfa sayfa üretir.
+
+    Sayfa sayısı `threshold` değerini aşan PDF'ler süreç havuzunda paralel,
+    diğerleri seri olarak işlenir.
+    """
+    if is_pdf(filename) and PDF_PROCESS_WORKERS > 1:
+        page_count = count_pages(path)
+        if page_count >= threshold:
+            yield from iter_pages_parallel(path, page_count, get_process_pool(), progress=progress, clean=clean)
+            return
+
+    with open(path, "rb") as file:
+        yield from iter_pages(file, filename, progress, clean)
@@ -0,0 +1,130 @@
+"""
+Akış tabanlı (streaming) metin çıkarma hattı.
+
+Sayfalar dosyadan tembel okunur ve sayfa sayfa üretilir; parçalama
+`SentenceChunker.iter_chunks` ile yine akış halinde yapılır, böylece
+bellek kullanımı döküman boyutundan bağımsız kalır.
+"""
+from app.ingestion.chunker import normalize
+from app.metrics import record
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+import codecs
+import re
+import time
+
+import pdfplumber
+
+# Metin dosyaları için okuma bloğu
+TEXT_BLOCK_SIZE = 64 * 1024
+
+T = TypeVar("T")
+
+
+def clean_text(text: str) -> str:
+    """Metni temizler ve düzenler (boşluklar tek boşluğa iner, özel karakterler silinir)."""
+    return normalize(text).text
+
+
+def _timed_clean(text: str) -> str:
+    """clean_text süresini ayrı bir aşama olarak kaydeder (pdfplumber süresinden ayırmak için)."""
+    start = time.perf_counter()
+    text = clean_text(text)
+    record("upload.clean", time.perf_counter() - start)
+    return text
+
+
+def is_pdf(filename: str) -> bool:
+    return filename.lower().endswith('.pdf')
+
+
+def iter_text_blocks(file: BinaryIO, block_size: int = TEXT_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Metin dosyasını bloklar halinde okur.
+
+    Bloklar kelime ortasında bölünmez; son boşluktan sonraki kısım bir
+    sonraki bloğa taşınır.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    carry = ""
+    while True:
+        raw = file.read(block_size)
+        text = carry + decoder.decode(raw, final=not raw)
+        if not raw:
+            if text:
+                yield text
+            return
+        match = None
+        for match in re.finditer(r'\s+', text):
+            pass
+        if match is None:
+            carry = text
+            continue
+        carry = text[match.end():]
+        yield text[:match.end()]
+
+
+def iter_pages(
+    file: BinaryIO,
+    filename: str,
+    progress: Optional[Dict[str, int]] = None,
+    clean: bool = True
+) -> Iterator[Tuple[int, str]]:
+    """
+    Dosyadan temizlenmiş metni sayfa sayfa üretir.
+
+    Args:
+        file (BinaryIO): Okunacak dosya
+        filename (str): Dosya adı (türü belirlemek için)
+        progress (dict): Varsa "pages" sayacı her sayfada artırılır
+        clean (bool): False ise ham metin üretilir (SentenceChunker kaynak
+            ofsetlerini ham metne göre hesaplar)
+
+    Yields:
+        Tuple[int, str]: (1'den başlayan sayfa numarası, temiz metin).
+        Metin dosyaları tek sayfa kabul edilir.
+    """
+    prepare = _timed_clean if clean else str
+    if is_pdf(filename):
+        # PDF dosyası
+        with pdfplumber.open(file) as pdf:
+            for number, page in enumerate(pdf.pages, start=1):
+                # Metni olmayan sayfalarda extract_text() None döner
+                text = page.extract_text() or ""
+                # Sayfanın ayrıştırma önbelleğini bırak
+                page.flush_cache()
+                if progress is not None:
+                    progress["pages"] += 1
+                yield number, prepare(text)
+    else:
+        # Metin dosyası
+        for block in iter_text_blocks(file):
+            yield 1, prepare(block)
+        if progress is not None:
+            progress["pages"] += 1
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Öğeleri sabit boyutlu listeler halinde gruplar."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def timed(items: Iterable[T], timings: Dict[str, float], key: str) -> Iterator[T]:
+    """Yineleyicide geçen toplam süreyi timings[key] alanına ekler."""
+    iterator = iter(items)
+    timings.setdefault(key, 0.0)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timings[key] += time.perf_counter() - start
+        yield item
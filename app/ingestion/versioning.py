@@ -0,0 +1,189 @@
+"""
+Döküman sürümleme ve deterministik parça kimlikleri.
+
+Her parçanın kimliği kaynak adı ve içeriğinin özetinden türetilir; her
+parçanın metadata'sında dökümanın içerik özeti (doc_hash) tutulur. Son
+başarıyla işlenen özet kaynak başına ayrıca saklanır (hiç parçası olmayan
+boş dökümanlar için de). Böylece aynı içeriğin yeniden yüklenmesi hiçbir
+şey yapmaz, düzenlenmiş bir dökümanda ise yalnızca değişen parçalar
+vektörlenir ve eskiler silinir.
+"""
+from app.config import SOURCE_VERSIONS_PATH
+from app.database.bm25_index import BM25Index
+from app.database.metadata_index import SourceIndex
+from app.metrics import span
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import os
+import sqlite3
+import threading
+
+# Aynı kaynağın eşzamanlı işlenmesini engelleyen kilitler
+_source_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_locks_guard = threading.Lock()
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Kaynak ve parça içeriğinden deterministik kimlik üretir."""
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+def source_lock(source: str) -> threading.Lock:
+    with _locks_guard:
+        return _source_locks[source]
+
+
+class SourceVersions:
+    """Kaynak başına son başarıyla işlenen içerik özetinin SQLite kaydı."""
+
+    def __init__(self, path: Optional[str] = SOURCE_VERSIONS_PATH):
+        """
+        Args:
+            path (str): SQLite dosyası; None ise bellekte tutulur
+        """
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY, doc_hash TEXT NOT NULL)"
+        )
+
+    def get(self, source: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT doc_hash FROM sources WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, source: str, doc_hash: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sources (source, doc_hash) VALUES (?, ?) "
+                "ON CONFLICT(source) DO UPDATE SET doc_hash = excluded.doc_hash",
+                (source, doc_hash)
+            )
+
+    def discard(self, source: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class DocumentIndex:
+    """Chroma koleksiyonundaki dökümanların sürüm bilgisine erişim."""
+
+    def __init__(
+        self,
+        vectorstore,
+        source_index: Optional[SourceIndex] = None,
+        lexical_index: Optional[BM25Index] = None,
+        versions: Optional[SourceVersions] = None
+    ):
+        """
+        Args:
+            vectorstore: LangChain Chroma nesnesi
+            source_index (SourceIndex): Varsa yazma/silmelerde güncellenen ikincil indeks
+            lexical_index (BM25Index): Varsa yazma/silmelerde güncellenen BM25 indeksi
+            versions (SourceVersions): Kaynak başına işlenen içerik özeti; verilmezse bellekte tutulur
+        """
+        self.vectorstore = vectorstore
+        self.source_index = source_index
+        self.lexical_index = lexical_index
+        self.versions = versions if versions is not None else SourceVersions(None)
+
+    def chunks(self, source: str) -> Dict[str, Dict[str, Any]]:
+        """Kaynağa ait parça kimliklerini ve metadata'larını döndürür."""
+        found = self.vectorstore.get(where={"source": source}, include=["metadatas"])
+        return dict(zip(found["ids"], found["metadatas"]))
+
+    def is_current(self, source: str, doc_hash: str) -> bool:
+        """Kaynağın son başarıyla işlenen sürümü verilen içerik özetine mi ait?"""
+        recorded = self.versions.get(source)
+        if recorded is not None:
+            return recorded == doc_hash
+        # Kayıt öncesi yüklenmiş kaynaklar: tüm parçalar aynı özete aitse güncel
+        chunks = self.chunks(source)
+        return bool(chunks) and all(meta.get("doc_hash") == doc_hash for meta in chunks.values())
+
+    def begin_version(self, source: str) -> None:
+        """Kaynağın kaydını kaldırır; işleme yarıda kalırsa eski sürüm güncel sayılmaz."""
+        self.versions.discard(source)
+
+    def commit_version(self, source: str, doc_hash: str) -> None:
+        """İşlenen sürümü kaydeder (parçası olmayan boş dökümanlar dahil)."""
+        self.versions.set(source, doc_hash)
+
+    def upsert(
+        self,
+        source: str,
+        items: Iterable[Tuple[str, Dict[str, Any]]],
+        existing: Set[str],
+        seen: Set[str]
+    ) -> Dict[str, int]:
+        """
+        Bir grup parçayı yazar; yalnızca yeni parçalar vektörlenir.
+
+        Args:
+            source (str): Döküman kaynağı
+            items (Iterable): (parça metni, metadata) çiftleri
+            existing (set): Kaynağın koleksiyondaki mevcut parça kimlikleri
+            seen (set): Bu yüklemede şimdiye kadar görülen kimlikler (güncellenir)
+
+        Returns:
+            Dict[str, int]: {"embedded": yeni, "reused": değişmeyen} parça sayıları
+        """
+        new_ids: List[str] = []
+        new_texts: List[str] = []
+        new_metadatas: List[Dict[str, Any]] = []
+        kept_ids: List[str] = []
+        kept_metadatas: List[Dict[str, Any]] = []
+
+        for text, metadata in items:
+            id_ = chunk_id(source, text)
+            # Döküman içinde tekrar eden parçalar bir kez saklanır
+            if id_ in seen:
+                continue
+            seen.add(id_)
+            if id_ in existing:
+                kept_ids.append(id_)
+                kept_metadatas.append(metadata)
+            else:
+                new_ids.append(id_)
+                new_texts.append(text)
+                new_metadatas.append(metadata)
+
+        if new_ids:
+            # Vektörleme ve yazma ayrı ölçülsün diye add_texts yerine iki adımda yapılır
+            with span("upload.embed"):
+                embeddings = self.vectorstore.embeddings.embed_documents(new_texts)
+            with span("upload.write"):
+                self.vectorstore._collection.add(
+                    ids=new_ids, embeddings=embeddings, metadatas=new_metadatas, documents=new_texts
+                )
+                if self.source_index is not None:
+                    self.source_index.add(source, new_ids)
+            if self.lexical_index is not None:
+                with span("upload.lexical_index"):
+                    self.lexical_index.add(zip(new_ids, new_texts))
+        if kept_ids:
+            # Değişmeyen parçaların yalnızca metadata'sı güncellenir (yeniden vektörlenmez)
+            self.vectorstore._collection.update(ids=kept_ids, metadatas=kept_metadatas)
+
+        return {"embedded": len(new_ids), "reused": len(kept_ids)}
+
+    def delete_stale(self, existing: Set[str], seen: Set[str]) -> int:
+        """Yeni sürümde bulunmayan parçaları siler."""
+        stale = list(existing - seen)
+        if stale:
+            self.vectorstore.delete(ids=stale)
+            if self.source_index is not None:
+                self.source_index.remove(stale)
+            if self.lexical_index is not None:
+                self.lexical_index.delete(stale)
+        return len(stale)
@@ -0,0 +1,12 @@
+"""
+Yükleme işi durumları.
+
+Sunucu (app.ingestion.jobs) ve API istemcisi (app.api_client) tarafından
+paylaşılır; istemcinin sunucu modüllerine bağımlı olmaması için başka
+hiçbir modülü içe aktarmaz.
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
@@ -0,0 +1,140 @@
+"""
+Çevrimdışı testler ve yük ölçümleri için sahte LLM.
+"""
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from typing import Any, AsyncIterator, Callable, List, Optional
+import asyncio
+import random
+import re
+import time
+
+
+class FakeLLMError(Exception):
+    """Sahte LLM'in enjekte ettiği upstream hatası (varsayılan 503, yeniden denenebilir)."""
+
+    def __init__(self, status_code: int = 503):
+        super().__init__(f"Sahte LLM hatası ({status_code})")
+        self.status_code = status_code
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Ağa çıkmadan yanıt üreten sohbet modeli.
+
+    Yanıt `responder(prompt)` ile üretilir; verilmezse `responses` listesi
+    sırayla döndürülür. `latency` her çağrıya eklenen gecikmedir (saniye),
+    `latency_jitter` buna eklenen rastgele [0, jitter) süredir. İlk
+    `fail_first` çağrı ve ardından `error_rate` olasılıkla her çağrı
+    `error_status` kodlu FakeLLMError fırlatır. Akış (astream) modunda yanıt
+    kelime kelime, parçalar arasında `token_delay` beklenerek üretilir;
+    ilk parçaya kadar geçen süre `latency`dir.
+    """
+
+    responses: List[str] = ["0"]
+    responder: Optional[Callable[[str], str]] = None
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    fail_first: int = 0
+    error_rate: float = 0.0
+    error_status: int = 503
+    token_delay: float = 0.0
+    seed: Optional[int] = None
+    rng: Any = None
+
+    # Ölçüm sayaçları
+    calls: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    errors: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if self.responder is not None:
+            return self.responder(prompt)
+        return self.responses[(self.calls - 1) % len(self.responses)]
+
+    def _enter(self) -> float:
+        """Çağrıyı sayar, gerekirse hata enjekte eder ve uygulanacak gecikmeyi döndürür."""
+        if self.rng is None:
+            self.rng = random.Random(self.seed)
+        self.calls += 1
+        if self.calls <= self.fail_first or self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise FakeLLMError(self.error_status)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return self.latency + self.rng.random() * self.latency_jitter
+
+    @staticmethod
+    def _result(text: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency = self._enter()
+        try:
+            if latency:
+                time.sleep(latency)
+            return self._result(self._respond(messages))
+        finally:
+            self.in_flight -= 1
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency = self._enter()
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+            return self._result(self._respond(messages))
+        finally:
+            self.in_flight -= 1
+
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        latency = self._enter()
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+            for i, token in enumerate(re.findall(r"\S+\s*", self._respond(messages))):
+                if i and self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        finally:
+            self.in_flight -= 1
+
+
+def fake_backend(**defaults) -> Callable[..., FakeChatModel]:
+    """
+    LLMRegistry için sahte backend fabrikası döndürür.
+
+    Args:
+        **defaults: Oluşturulacak her FakeChatModel'e verilecek alanlar
+
+    Returns:
+        Callable: (model, **options) -> FakeChatModel
+    """
+    def factory(model: str, **options) -> FakeChatModel:
+        return FakeChatModel(**defaults)
+    return factory
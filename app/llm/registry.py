@@ -0,0 +1,220 @@
+"""
+Süreç geneli LLM istemci kaydı.
+
+Her model için tek bir istemci oluşturulur ve tüm zincirler tarafından
+paylaşılır; böylece HTTP/gRPC bağlantıları istekler arasında yeniden
+kullanılır. Zincire özgü ayarlar (örn. sıcaklık) istemciye değil, çağrı
+anında `llm.bind(...)` ile uygulanır. Her model için bir zamanlayıcı (app.llm.scheduler) eşzamanlılığı,
+hız sınırını, zaman aşımlarını, yeniden denemeleri ve devre kesiciyi yönetir.
+Aynı anda gelen özdeş istekler (normalize edilmiş girdiler) tek bir upstream
+çağrısında birleştirilir.
+"""
+from langchain_core.prompts import PromptTemplate
+from app.config import GOOGLE_API_KEY, LLM_BACKEND, LLM_MAX_CONCURRENCY, LLM_SINGLE_FLIGHT
+from app.database.cache import normalize_text
+from app.llm.scheduler import LLMScheduler, PRIORITY_NORMAL
+from app.llm.singleflight import SingleFlight
+from app.metrics import LLM_TOKENS, span
+from app.tools.context_packer import estimate_tokens
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Hashable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain.chains import LLMChain
+
+
+def gemini_backend(model: str, **options):
+    """Google Gemini sohbet modeli oluşturur."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=GOOGLE_API_KEY,
+        # İstemci tüm zincirlerce paylaşıldığından sistem mesajları her zaman insan mesajına çevrilir
+        convert_system_message_to_human=True,
+        **options
+    )
+
+
+def _default_backend() -> Callable[..., Any]:
+    if LLM_BACKEND == "fake":
+        from app.llm.fake import fake_backend
+        return fake_backend()
+    return gemini_backend
+
+
+class LimitedChain:
+    """Bir LLMChain'i modelin zamanlayıcısı üzerinden çalıştırır."""
+
+    def __init__(
+        self,
+        chain: "LLMChain",
+        scheduler: LLMScheduler,
+        name: str = "",
+        single_flight: Optional[SingleFlight] = None
+    ):
+        """
+        Args:
+            chain (LLMChain): Çalıştırılacak zincir
+            scheduler (LLMScheduler): Modelin çağrı zamanlayıcısı
+            name (str): Birleştirme anahtarında kullanılan zincir adı
+            single_flight (SingleFlight): Verilirse özdeş istekler birleştirilir
+        """
+        self.chain = chain
+        self.scheduler = scheduler
+        self.name = name
+        self.single_flight = single_flight
+
+    def key(self, inputs: Dict[str, Any]) -> Hashable:
+        """Birleştirme anahtarı: zincir adı ve normalize edilmiş girdiler."""
+        return (self.name, tuple(sorted(
+            (name, normalize_text(value) if isinstance(value, str) else repr(value))
+            for name, value in inputs.items()
+        )))
+
+    async def _invoke(self, inputs: Dict[str, Any], priority: int) -> Dict[str, Any]:
+        result = await self.scheduler.submit(lambda: self.chain.ainvoke(inputs), priority)
+        # Yalnızca upstream çağrıları sayılır (birleştirilen çağrılar hariç)
+        output = result.get("text", "")
+        LLM_TOKENS.inc(estimate_tokens(self.chain.prompt.format(**inputs)), chain=self.name, kind="prompt")
+        LLM_TOKENS.inc(
+            estimate_tokens(", ".join(output) if isinstance(output, list) else str(output)),
+            chain=self.name, kind="completion"
+        )
+        return result
+
+    async def ainvoke(self, inputs: Dict[str, Any], priority: int = PRIORITY_NORMAL) -> Dict[str, Any]:
+        """
+        Zinciri çalıştırır; birleştirilen çağıranlar aynı sonuç sözlüğünü paylaşır.
+
+        Raises:
+            LLMUnavailableError: LLM kuyruk, hız sınırı veya devre kesici nedeniyle yanıt veremiyor
+        """
+        with span(f"llm.{self.name}"):
+            if self.single_flight is None:
+                return await self._invoke(inputs, priority)
+            return await self.single_flight.do(self.key(inputs), lambda: self._invoke(inputs, priority))
+
+    async def astream(self, inputs: Dict[str, Any], priority: int = PRIORITY_NORMAL) -> AsyncIterator[str]:
+        """
+        Modelin yanıtını üretildikçe metin parçaları halinde döndürür.
+
+        Akışlar birleştirilmez; her çağıran kendi upstream akışını alır.
+        """
+        prompt = self.chain.prompt.format_prompt(**inputs)
+        LLM_TOKENS.inc(estimate_tokens(prompt.to_string()), chain=self.name, kind="prompt")
+        parts = []
+        try:
+            async for chunk in self.scheduler.stream(lambda: self.chain.llm.astream(prompt), priority):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        finally:
+            if parts:
+                LLM_TOKENS.inc(estimate_tokens("".join(parts)), chain=self.name, kind="completion")
+
+
+class LLMRegistry:
+    def __init__(
+        self,
+        backend: Optional[Callable[..., Any]] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        single_flight: bool = LLM_SINGLE_FLIGHT,
+        **scheduler_options
+    ):
+        """
+        Args:
+            backend (Callable): (model, **options) -> LLM fabrikası
+            max_concurrency (int): Model başına en fazla eşzamanlı çağrı
+            single_flight (bool): Eşzamanlı özdeş istekleri tek çağrıda birleştir
+            **scheduler_options: Model zamanlayıcılarına iletilecek ayarlar (bkz. LLMScheduler)
+        """
+        self.backend = backend or _default_backend()
+        self.max_concurrency = max_concurrency
+        self._clients: Dict[str, Any] = {}
+        self.scheduler_options = scheduler_options
+        self._schedulers: Dict[str, LLMScheduler] = {}
+        self._chains: Dict[str, LimitedChain] = {}
+        self.single_flight = SingleFlight() if single_flight else None
+
+    def get_llm(self, model: str):
+        """Modelin paylaşılan istemcisini döndürür."""
+        if model not in self._clients:
+            self._clients[model] = self.backend(model)
+        return self._clients[model]
+
+    def scheduler(self, model: str) -> LLMScheduler:
+        """Modelin çağrı zamanlayıcısını döndürür."""
+        if model not in self._schedulers:
+            self._schedulers[model] = LLMScheduler(self.max_concurrency, **self.scheduler_options)
+        return self._schedulers[model]
+
+    def schedulers(self) -> Dict[str, LLMScheduler]:
+        """Oluşturulmuş model zamanlayıcıları (model -> zamanlayıcı)."""
+        return dict(self._schedulers)
+
+    def chain(
+        self,
+        name: str,
+        prompt: PromptTemplate,
+        model: str,
+        output_parser: Any = None,
+        **call_options
+    ) -> LimitedChain:
+        """
+        Adıyla önbelleğe alınmış zinciri döndürür, yoksa oluşturur.
+
+        Args:
+            name (str): Zincirin benzersiz adı (örn: "math", "keywords")
+            prompt (PromptTemplate): Zincirin prompt'u
+            model (str): Kullanılacak model adı
+            output_parser: İsteğe bağlı çıktı ayrıştırıcı
+            **call_options: Her çağrıda modele iletilecek seçenekler (istemci paylaşılır, ayarlar bağlanır)
+
+        Returns:
+            LimitedChain: Paylaşılan istemciyi kullanan zincir
+        """
+        if name not in self._chains:
+            # langchain.chains içe aktarması ağır olduğu için ilk zincirde yüklenir
+            from langchain.chains import LLMChain
+
+            llm = self.get_llm(model)
+            if call_options:
+                llm = llm.bind(**call_options)
+            chain_kwargs = {"llm": llm, "prompt": prompt}
+            if output_parser is not None:
+                chain_kwargs["output_parser"] = output_parser
+            self._chains[name] = LimitedChain(
+                LLMChain(**chain_kwargs), self.scheduler(model), name, self.single_flight
+            )
+        return self._chains[name]
+
+    def close(self) -> None:
+        self._chains.clear()
+        self._clients.clear()
+        self._schedulers.clear()
+
+
+_registry: Optional[LLMRegistry] = None
+
+
+def init_registry(backend: Optional[Callable[..., Any]] = None, **kwargs) -> LLMRegistry:
+    """Süreç geneli kaydı (yeniden) oluşturur."""
+    global _registry
+    if _registry is not None:
+        _registry.close()
+    _registry = LLMRegistry(backend, **kwargs)
+    return _registry
+
+
+def get_registry() -> LLMRegistry:
+    """Süreç geneli kaydı döndürür; henüz yoksa oluşturur."""
+    if _registry is None:
+        return init_registry()
+    return _registry
+
+
+def close_registry() -> None:
+    global _registry
+    if _registry is not None:
+        _registry.close()
+        _registry = None
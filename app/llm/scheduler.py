@@ -0,0 +1,399 @@
+"""
+LLM çağrı zamanlayıcısı.
+
+Her LLM çağrısı bu katmandan geçer:
+- Sınırlı öncelik kuyruğu: eşzamanlılık sınırı doluysa çağrılar önceliğe
+  göre sıralanır; kuyruk doluysa hemen reddedilir, kuyrukta bekleme süresi
+  aşılırsa çağrı upstream'e hiç gitmeden düşürülür.
+- Token bucket: dakikalık kotaya uygun hız sınırı (her deneme bir jeton).
+- Çağrı başına zaman aşımı ve yeniden denenebilir hatalarda (429, 5xx,
+  zaman aşımı, bağlantı hatası) jitter'lı üstel geri çekilme.
+- Devre kesici: art arda hatalardan sonra çağrılar bir süre upstream'e
+  gitmeden reddedilir; çağıran taraf yerel bir yedeğe düşebilir.
+"""
+from app.config import (
+    LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT_PER_MINUTE, LLM_RATE_LIMIT_BURST, LLM_QUEUE_SIZE,
+    LLM_QUEUE_TIMEOUT, LLM_CALL_TIMEOUT, LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX,
+    LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET
+)
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+# Öncelikler (küçük değer önce çalışır)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Devre kesici durumları
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# google.api_core ve benzeri istemcilerin geçici hata sınıfları
+RETRYABLE_ERRORS = {"ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "TooManyRequests"}
+
+
+class LLMUnavailableError(Exception):
+    """LLM şu anda yanıt veremiyor; çağıran yerel yedeğe düşebilir veya 503 dönebilir."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Devre açık: çağrı upstream'e gönderilmeden reddedildi."""
+
+
+class SchedulerBusyError(LLMUnavailableError):
+    """Bekleme kuyruğu dolu (geri basınç)."""
+
+
+class QueueDeadlineError(LLMUnavailableError):
+    """Çağrı kuyrukta izin verilen süreden fazla bekledi."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Hatanın (veya sebep zincirindeki bir hatanın) geçici olup olmadığını döndürür."""
+    while error is not None:
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+            return True
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS:
+            return True
+        if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+            return True
+        error = error.__cause__
+    return False
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate (float): Saniyede eklenen jeton (0 veya altı: sınırsız)
+            capacity (float): Biriktirilebilecek en fazla jeton (ani yük payı)
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def wait_time(self) -> float:
+        """Bir jeton için beklenmesi gereken süre (saniye)."""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        """Jeton alır; `deadline`e kadar alınamayacaksa QueueDeadlineError fırlatır."""
+        while True:
+            wait = self.wait_time()
+            if wait == 0:
+                if self.rate > 0:
+                    self.tokens -= 1
+                return
+            if deadline is not None and self.clock() + wait > deadline:
+                raise QueueDeadlineError("LLM hız sınırı nedeniyle bekleme süresi aşıldı", retry_after=wait)
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = LLM_BREAKER_THRESHOLD,
+        reset_timeout: float = LLM_BREAKER_RESET,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold (int): Devreyi açan art arda hata sayısı
+            reset_timeout (float): Açık devrenin deneme çağrısına izin vermeden önce beklediği süre
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        return max(self.reset_timeout - (self.clock() - self.opened_at), 0.0)
+
+    def is_open(self) -> bool:
+        """Devre açık ve bekleme süresi dolmamışsa True (durumu değiştirmez)."""
+        return self.state == OPEN and self.retry_after() > 0
+
+    def allow(self) -> bool:
+        """Çağrıya izin verilip verilmediğini döndürür; yarı açık durumda tek deneme çağrısı geçer."""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = self.clock()
+        self._probing = False
+
+    def release(self) -> None:
+        """Sonuçlanmadan biten (iptal edilen) deneme çağrısının yerini boşaltır."""
+        self._probing = False
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rate_per_minute: float = LLM_RATE_LIMIT_PER_MINUTE,
+        burst: int = LLM_RATE_LIMIT_BURST,
+        max_queue: int = LLM_QUEUE_SIZE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+        call_timeout: float = LLM_CALL_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        breaker: Optional[CircuitBreaker] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            max_concurrency (int): Aynı anda yürütülen en fazla çağrı
+            rate_per_minute (float): Dakikalık çağrı kotası (0: sınırsız)
+            burst (int): Token bucket kapasitesi
+            max_queue (int): Bekleyebilecek en fazla çağrı
+            queue_timeout (float): Kuyrukta (ve hız sınırında) en fazla bekleme süresi
+            call_timeout (float): Deneme başına zaman aşımı
+            max_retries (int): Geçici hatalarda en fazla yeniden deneme
+            backoff_base (float): Geri çekilme taban süresi
+            backoff_max (float): Geri çekilme üst sınırı
+            breaker (CircuitBreaker): Devre kesici (verilmezse varsayılan ayarlarla oluşturulur)
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.bucket = TokenBucket(rate_per_minute / 60, burst, clock)
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.running = 0
+        self.waiting = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "retries": 0, "timeouts": 0,
+            "rejected": 0, "expired": 0, "short_circuited": 0
+        }
+
+    def backoff(self, attempt: int) -> float:
+        """Tam jitter'lı üstel geri çekilme süresi."""
+        return self.rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_NORMAL,
+        queue_timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Çağrıyı sıraya alır, sırası gelince hız sınırı ve yeniden deneme politikasıyla çalıştırır.
+
+        Args:
+            call (Callable): Her denemede yeni bir coroutine üreten fabrika
+            priority (int): Küçük değer önce çalışır (PRIORITY_HIGH/NORMAL/LOW)
+            queue_timeout (float): Bu çağrı için kuyrukta bekleme sınırı
+
+        Returns:
+            Any: Çağrının sonucu
+
+        Raises:
+            LLMUnavailableError: Devre açık, kuyruk dolu, bekleme süresi aşıldı veya denemeler tükendi
+        """
+        deadline = await self._admit(priority, queue_timeout)
+        try:
+            return await self._run(call, deadline)
+        finally:
+            self._release()
+
+    async def stream(
+        self,
+        call: Callable[[], AsyncIterator[Any]],
+        priority: int = PRIORITY_NORMAL,
+        queue_timeout: Optional[float] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Akış üreten çağrıyı `submit` ile aynı politikalarla çalıştırır.
+
+        Zaman aşımı ilk parçaya ve parçalar arasındaki beklemeye ayrı ayrı
+        uygulanır. Yeniden deneme yalnızca ilk parça gelmeden önce yapılır;
+        akış başladıktan sonraki hata çağırana iletilir.
+
+        Args:
+            call (Callable): Her denemede yeni bir async iterator üreten fabrika
+            priority (int): Küçük değer önce çalışır
+            queue_timeout (float): Bu çağrı için kuyrukta bekleme sınırı
+
+        Yields:
+            Any: Upstream'den gelen parçalar
+        """
+        deadline = await self._admit(priority, queue_timeout)
+        try:
+            attempt = 0
+            while True:
+                await self._begin_attempt(attempt, deadline)
+                iterator = call().__aiter__()
+                started = False
+                try:
+                    while True:
+                        try:
+                            item = await asyncio.wait_for(iterator.__anext__(), self.call_timeout)
+                        except StopAsyncIteration:
+                            break
+                        started = True
+                        yield item
+                except Exception as e:
+                    if started and is_retryable(e):
+                        self.breaker.record_failure()
+                        self.stats["failed"] += 1
+                        raise LLMUnavailableError(f"LLM akışı yarıda kesildi: {e!r}") from e
+                    await asyncio.sleep(self._on_error(e, attempt))
+                    attempt += 1
+                    continue
+                except BaseException:
+                    self.breaker.release()
+                    raise
+                finally:
+                    aclose = getattr(iterator, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+                self.breaker.record_success()
+                self.stats["completed"] += 1
+                return
+        finally:
+            self._release()
+
+    async def _admit(self, priority: int, queue_timeout: Optional[float]) -> float:
+        """Devre açık değilse çağrıyı kuyruğa alır ve sıra gelince kuyruk son tarihini döndürür."""
+        self.stats["submitted"] += 1
+        if self.breaker.is_open():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError("LLM devresi açık", retry_after=self.breaker.retry_after())
+
+        deadline = self.clock() + (self.queue_timeout if queue_timeout is None else queue_timeout)
+        await self._acquire_slot(priority, deadline)
+        return deadline
+
+    async def _acquire_slot(self, priority: int, deadline: float) -> None:
+        if self.waiting >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise SchedulerBusyError("LLM kuyruğu dolu", retry_after=max(self.queue_timeout, 1.0))
+
+        turn = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), turn))
+        self.waiting += 1
+        try:
+            self._dispatch()
+            await asyncio.wait_for(turn, max(deadline - self.clock(), 0))
+        except asyncio.TimeoutError:
+            self.stats["expired"] += 1
+            raise QueueDeadlineError("LLM kuyruğunda bekleme süresi aşıldı", retry_after=1.0) from None
+        except BaseException:
+            # Sıra tam iptal anında verildiyse yeri bir sonrakine bırak
+            if turn.done() and not turn.cancelled():
+                self._release()
+            raise
+        finally:
+            self.waiting -= 1
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.running < self.max_concurrency and self._queue:
+            _, _, turn = heapq.heappop(self._queue)
+            # Süresi dolan veya iptal edilen bekleyenler atlanır
+            if turn.done():
+                continue
+            self.running += 1
+            turn.set_result(None)
+
+    async def _run(self, call: Callable[[], Awaitable[Any]], deadline: float) -> Any:
+        attempt = 0
+        while True:
+            await self._begin_attempt(attempt, deadline)
+            try:
+                result = await asyncio.wait_for(call(), self.call_timeout)
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self.stats["completed"] += 1
+            return result
+
+    async def _begin_attempt(self, attempt: int, deadline: float) -> None:
+        # Hız sınırı beklemesi ilk denemede kuyruk süresine dahildir
+        await self.bucket.acquire(deadline if attempt == 0 else None)
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError("LLM devresi açık", retry_after=self.breaker.retry_after())
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        """Başarısız denemeyi kaydeder; yeniden denenecekse geri çekilme süresini döndürür, değilse fırlatır."""
+        if not is_retryable(error):
+            # Upstream yanıt verdi (örn: geçersiz çıktı); devre açısından başarılı sayılır
+            self.breaker.record_success()
+            self.stats["failed"] += 1
+            raise error
+        self.breaker.record_failure()
+        if isinstance(error, asyncio.TimeoutError):
+            self.stats["timeouts"] += 1
+        if attempt >= self.max_retries or self.breaker.state == OPEN:
+            self.stats["failed"] += 1
+            raise LLMUnavailableError(
+                f"LLM çağrısı {attempt + 1} denemede başarısız oldu: {error!r}",
+                retry_after=max(self.breaker.retry_after(), 1.0)
+            ) from error
+        self.stats["retries"] += 1
+        return self.backoff(attempt)
+
+    def snapshot(self) -> dict:
+        """Anlık kuyruk, devre ve sayaç durumu."""
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "circuit": self.breaker.state,
+            **self.stats,
+        }
@@ -0,0 +1,66 @@
+"""
+Eşzamanlı özdeş çağrıların birleştirilmesi (single-flight).
+
+Aynı anahtarla devam eden bir çağrı varsa yeni çağıran ayrı bir upstream
+isteği başlatmaz, mevcut çağrının sonucunu bekler. Upstream çağrısı ayrı
+bir görevde yürür: bekleyenlerden biri iptal edilirse diğerleri etkilenmez,
+yalnızca son bekleyen de ayrıldığında upstream çağrısı iptal edilir. Hata
+tüm bekleyenlere iletilir ve sonuç saklanmaz; sonraki çağrı yeniden dener.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        # upstream: başlatılan çağrılar, coalesced: mevcut çağrıya katılanlar
+        self.stats = {"upstream": 0, "coalesced": 0}
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        `key` için devam eden çağrıya katılır, yoksa `call()` ile başlatır.
+
+        Args:
+            key (Hashable): Özdeş istekleri tanımlayan anahtar
+            call (Callable): Upstream çağrısını yapan coroutine fabrikası
+
+        Returns:
+            Any: Paylaşılan çağrının sonucu (bekleyenler aynı nesneyi alır)
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["upstream"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Kimse sonucu beklemiyorsa upstream çağrısını boşuna sürdürme
+            if self._tasks.get(key) is task and self._waiters[key] == 1:
+                task.cancel()
+                # Yeni gelen çağıranlar iptal edilen göreve değil yeni bir çağrıya katılmalı
+                del self._tasks[key]
+                del self._waiters[key]
+            raise
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+        # Bekleyenlerin tamamı iptal edildiyse "exception was never retrieved" uyarısını önle
+        if not task.cancelled():
+            task.exception()
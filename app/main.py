@@ -1,24 +1,52 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, constr
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, constr, conlist, model_validator
 from app.tools.math_operations import MathOperations
-from typing import List, Dict, Any
-import chromadb
-from chromadb.db.base import UniqueConstraintError
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.vectorstores import Chroma
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.llm.registry import LimitedChain, init_registry, get_registry, close_registry
+from app.llm.scheduler import LLMUnavailableError, CLOSED as CIRCUIT_CLOSED, HALF_OPEN as CIRCUIT_HALF_OPEN, OPEN as CIRCUIT_OPEN
+from app.database.cache import (
+    CACHE_HEADER, CACHE_HIT, CACHE_MISS, init_cache, get_cache, close_cache, normalize_text
+)
+from app.database.metadata_index import build_where, strip_source, exact_search
+from app.database.vector_store import VectorStore
+from app.database.bm25_index import reciprocal_rank_fusion
+from app.tools.embedding_batcher import EmbeddingBatcher
+from app.tools.keyword_extractor import KeywordExtractor, SOURCE_LOCAL, SOURCE_LLM
+from app.tools.context_packer import pack_context, format_context
+from app.tools.snippets import make_snippet, query_pattern
+from app.metrics import (
+    MetricsMiddleware, Counter, Gauge, Histogram, SIZE_BUCKETS, CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    registry as metrics_registry, span, record
+)
+from app.ingestion.jobs import IngestionJob, IngestionQueue, QueueFullError, spool_to_tempfile
+from app.ingestion.chunker import SentenceChunker
+from app.ingestion.pipeline import iter_batches, timed
+from app.ingestion.versioning import chunk_id, source_lock
+from app.ingestion.parallel import iter_document_pages, shutdown_process_pool
+from app.resources import (
+    get_embeddings, get_vectorstore, get_source_index, get_bm25_index, get_document_index,
+    warmup, warmup_status, loaded
+)
+from app.config import (
+    LLM_MODEL, MATH_BATCH_MAX_EXPRESSIONS, MATH_BATCH_MAX_VALUES, MATH_BATCH_MAX_RESULTS, EMBED_BATCH_SIZE, SEARCH_BATCH_MAX_QUERIES, LOCAL_FILTER_MAX_CANDIDATES,
+    HYBRID_CANDIDATES, RRF_K, ASK_TOP_K, ASK_CONTEXT_TOKENS, CHUNK_SIZE, CHUNK_OVERLAP, SEARCH_SNIPPET_LENGTH,
+    SEARCH_MAX_DEPTH
+)
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Literal, Optional, Tuple, Union
+from datetime import datetime
 from langchain.schema import Document
 from langchain_core.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from langchain.output_parsers import CommaSeparatedListOutputParser
+import asyncio
+import base64
+import hashlib
+import json
 import os
 from dotenv import load_dotenv
-import pdfplumber
-from io import BytesIO
-import re
+import time
 
 # .env dosyasını yükle
 load_dotenv()
@@ -26,13 +54,40 @@ load_dotenv()
 # Response modelleri
 class MathResponse(BaseModel):
     result: float = Field(description="İşlemin sonucu")
+    source: str = Field(description="Sonucu üreten yol: yerel motor (local) veya LLM (llm)")
+
+class MathBatchItem(BaseModel):
+    expression: str = Field(description="Hesaplanan ifade")
+    results: List[Optional[float]] = Field(description="Değer sırasıyla sonuçlar; hatalı elemanlar için null")
+    errors: List[Dict[str, Any]] = Field(description="Hatalı elemanlar: {index, error}")
+    error: Optional[str] = Field(default=None, description="İfade yerel motorla hesaplanamıyorsa hata mesajı")
+
+class MathBatchResponse(BaseModel):
+    items: List[MathBatchItem] = Field(description="İfade sırasıyla sonuçlar")
+    size: int = Field(description="İfade başına hesaplanan eleman sayısı")
 
 class VectorSearchResponse(BaseModel):
-    results: List[Dict[str, Any]] = Field(description="Arama sonuçları")
+    results: List[Dict[str, Any]] = Field(description="Arama sonuçları (alanlar isteğin include seçimine göre)")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Arama yollarının süreleri (ms)")
+    next_cursor: Optional[str] = Field(default=None, description="Sonraki sayfa için cursor (son sayfada yok)")
+
+class JobResponse(BaseModel):
+    job_id: str = Field(description="İş kimliği")
+    filename: str = Field(description="Dosya adı")
+    content_hash: str = Field(description="Dosya içeriğinin sha256 özeti")
+    status: str = Field(description="İş durumu: queued, running, completed, failed")
+    progress: Dict[str, int] = Field(description="İşlenen sayfa, parça ve embedding sayıları")
+    timings: Dict[str, float] = Field(description="Aşama süreleri (saniye)")
+    result: Dict[str, Any] = Field(description="İş sonucu")
+    error: Optional[str] = Field(default=None, description="Hata mesajı")
+
+class BatchSearchResponse(BaseModel):
+    results: List[VectorSearchResponse] = Field(description="Sorgu sırasıyla arama sonuçları")
 
 class KeywordResponse(BaseModel):
     keywords: List[str] = Field(description="Çıkarılan anahtar kelimeler")
     total_keywords: int = Field(description="Toplam anahtar kelime sayısı")
+    source: str = Field(description="Sonucu üreten yol: yerel çıkarıcı (local) veya LLM (llm)")
 
 # Input modelleri
 class MathOperation(BaseModel):
@@ -41,54 +96,322 @@ class MathOperation(BaseModel):
         examples=["3 * 4 + 2", "sqrt(16) + 5", "(15 + 3) * 2"]
     )
 
+class MathBatchRequest(BaseModel):
+    expression: Optional[str] = Field(
+        default=None, description="Değişkenlerin her değeri için hesaplanacak ifade", examples=["sin(x) * 2 + log(y)"]
+    )
+    expressions: Optional[List[str]] = Field(
+        default=None,
+        min_length=1,
+        max_length=MATH_BATCH_MAX_EXPRESSIONS,
+        description="Aynı değişkenler üzerinde hesaplanacak ifadeler"
+    )
+    variables: Dict[str, conlist(float, min_length=1, max_length=MATH_BATCH_MAX_VALUES)] = Field(
+        default_factory=dict,
+        description="Değişken adı -> değerler (hepsi aynı uzunlukta)",
+        examples=[{"x": [0, 30, 90], "y": [1, 10, 100]}]
+    )
+
+    @model_validator(mode="after")
+    def one_of_expression_or_expressions(self):
+        if (self.expression is None) == (self.expressions is None):
+            raise ValueError("expression veya expressions alanlarından yalnızca biri verilmeli")
+        return self
+
+    def all_expressions(self) -> List[str]:
+        return [self.expression] if self.expression is not None else self.expressions
+
+class SearchFilter(BaseModel):
+    source: Optional[Union[str, List[str]]] = Field(default=None, description="Kaynak dosya adı veya adları")
+    type: Optional[str] = Field(default=None, description="İçerik türü (örn: application/pdf)")
+    min_size: Optional[int] = Field(default=None, description="En küçük dosya boyutu (bayt)")
+    max_size: Optional[int] = Field(default=None, description="En büyük dosya boyutu (bayt)")
+    uploaded_after: Optional[datetime] = Field(default=None, description="Bu tarihten sonra yüklenenler")
+    uploaded_before: Optional[datetime] = Field(default=None, description="Bu tarihten önce yüklenenler")
+    page_min: Optional[int] = Field(default=None, description="En küçük sayfa numarası")
+    page_max: Optional[int] = Field(default=None, description="En büyük sayfa numarası")
+
+    def to_where(self) -> Optional[Dict[str, Any]]:
+        """Filtreyi Chroma where ifadesine çevirir."""
+        filters = self.model_dump(exclude_none=True)
+        for key in ("uploaded_after", "uploaded_before"):
+            if key in filters:
+                filters[key] = int(filters[key].timestamp())
+        return build_where(filters)
+
 class SearchRequest(BaseModel):
     query: str = Field(description="Arama sorgusu")
     top_k: int = Field(default=5, description="Döndürülecek sonuç sayısı")
+    filters: Optional[SearchFilter] = Field(default=None, description="Metadata filtreleri")
+    mode: Literal["vector", "lexical", "hybrid"] = Field(
+        default="vector",
+        description="Arama yolu: vektör, sözcük tabanlı (BM25) veya ikisinin RRF ile birleşimi"
+    )
+    include: List[Literal["content", "snippet", "metadata"]] = Field(
+        default=["content", "metadata"],
+        description="Sonuçlarda döndürülecek alanlar; id ve similarity her zaman döner (boş liste: yalnızca id ve skor)"
+    )
+    metadata_fields: Optional[List[str]] = Field(
+        default=None, description="metadata içinde döndürülecek anahtarlar (örn: source, page; varsayılan: tümü)"
+    )
+    snippet_length: int = Field(
+        default=SEARCH_SNIPPET_LENGTH, ge=20, le=2000, description="Sorgu merkezli alıntının en büyük uzunluğu"
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Önceki yanıttaki next_cursor; aynı istekle sonraki top_k sonucu sorguyu yeniden vektörlemeden getirir"
+    )
+
+class BatchSearchRequest(BaseModel):
+    queries: List[SearchRequest] = Field(
+        min_length=1,
+        max_length=SEARCH_BATCH_MAX_QUERIES,
+        description="Arama sorguları (her biri kendi top_k değeriyle)"
+    )
 
 class KeywordRequest(BaseModel):
     text: constr(min_length=10) = Field(description="Anahtar kelime çıkarılacak metin")
     num_keywords: int = Field(default=5, ge=1, le=10, description="Çıkarılacak anahtar kelime sayısı")
+    mode: Literal["fast", "llm", "auto"] = Field(
+        default="llm",
+        description="fast: yerel istatistiksel çıkarıcı, llm: Gemini, auto: kısa veya belirsiz metinlerde LLM"
+    )
 
-def clean_text(text: str) -> str:
-    """Metni temizler ve düzenler."""
-    # Gereksiz boşlukları temizle
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Özel karakterleri temizle
-    text = re.sub(r'[^\w\s\.,;!?-]', '', text)
-    
-    # Unicode escape karakterlerini temizle
-    text = text.encode('utf-8', 'ignore').decode('utf-8')
-    
-    return text.strip()
+class AskRequest(BaseModel):
+    question: constr(min_length=3) = Field(description="Yüklenen dökümanlara sorulacak soru")
+    top_k: int = Field(default=ASK_TOP_K, ge=1, le=50, description="Bağlam için getirilecek parça sayısı")
+    filters: Optional[SearchFilter] = Field(default=None, description="Metadata filtreleri")
+    mode: Literal["vector", "lexical", "hybrid"] = Field(default="vector", description="Arama yolu")
+    max_context_tokens: int = Field(
+        default=ASK_CONTEXT_TOKENS, ge=100, le=32000, description="Bağlam için token bütçesi"
+    )
 
-# Embedding modeli
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-)
+# Eşzamanlı arama sorgularını tek embedding çağrısında toplar
+query_batcher = EmbeddingBatcher(lambda texts: get_embeddings().embed_documents(texts))
 
-# Vektör veritabanı
-vectorstore = Chroma(
-    persist_directory="chroma_db",
-    embedding_function=embeddings,
-    collection_name="documents"
-)
+def search_by_vector(
+    vector: List[float],
+    k: int,
+    filters: Optional[SearchFilter] = None,
+    collection_version: Optional[int] = None
+) -> List[Tuple[Document, float]]:
+    """
+    Hazır sorgu vektörüyle arama yapar, (döküman, benzerlik) çiftleri döndürür.
 
-# Text splitter
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1000,
-    chunk_overlap=200,
-    length_function=len,
-)
+    Kaynak indeksi yalnızca `collection_version` sürümünü yansıtıyorsa kullanılır;
+    aksi halde kaynak filtresi Chroma'ya `where` olarak iletilir.
+    """
+    where = filters.to_where() if filters else None
+    vectorstore = get_vectorstore()
+    source_index = get_source_index()
+    relevance = vectorstore._select_relevance_score_fn()
 
-# LLM modelini başlat
-llm = ChatGoogleGenerativeAI(
-    model="gemini-pro",
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    convert_system_message_to_human=True
-)
+    # Kaynak filtresi az sayıda parçaya iniyorsa yalnızca onları skorla (NumPy deposu zaten tam arar)
+    if (
+        filters and filters.source and source_index.is_current(collection_version)
+        and not isinstance(vectorstore, VectorStore)
+    ):
+        sources = filters.source if isinstance(filters.source, list) else [filters.source]
+        candidates = source_index.candidates(sources)
+        if len(candidates) <= LOCAL_FILTER_MAX_CANDIDATES:
+            return [
+                (Document(page_content=text, metadata=metadata), relevance(distance))
+                for text, metadata, distance in exact_search(
+                    vectorstore, vector, candidates, k, strip_source(where)
+                )
+            ]
 
-# Anahtar kelime çıkarma için prompt template ve chain
+    results = vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=k, filter=where)
+    return [(doc, relevance(distance)) for doc, distance in results]
+
+def search_by_vectors(vectors: List[List[float]], ks: List[int]) -> List[List[Tuple[Document, float]]]:
+    """Tüm sorgu vektörleriyle tek bir koleksiyon sorgusu yapar, sonuçları sorgu sırasıyla döndürür."""
+    found = get_vectorstore()._collection.query(
+        query_embeddings=vectors,
+        n_results=max(ks),
+        include=["documents", "metadatas", "distances"]
+    )
+    relevance = get_vectorstore()._select_relevance_score_fn()
+    return [
+        [
+            (Document(page_content=text, metadata=metadata or {}), relevance(distance))
+            for text, metadata, distance in list(zip(texts, metadatas, distances))[:k]
+        ]
+        for texts, metadatas, distances, k in zip(
+            found["documents"], found["metadatas"], found["distances"], ks
+        )
+    ]
+
+def search_lexical(
+    query: str,
+    k: int,
+    filters: Optional[SearchFilter] = None
+) -> List[Tuple[Document, float]]:
+    """BM25 indeksiyle arama yapar, (döküman, BM25 skoru) çiftleri döndürür."""
+    where = filters.to_where() if filters else None
+    # Filtre varsa fazladan aday alınıp koleksiyonda süzülür
+    hits = get_bm25_index().search(query, k if where is None else max(10 * k, 100))
+    if not hits:
+        return []
+
+    found = get_vectorstore()._collection.get(
+        ids=[id_ for id_, _ in hits],
+        where=where,
+        include=["documents", "metadatas"]
+    )
+    documents = {
+        id_: Document(page_content=text, metadata=metadata or {})
+        for id_, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+    }
+    return [(documents[id_], score) for id_, score in hits if id_ in documents][:k]
+
+def result_key(doc: Document) -> str:
+    """İki yoldan gelen aynı parçayı eşleştirmek için içerik tabanlı anahtar."""
+    return chunk_id(doc.metadata.get("source", ""), doc.page_content)
+
+def elapsed_ms(start: float) -> float:
+    return round(1000 * (time.perf_counter() - start), 3)
+
+async def source_filter_version(request: SearchRequest) -> Optional[int]:
+    """Kaynak filtreli vektör aramalarında kaynak indeksinin güncelliği için koleksiyon sürümü."""
+    if request.mode == "lexical" or request.filters is None or not request.filters.source:
+        return None
+    version = await get_cache().collection_version()
+    return version if version >= 0 else None
+
+def run_search(
+    request: SearchRequest,
+    vector: Optional[List[float]] = None,
+    collection_version: Optional[int] = None
+) -> Tuple[List[Tuple[Document, float]], Dict[str, float]]:
+    """
+    İstenen yolla (vector, lexical, hybrid) arama yapar.
+
+    Args:
+        request (SearchRequest): Arama isteği
+        vector (List[float]): Sorgu vektörü (lexical modda gerekmez)
+        collection_version (int): Güncel koleksiyon sürümü (bkz. source_filter_version)
+
+    Returns:
+        Tuple: (döküman, skor) çiftleri ve yol başına süreler (ms)
+    """
+    timings: Dict[str, float] = {}
+    if request.mode == "vector":
+        with span("search.vector") as stage:
+            results = search_by_vector(vector, request.top_k, request.filters, collection_version)
+        timings["vector"] = stage.ms
+        return results, timings
+    if request.mode == "lexical":
+        with span("search.lexical") as stage:
+            results = search_lexical(request.query, request.top_k, request.filters)
+        timings["lexical"] = stage.ms
+        return results, timings
+
+    # Hibrit: iki yolun aday listeleri sıralamaya göre birleştirilir
+    depth = max(request.top_k, HYBRID_CANDIDATES)
+    with span("search.vector") as stage:
+        vector_results = search_by_vector(vector, depth, request.filters, collection_version)
+    timings["vector"] = stage.ms
+    with span("search.lexical") as stage:
+        lexical_results = search_lexical(request.query, depth, request.filters)
+    timings["lexical"] = stage.ms
+
+    with span("search.fusion") as stage:
+        documents = {result_key(doc): doc for doc, _ in lexical_results + vector_results}
+        fused = reciprocal_rank_fusion(
+            [[result_key(doc) for doc, _ in vector_results], [result_key(doc) for doc, _ in lexical_results]],
+            k=RRF_K
+        )
+        results = [(documents[key], score) for key, score in fused[:request.top_k]]
+    timings["fusion"] = stage.ms
+    return results, timings
+
+def format_results(results: List[Tuple[Document, float]]) -> List[Dict[str, Any]]:
+    """Arama sonuçlarını yanıt biçimine çevirir."""
+    return [
+        {
+            "id": doc.metadata.get("chunk", ""),
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "similarity": float(score)
+        } for doc, score in results
+    ]
+
+def project_results(results: List[Dict[str, Any]], request: SearchRequest) -> List[Dict[str, Any]]:
+    """Biçimlenmiş sonuçlardan yalnızca istenen alanları (include, metadata_fields) bırakır."""
+    pattern = query_pattern(request.query) if "snippet" in request.include else None
+    projected = []
+    for result in results:
+        item = {"id": result["id"], "similarity": result["similarity"]}
+        if "content" in request.include:
+            item["content"] = result["content"]
+        if "snippet" in request.include:
+            item["snippet"] = make_snippet(result["content"], pattern, request.snippet_length)
+        if "metadata" in request.include:
+            metadata = result["metadata"]
+            if request.metadata_fields is not None:
+                metadata = {key: metadata[key] for key in request.metadata_fields if key in metadata}
+            item["metadata"] = metadata
+        projected.append(item)
+    return projected
+
+def search_fields(request: SearchRequest) -> Dict[str, Any]:
+    """Sonuç kümesini belirleyen (sayfadan bağımsız) istek alanları."""
+    return {
+        "query": normalize_text(request.query),
+        "mode": request.mode,
+        "filters": request.filters.model_dump(mode="json", exclude_none=True) if request.filters else None
+    }
+
+def search_fingerprint(request: SearchRequest) -> str:
+    body = json.dumps(search_fields(request), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+
+def encode_cursor(fingerprint: str, offset: int) -> str:
+    raw = json.dumps({"q": fingerprint, "o": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """
+    Cursor'daki sonuç ofsetini döndürür.
+
+    Raises:
+        ValueError: Cursor bozuksa, başka bir sorguya aitse veya SEARCH_MAX_DEPTH'i aşıyorsa
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        query, offset = payload["q"], int(payload["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Geçersiz cursor") from e
+    if query != fingerprint:
+        raise ValueError("Cursor başka bir arama isteğine ait")
+    if not 0 < offset < SEARCH_MAX_DEPTH:
+        raise ValueError("Geçersiz cursor")
+    return offset
+
+def search_response(
+    request: SearchRequest,
+    page: Dict[str, Any],
+    timings: Dict[str, float],
+    offset: int = 0,
+    headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    """
+    Sonuç sayfasını istenen alanlarla orjson yanıtına çevirir.
+
+    response_model doğrulaması atlanır; serileştirme süresi "search.serialize"
+    aşaması olarak ölçülür.
+    """
+    with span("search.serialize"):
+        body = {"results": project_results(page["results"], request), "timings": timings}
+        if page.get("has_more") and offset + request.top_k < SEARCH_MAX_DEPTH:
+            body["next_cursor"] = encode_cursor(search_fingerprint(request), offset + request.top_k)
+        return ORJSONResponse(body, headers=headers)
+
+# Text splitter (cümle sınırlarında böler, parçaların kaynak ofsetlerini tutar)
+text_splitter = SentenceChunker(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+# Anahtar kelime çıkarma için prompt template
 keyword_prompt = PromptTemplate(
     input_variables=["text", "num_keywords"],
     template="""Aşağıdaki metinden tam olarak {num_keywords} adet anahtar kelime çıkar.
@@ -101,31 +424,154 @@ keyword_prompt = PromptTemplate(
     """
 )
 
-keyword_chain = LLMChain(
-    llm=llm,
-    prompt=keyword_prompt,
-    output_parser=CommaSeparatedListOutputParser()
+def get_keyword_chain() -> LimitedChain:
+    """Paylaşılan LLM istemcisini kullanan anahtar kelime zincirini döndürür."""
+    return get_registry().chain(
+        "keywords",
+        keyword_prompt,
+        model=LLM_MODEL,
+        output_parser=CommaSeparatedListOutputParser()
+    )
+
+# Soru-cevap için prompt template
+ask_prompt = PromptTemplate(
+    input_variables=["context", "question"],
+    template="""Aşağıdaki kaynaklara dayanarak soruyu yanıtla.
+    Yalnızca kaynaklardaki bilgileri kullan ve kullandığın kaynakları [1], [2] biçiminde belirt.
+    Kaynaklarda yanıt yoksa bunu açıkça söyle.
+
+    Kaynaklar:
+    {context}
+
+    Soru: {question}
+    Yanıt:"""
 )
 
-def extract_text_from_file(file: UploadFile) -> str:
-    """Dosyadan metin çıkarır."""
-    content = file.file.read()
-    
-    if file.filename.lower().endswith('.pdf'):
-        # PDF dosyası
-        with pdfplumber.open(BytesIO(content)) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        return clean_text(text)
-    else:
-        # Metin dosyası
-        return clean_text(content.decode('utf-8'))
+# Bağlam bulunamadığında LLM çağrılmadan dönen yanıt
+NO_CONTEXT_ANSWER = "Yüklenen dökümanlarda bu soruyla ilgili bilgi bulunamadı."
+
+def get_ask_chain() -> LimitedChain:
+    """Paylaşılan LLM istemcisini kullanan soru-cevap zincirini döndürür."""
+    return get_registry().chain(
+        "ask",
+        ask_prompt,
+        model=LLM_MODEL
+    )
+
+def sse_event(event: str, data: Any) -> str:
+    """Server-Sent Events biçiminde tek bir olay."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def corpus_document_frequencies(terms: List[str]) -> Tuple[Dict[str, int], int]:
+    """Yüklenen koleksiyondaki doküman sıklıkları (BM25 indeksinden)."""
+    index = get_bm25_index()
+    return index.document_frequencies(terms), len(index)
+
+# Yerel anahtar kelime çıkarıcı (fast/auto modları)
+keyword_extractor = KeywordExtractor(document_frequencies=corpus_document_frequencies)
+
+# Matematik işlemleri (LLM zinciri paylaşılan kayıttan alınır)
+math_operations = MathOperations()
+
+def process_document(job: IngestionJob) -> Dict[str, Any]:
+    """
+    Kuyruktaki bir dökümanı akış halinde işler (işçi thread'inde çalışır).
+
+    Parça kimlikleri içerikten türetildiği için yalnızca yeni parçalar
+    vektörlenir; yeni sürümde bulunmayan eski parçalar silinir.
+    """
+    source = job.filename
+
+    # Metadata hazırla
+    metadata = {
+        "source": source,
+        "type": job.content_type,
+        "size": os.path.getsize(job.path),
+        "doc_hash": job.content_hash,
+        "uploaded_at": int(job.created_at)
+    }
+
+    document_index = get_document_index()
+    with source_lock(source):
+        document_index.begin_version(source)
+        existing = set(document_index.chunks(source))
+        seen: set = set()
+        reused = 0
+
+        # Sayfaları tembel oku (büyük PDF'lerde paralel), tek geçişte temizle ve parçala
+        pages = timed(iter_document_pages(job.path, source, job.progress, clean=False), job.timings, "extract")
+        chunks = timed(text_splitter.iter_chunks(pages), job.timings, "split")
+
+        # Parçaları sabit boyutlu gruplar halinde vektör veritabanına yaz
+        for batch in iter_batches(chunks, EMBED_BATCH_SIZE):
+            items = [
+                (chunk.text, {
+                    **metadata, "chunk": job.progress["chunks"] + i, "page": chunk.page,
+                    "start": chunk.start, "end": chunk.end
+                })
+                for i, chunk in enumerate(batch)
+            ]
+            job.progress["chunks"] += len(items)
+
+            start = time.perf_counter()
+            counts = document_index.upsert(source, items, existing, seen)
+            job.timings["embed"] = job.timings.get("embed", 0.0) + time.perf_counter() - start
+            job.progress["embedded"] += counts["embedded"]
+            reused += counts["reused"]
+
+        # Eski sürümden kalan parçaları sil
+        deleted = document_index.delete_stale(existing, seen)
+        document_index.commit_version(source, job.content_hash)
+
+    # "split" süresi çıkarma süresini de kapsar
+    job.timings["split"] -= job.timings["extract"]
+    for stage in ("extract", "split"):
+        record(f"upload.{stage}", job.timings[stage])
+    for stage in job.timings:
+        job.timings[stage] = round(job.timings[stage], 4)
+
+    return {
+        "chunks": job.progress["chunks"],
+        "embedded": job.progress["embedded"],
+        "reused": reused,
+        "deleted": deleted
+    }
+
+async def on_document_ingested(job: IngestionJob) -> None:
+    # Koleksiyon değişti, arama önbelleğini geçersiz kıl
+    version = await get_cache().invalidate_collection()
+    # Yazmalar kaynak indeksine bu süreçte işlendi; arada başka yazma yoksa indeks güncel kalır
+    if version is not None:
+        get_source_index().advance(version - 1, version)
+
+# Döküman yükleme kuyruğu
+ingestion_queue = IngestionQueue(process_document, on_complete=on_document_ingested)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # LLM istemcilerini süreç başında bir kez oluştur ve ısıt
+    init_registry()
+    math_operations.chain
+    get_keyword_chain()
+    init_cache()
+    # Model ve indeksler arka planda ısıtılır; /health/ready o zamana kadar 503 döner.
+    # Kaynak indeksi, yüklemeden önce okunan koleksiyon sürümüyle etiketlenir
+    version = await get_cache().collection_version()
+    warmup_task = asyncio.create_task(run_in_threadpool(warmup, version if version >= 0 else None))
+    ingestion_queue.start()
+    yield
+    warmup_task.cancel()
+    await ingestion_queue.stop()
+    shutdown_process_pool()
+    close_registry()
+    await close_cache()
 
 app = FastAPI(
     title="AI Tool API",
     description="Bu API, LangChain ve Google Gemini AI ile güçlendirilmiş yapay zeka tabanlı araçlar sunan bir REST servisidir.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS ayarları
@@ -136,6 +582,90 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Aşama süreleri ve istek metrikleri (Server-Timing başlığı)
+app.add_middleware(MetricsMiddleware)
+
+@app.get(
+    "/health/live",
+    tags=["Sağlık"],
+    summary="Sürecin ayakta olduğunu bildirir"
+)
+async def health_live():
+    return {"status": "alive"}
+
+@app.get(
+    "/health/ready",
+    tags=["Sağlık"],
+    summary="Model ve indeksler ısındıysa trafiğe hazır olduğunu bildirir"
+)
+async def health_ready():
+    status = warmup_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **status})
+    return {"status": "ready", **status}
+
+CIRCUIT_LEVELS = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 0.5, CIRCUIT_OPEN: 1}
+
+def collect_component_metrics():
+    """Bileşenlerin kendi tuttuğu sayaçları okuma anında metrik olarak üretir."""
+    cache = Counter("response_cache_lookups", "Yanıt önbelleği aramaları", ("result",))
+    for result, value in get_cache().stats.items():
+        cache.inc(value, result=result.lower())
+    yield cache
+
+    if loaded()["embeddings"]:
+        embedding_stats = getattr(get_embeddings(), "stats", None)
+        if embedding_stats:
+            embedding_cache = Counter("embedding_cache_lookups", "Embedding önbelleği aramaları", ("result",))
+            for result, value in embedding_stats.items():
+                embedding_cache.inc(value, result=result)
+            yield embedding_cache
+
+    batches = Histogram("embedding_batch_size", "Sorgu embedding toplu çağrı boyutları", buckets=SIZE_BUCKETS)
+    for size, count in query_batcher.batch_sizes.items():
+        batches.observe(size, count)
+    yield batches
+    yield query_batcher.queue_wait
+
+    queue = Gauge("ingestion_queue_depth", "Yükleme kuyruğunda bekleyen işler")
+    queue.set(ingestion_queue.depth)
+    yield queue
+
+    math_results = Counter("math_results", "Matematik sonuçlarını üreten yol", ("source",))
+    for source, value in MathOperations.stats.items():
+        math_results.inc(value, source=source)
+    yield math_results
+
+    llm = get_registry()
+    running = Gauge("llm_running", "Çalışan LLM çağrıları", ("model",))
+    waiting = Gauge("llm_waiting", "Sırada bekleyen LLM çağrıları", ("model",))
+    circuit = Gauge("llm_circuit_open", "Devre kesici durumu (0: kapalı, 0.5: yarı açık, 1: açık)", ("model",))
+    calls = Counter("llm_calls", "LLM zamanlayıcı olayları", ("model", "event"))
+    for model, scheduler in llm.schedulers().items():
+        snapshot = scheduler.snapshot()
+        running.set(snapshot.pop("running"), model=model)
+        waiting.set(snapshot.pop("waiting"), model=model)
+        circuit.set(CIRCUIT_LEVELS.get(snapshot.pop("circuit"), 0), model=model)
+        for event, value in snapshot.items():
+            calls.inc(value, model=model, event=event)
+    yield from (running, waiting, circuit, calls)
+
+    if llm.single_flight is not None:
+        coalescing = Counter("llm_single_flight", "Özdeş LLM isteklerinin birleştirilmesi", ("result",))
+        for result, value in llm.single_flight.stats.items():
+            coalescing.inc(value, result=result)
+        yield coalescing
+
+metrics_registry.add_collector(collect_component_metrics)
+
+@app.get(
+    "/metrics",
+    tags=["Sağlık"],
+    summary="Prometheus biçiminde metrikler",
+    response_class=Response
+)
+async def metrics():
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 @app.post(
     "/math/solve",
@@ -145,50 +675,102 @@ app.add_middleware(
 )
 async def solve_math(data: MathOperation):
     try:
-        math_ops = MathOperations()
-        result = await math_ops.solve_operation(data.operation)
-        return {"result": result}
+        return await math_operations.solve(data.operation)
+    except LLMUnavailableError as e:
+        # Yerel motorun çözemediği ifade için yedek yok; hızlıca 503 dön
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post(
+    "/math/solve/batch",
+    response_model=MathBatchResponse,
+    tags=["Matematik İşlemleri"],
+    summary="İfadeleri değişken dizilerinin her değeri için vektörel hesaplar"
+)
+async def solve_math_batch(data: MathBatchRequest):
+    expressions = data.all_expressions()
+    size = max((len(values) for values in data.variables.values()), default=1)
+    # Yanıt boyutu hesaplamadan önce sınırlanır
+    if len(expressions) * size > MATH_BATCH_MAX_RESULTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Toplam sonuç sayısı {MATH_BATCH_MAX_RESULTS} sınırını aşıyor ({len(expressions)} x {size})"
+        )
+    try:
+        with span("math.batch"):
+            items = await run_in_threadpool(math_operations.solve_batch, expressions, data.variables)
+        return {"items": items, "size": size}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post(
     "/documents/upload",
+    status_code=202,
     tags=["Döküman İşlemleri"],
-    summary="Döküman yükler"
+    summary="Dökümanı işlenmek üzere kuyruğa alır"
 )
 async def upload_document(file: UploadFile = File(...)):
     try:
-        # Dosya içeriğini oku
-        text_content = extract_text_from_file(file)
-        
-        # Metni parçalara ayır
-        texts = text_splitter.split_text(text_content)
-        
-        # Metadata hazırla
-        metadata = {
-            "source": file.filename,
-            "type": file.content_type or "text/plain",
-            "size": len(text_content)
-        }
-        
-        # Dökümanları oluştur
-        documents = [
-            Document(
-                page_content=text,
-                metadata={**metadata, "chunk": i}
-            ) for i, text in enumerate(texts)
-        ]
-        
-        # Vektör veritabanına ekle
-        vectorstore.add_documents(documents)
-        
-        return JSONResponse(
-            status_code=201,
-            content={"message": f"{file.filename} başarıyla yüklendi"}
-        )
+        # Yüklenen dosyayı geçici dosyaya kopyala ve özetini hesapla
+        with span("upload.spool"):
+            path, content_hash = await run_in_threadpool(
+                spool_to_tempfile, file.file, os.path.splitext(file.filename)[1]
+            )
+
+        # Aynı içerik zaten koleksiyondaysa hiçbir şey yapma
+        if await run_in_threadpool(get_document_index().is_current, file.filename, content_hash):
+            os.remove(path)
+            return JSONResponse(
+                status_code=200,
+                content={"message": f"{file.filename} zaten güncel", "status": "unchanged"}
+            )
+
+        job, created = ingestion_queue.submit(IngestionJob(
+            filename=file.filename,
+            content_type=file.content_type or "text/plain",
+            content_hash=content_hash,
+            path=path
+        ))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not created:
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": f"{file.filename} zaten kuyrukta",
+                "job_id": job.id,
+                "status": job.status
+            }
+        )
+    return JSONResponse(
+        status_code=202,
+        content={
+            "message": f"{file.filename} işlenmek üzere kuyruğa alındı",
+            "job_id": job.id,
+            "status": job.status
+        }
+    )
+
+@app.get(
+    "/documents/jobs/{job_id}",
+    response_model=JobResponse,
+    tags=["Döküman İşlemleri"],
+    summary="Yükleme işinin durumunu döndürür"
+)
+async def get_ingestion_job(job_id: str):
+    job = ingestion_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job.to_dict()
+
 @app.post(
     "/vector/search",
     response_model=VectorSearchResponse,
@@ -196,24 +778,103 @@ async def upload_document(file: UploadFile = File(...)):
     summary="Vektör tabanlı benzerlik araması yapar"
 )
 async def vector_search(request: SearchRequest):
+    offset = 0
+    if request.cursor is not None:
+        try:
+            offset = decode_cursor(request.cursor, search_fingerprint(request))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        # Benzerlik araması yap
-        results = vectorstore.similarity_search_with_relevance_scores(
-            request.query,
-            k=request.top_k
+        # Önbellekte varsa doğrudan döndür (önbellekte tüm alanlar tutulur, seçim yanıtta yapılır)
+        cache = get_cache()
+        with span("search.cache") as lookup:
+            cache_key = await cache.make_key(
+                "search", {**search_fields(request), "top_k": request.top_k, "offset": offset}
+            )
+            cached = await cache.get(cache_key)
+        if cached is not None:
+            return search_response(request, cached, {"cache": lookup.ms}, offset, {CACHE_HEADER: CACHE_HIT})
+
+        # Sorguyu eşzamanlı sorgularla birlikte toplu olarak vektörle; sonraki
+        # sayfalar ilk sayfada saklanan vektörü kullanır
+        timings: Dict[str, float] = {}
+        query_vector = None
+        if request.mode != "lexical":
+            vector_key = await cache.make_key("search_vector", search_fields(request), versioned=False)
+            if offset:
+                query_vector = await cache.get(vector_key)
+            if query_vector is None:
+                with span("search.embed") as stage:
+                    query_vector = await query_batcher.embed(request.query)
+                timings["embed"] = stage.ms
+
+        # Seçilen yolla sayfanın sonuna kadar ara; bir fazla sonuç sonraki sayfa olup olmadığını gösterir
+        depth = offset + request.top_k
+        results, search_timings = await run_in_threadpool(
+            run_search, request.model_copy(update={"top_k": depth + 1}), query_vector,
+            await source_filter_version(request)
         )
-        
-        # Sonuçları formatla
-        formatted_results = []
-        for doc, score in results:
-            formatted_results.append({
-                "id": doc.metadata.get("chunk", ""),
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "similarity": score
+        timings.update(search_timings)
+
+        page = {"results": format_results(results[offset:depth]), "has_more": len(results) > depth}
+        await cache.set(cache_key, page)
+        if page["has_more"] and "embed" in timings:
+            await cache.set(vector_key, query_vector)
+        return search_response(request, page, timings, offset, {CACHE_HEADER: CACHE_MISS})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post(
+    "/vector/search/batch",
+    response_model=BatchSearchResponse,
+    tags=["Döküman İşlemleri"],
+    summary="Birden çok sorgu için tek seferde vektör araması yapar"
+)
+async def vector_search_batch(request: BatchSearchRequest):
+    if any(item.cursor is not None for item in request.queries):
+        raise HTTPException(status_code=422, detail="cursor toplu aramada desteklenmez")
+
+    try:
+        # Vektör gerektiren tüm sorguları tek embedding çağrısında vektörle
+        needs_vector = [i for i, item in enumerate(request.queries) if item.mode != "lexical"]
+        vectors: List[Optional[List[float]]] = [None for _ in request.queries]
+        if needs_vector:
+            with span("search.embed"):
+                embedded = await run_in_threadpool(
+                    get_embeddings().embed_documents, [request.queries[i].query for i in needs_vector]
+                )
+            for i, vector in zip(needs_vector, embedded):
+                vectors[i] = vector
+
+        # Filtresiz vektör sorguları tek koleksiyon sorgusuyla, diğerleri tek tek aranır
+        plain = [
+            i for i, item in enumerate(request.queries) if item.filters is None and item.mode == "vector"
+        ]
+        results: List[List[Tuple[Document, float]]] = [[] for _ in request.queries]
+        timings: List[Dict[str, float]] = [{} for _ in request.queries]
+        if plain:
+            with span("search.vector") as stage:
+                found = await run_in_threadpool(
+                    search_by_vectors, [vectors[i] for i in plain], [request.queries[i].top_k for i in plain]
+                )
+            shared = stage.ms
+            for i, items in zip(plain, found):
+                results[i] = items
+                timings[i] = {"vector": shared}
+        for i, item in enumerate(request.queries):
+            if i not in plain:
+                results[i], timings[i] = await run_in_threadpool(
+                    run_search, item, vectors[i], await source_filter_version(item)
+                )
+
+        with span("search.serialize"):
+            return ORJSONResponse({
+                "results": [
+                    {"results": project_results(format_results(items), item), "timings": item_timings}
+                    for item, items, item_timings in zip(request.queries, results, timings)
+                ]
             })
-        
-        return {"results": formatted_results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -223,22 +884,132 @@ async def vector_search(request: SearchRequest):
     tags=["Metin İşlemleri"],
     summary="Metinden anahtar kelimeler çıkarır"
 )
-async def extract_keywords(request: KeywordRequest):
+async def extract_keywords(request: KeywordRequest, response: Response):
     try:
-        # LangChain ile anahtar kelimeleri çıkar
-        keywords = await keyword_chain.ainvoke({
-            "text": request.text,
-            "num_keywords": request.num_keywords
-        })
+        # Önbellekte varsa doğrudan döndür. Yerel çıkarıcının skorları koleksiyondaki
+        # terim sıklıklarına bağlı olduğundan fast/auto anahtarları koleksiyon sürümünü içerir
+        cache = get_cache()
+        with span("keywords.cache"):
+            cache_key = await cache.make_key(
+                "keywords",
+                {"text": normalize_text(request.text), "num_keywords": request.num_keywords, "mode": request.mode},
+                versioned=request.mode != "llm"
+            )
+            cached = await cache.get(cache_key)
+        if cached is not None:
+            response.headers[CACHE_HEADER] = CACHE_HIT
+            return cached
+
+        # Yerel çıkarıcı: fast modunda her zaman, auto modunda sonuç güvenilirse
+        keywords = None
+        if request.mode == "fast":
+            with span("keywords.local"):
+                keywords = await run_in_threadpool(keyword_extractor.extract, request.text, request.num_keywords)
+        elif request.mode == "auto":
+            with span("keywords.local"):
+                keywords = await run_in_threadpool(
+                    keyword_extractor.extract_confident, request.text, request.num_keywords
+                )
+        source = SOURCE_LOCAL
+
+        degraded = False
+
+        if keywords is None:
+            try:
+                # LangChain ile anahtar kelimeleri çıkar
+                keywords = await get_keyword_chain().ainvoke({
+                    "text": request.text,
+                    "num_keywords": request.num_keywords
+                })
+                keywords = keywords["text"][:request.num_keywords]
+                source = SOURCE_LLM
+            except LLMUnavailableError:
+                # LLM yanıt veremiyorsa yerel çıkarıcıya düş (sonuç önbelleğe alınmaz)
+                with span("keywords.local"):
+                    keywords = await run_in_threadpool(keyword_extractor.extract, request.text, request.num_keywords)
+                degraded = True
         
         # Sonucu formatla
-        keywords = keywords["text"][:request.num_keywords]
-        
-        return {
+        result = {
             "keywords": keywords,
-            "total_keywords": len(keywords)
+            "total_keywords": len(keywords),
+            "source": source
         }
+        if not degraded:
+            await cache.set(cache_key, result)
+        response.headers[CACHE_HEADER] = CACHE_MISS
+        return result
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@app.post(
+    "/ask",
+    response_class=StreamingResponse,
+    tags=["Döküman İşlemleri"],
+    summary="Yüklenen dökümanlara dayanarak soruyu akış halinde yanıtlar"
+)
+async def ask(request: AskRequest):
+    """
+    Olaylar sırasıyla: `context` (kullanılan pasajlar), her yanıt parçası için
+    `token`, hata olursa `error`, ardından aşama süreleriyle `timings` ve `done`.
+    """
+    async def events():
+        timings: Dict[str, float] = {}
+        total_start = time.perf_counter()
+        try:
+            query_vector = None
+            if request.mode != "lexical":
+                with span("ask.embed") as stage:
+                    query_vector = await query_batcher.embed(request.question)
+                timings["embed"] = stage.ms
+
+            search = SearchRequest(
+                query=request.question, top_k=request.top_k, filters=request.filters, mode=request.mode
+            )
+            results, search_timings = await run_in_threadpool(
+                run_search, search, query_vector, await source_filter_version(search)
+            )
+            timings.update(search_timings)
+
+            with span("ask.pack") as stage:
+                passages = pack_context(results, request.max_context_tokens)
+            timings["pack"] = stage.ms
+            # Kaynaklar LLM beklenmeden gönderilir; istemci ilk baytı hemen alır
+            yield sse_event("context", {
+                "passages": [
+                    {key: passage[key] for key in ("source", "score", "chunks", "tokens")}
+                    for passage in passages
+                ]
+            })
+
+            if not passages:
+                yield sse_event("token", {"text": NO_CONTEXT_ANSWER})
+            else:
+                start = time.perf_counter()
+                stream = get_ask_chain().astream({
+                    "context": format_context(passages),
+                    "question": request.question
+                })
+                async for text in stream:
+                    if "first_token" not in timings:
+                        timings["first_token"] = elapsed_ms(start)
+                        record("ask.first_token", timings["first_token"] / 1000)
+                    yield sse_event("token", {"text": text})
+                timings["generate"] = elapsed_ms(start)
+                record("ask.generate", timings["generate"] / 1000)
+        except LLMUnavailableError as e:
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+        timings["total"] = elapsed_ms(total_start)
+        yield sse_event("timings", timings)
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
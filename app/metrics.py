@@ -0,0 +1,277 @@
+"""
+Bağımlılıksız ölçüm altyapısı.
+
+- `span(stage)`: bir aşamanın süresini ölçer; süre aşama histogramına ve
+  (bir HTTP isteği içindeyse) isteğin `Server-Timing` başlığına eklenir.
+- Sayaç ve histogramlar Prometheus metin biçiminde `/metrics` üzerinden
+  sunulur. Kuyruk derinliği, önbellek isabetleri gibi başka bileşenlerin
+  tuttuğu değerler sıcak yolda değil, yalnızca okuma anında toplanır
+  (`add_collector`).
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+
+PREFIX = "ai_tools"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Saniye cinsinden varsayılan histogram sınırları (1 ms .. 60 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Geçerli isteğin aşama süreleri (ms); istek dışında None
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = f"{PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(
+            f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+            for suffix, labels, value in self.samples()
+        )
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield "_total", dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Etiket başına: (sınır başına sayım + taşma, toplam)
+        self._values: Dict[Tuple, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, count: int = 1, **labels) -> None:
+        """`value` gözlemini `count` kez kaydeder."""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = self._values[key]
+            counts[index] += count
+            total[0] += value * count
+
+    def count(self, **labels) -> int:
+        values = self._values.get(self._key(labels))
+        return sum(values[0]) if values else 0
+
+    def samples(self):
+        for key, (counts, total) in sorted(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield "_sum", labels, total[0]
+            yield "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """Okuma anında güncel değerleri metrik olarak üreten fonksiyon ekler."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Tüm metrikleri Prometheus metin biçiminde döndürür."""
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests", "İşlenen HTTP istekleri", ("method", "endpoint", "status")
+))
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP istek süresi (yanıt başlığına kadar)", ("method", "endpoint")
+))
+RESPONSE_BYTES = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP yanıt gövdesi boyutu", ("method", "endpoint"), buckets=BYTES_BUCKETS
+))
+STAGE_SECONDS = registry.register(Histogram(
+    "stage_duration_seconds", "İstek ve yükleme aşamalarının süresi", ("stage",)
+))
+LLM_TOKENS = registry.register(Counter(
+    "llm_tokens", "LLM'e gönderilen ve alınan tahmini token sayısı", ("chain", "kind")
+))
+
+
+class Span:
+    """`with span(...) as s:` bloğundan sonra süre `s.seconds` ve `s.ms` alanlarındadır."""
+
+    __slots__ = ("stage", "start", "seconds")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.start = 0.0
+        self.seconds = 0.0
+
+    @property
+    def ms(self) -> float:
+        return round(1000 * self.seconds, 3)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds = time.perf_counter() - self.start
+        record(self.stage, self.seconds)
+
+
+def span(stage: str) -> Span:
+    """Aşama süresini ölçen bağlam yöneticisi (örn: "search.embed")."""
+    return Span(stage)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Ölçülmüş bir aşama süresini histogram ve geçerli isteğin Server-Timing listesine ekler."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, 1000 * seconds))
+
+
+def server_timing(timings: List[Tuple[str, float]], total_ms: float) -> str:
+    """Aşama sürelerini `Server-Timing` başlık değerine çevirir (aynı aşamalar toplanır)."""
+    merged: Dict[str, float] = {}
+    for stage, ms in timings:
+        merged[stage] = merged.get(stage, 0.0) + ms
+    parts = [f"{stage};dur={ms:.3f}" for stage, ms in merged.items()]
+    parts.append(f"total;dur={total_ms:.3f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    İstek sayısı/süresi/yanıt boyutu metriklerini tutar ve yanıta `Server-Timing` başlığı ekler.
+
+    Saf ASGI ara katmanıdır; akış yanıtlarını tamponlamaz. Başlık yanıt
+    başlangıcında yazıldığı için akış sırasında ölçülen aşamalar başlıkta
+    yer almaz (bkz. /ask'ın `timings` olayı).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        status = {"code": 500}
+        size = {"bytes": 0}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                elapsed = time.perf_counter() - start
+                endpoint = scope.get("endpoint")
+                name = getattr(endpoint, "__name__", "unmatched")
+                REQUEST_SECONDS.observe(elapsed, method=scope["method"], endpoint=name)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, 1000 * elapsed).encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            name = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            REQUESTS.inc(method=scope["method"], endpoint=name, status=status["code"])
+            RESPONSE_BYTES.observe(size["bytes"], method=scope["method"], endpoint=name)
+            _request_timings.reset(token)
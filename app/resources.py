@@ -0,0 +1,169 @@
+"""
+Ağır kaynakların (embedding modeli, vektör deposu, indeksler) tembel erişimcileri.
+
+`app.main` içe aktarılırken hiçbir model yüklenmez ve hiçbir dosya açılmaz;
+kaynaklar ilk kullanıldıklarında bir kez oluşturulur. `warmup` uygulama
+açılışında tüm kaynakları oluşturur, modeli örnek bir cümleyle ısıtır ve
+servisi hazır olarak işaretler.
+"""
+from app.config import (
+    EMBEDDING_MODEL, EMBEDDING_BACKEND, FAKE_EMBEDDING_DIMENSION, ONNX_QUANTIZED, CHROMA_PERSIST_DIRECTORY,
+    VECTOR_BACKEND
+)
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Model ağırlıklarını ısıtmak için kodlanan örnek cümle
+WARMUP_TEXT = "Isınma cümlesi: yapay zeka araçları hazırlanıyor."
+
+# Erişimciler birbirini çağırabildiği için yeniden girilebilir kilit
+_lock = threading.RLock()
+_resources: Dict[str, Any] = {}
+_ready = threading.Event()
+_warmup: Dict[str, Any] = {"timings": {}, "error": None}
+
+
+def _get(name: str, factory: Callable[[], Any]) -> Any:
+    resource = _resources.get(name)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(name)
+            if resource is None:
+                start = time.perf_counter()
+                resource = _resources[name] = factory()
+                logger.info("%s %.3f sn'de yüklendi", name, time.perf_counter() - start)
+    return resource
+
+
+def loaded() -> Dict[str, bool]:
+    """Hangi kaynakların oluşturulduğunu döndürür."""
+    names = ["embeddings", "vectorstore", "source_index", "bm25_index", "document_index"]
+    return {name: name in _resources for name in names}
+
+
+def _create_embeddings():
+    from app.database.embedding_cache import CachedEmbeddings
+
+    # Embedding modeli (önbellek katmanı ile); ONNX vektörleri ayrı anahtarlarla önbelleğe alınır
+    if EMBEDDING_BACKEND == "fake":
+        from app.database.fake_embeddings import HashingEmbeddings
+        return CachedEmbeddings(HashingEmbeddings(), model_name=f"hashing-{FAKE_EMBEDDING_DIMENSION}")
+    if EMBEDDING_BACKEND == "onnx":
+        from app.database.onnx_embeddings import OnnxEmbeddings
+        model_name = f"{EMBEDDING_MODEL}:onnx{'-int8' if ONNX_QUANTIZED else ''}"
+        return CachedEmbeddings(OnnxEmbeddings(), model_name=model_name)
+
+    from langchain.embeddings import HuggingFaceEmbeddings
+    return CachedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL), model_name=EMBEDDING_MODEL)
+
+
+def _create_vectorstore():
+    # Vektör veritabanı (Chroma veya bellek eşlemeli NumPy deposu)
+    if VECTOR_BACKEND == "numpy":
+        from app.database.vector_store import VectorStore
+        return VectorStore(embedding_function=get_embeddings())
+
+    from langchain.vectorstores import Chroma
+    return Chroma(
+        persist_directory=CHROMA_PERSIST_DIRECTORY,
+        embedding_function=get_embeddings(),
+        collection_name="documents"
+    )
+
+
+def _create_source_index():
+    from app.database.metadata_index import SourceIndex
+    return SourceIndex()
+
+
+def _create_bm25_index():
+    from app.database.bm25_index import BM25Index
+    return BM25Index()
+
+
+def _create_document_index():
+    from app.ingestion.versioning import DocumentIndex, SourceVersions
+    return DocumentIndex(get_vectorstore(), get_source_index(), get_bm25_index(), SourceVersions())
+
+
+def get_embeddings():
+    """Önbellekli embedding modeli."""
+    return _get("embeddings", _create_embeddings)
+
+
+def get_vectorstore():
+    """Yapılandırılmış vektör deposu (Chroma veya NumPy)."""
+    return _get("vectorstore", _create_vectorstore)
+
+
+def get_source_index():
+    """Kaynak -> parça kimliği ikincil indeksi."""
+    return _get("source_index", _create_source_index)
+
+
+def get_bm25_index():
+    """Sözcük tabanlı arama için BM25 ters indeksi."""
+    return _get("bm25_index", _create_bm25_index)
+
+
+def get_document_index():
+    """Döküman sürüm bilgisi (deterministik parça kimlikleri)."""
+    return _get("document_index", _create_document_index)
+
+
+def sync_lexical_index() -> None:
+    # BM25 indeksi koleksiyondan eksikse (ör. indeks öncesi yüklenmiş dökümanlar) tamamla
+    vectorstore = get_vectorstore()
+    if len(get_bm25_index()) < vectorstore._collection.count():
+        get_bm25_index().sync(vectorstore)
+
+
+def warmup(collection_version: Optional[int] = None) -> Dict[str, float]:
+    """
+    Tüm kaynakları oluşturur, modeli ısıtır ve servisi hazır olarak işaretler.
+
+    Args:
+        collection_version (int): Kaynak indeksinin yansıttığı koleksiyon sürümü; None ise
+            indeks yüklenir ama kaynak filtreleri Chroma'ya iletilmeye devam eder
+
+    Returns:
+        Dict[str, float]: Aşama süreleri (saniye)
+    """
+    timings: Dict[str, float] = {}
+    stages = [
+        # Önbelleği atlayarak asıl modeli çalıştır ki ağırlıklar belleğe gelsin
+        ("embeddings", lambda: get_embeddings().embeddings.embed_query(WARMUP_TEXT)),
+        ("vectorstore", get_vectorstore),
+        ("source_index", lambda: get_source_index().load(get_vectorstore(), collection_version)),
+        ("bm25_index", sync_lexical_index),
+        ("document_index", get_document_index),
+    ]
+    try:
+        for name, stage in stages:
+            start = time.perf_counter()
+            stage()
+            timings[name] = round(time.perf_counter() - start, 4)
+    except Exception as e:
+        logger.exception("Isınma başarısız")
+        _warmup["error"] = str(e)
+        raise
+    finally:
+        _warmup["timings"] = timings
+
+    _warmup["error"] = None
+    _ready.set()
+    logger.info("Isınma tamamlandı: %s", timings)
+    return timings
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def warmup_status() -> Dict[str, Any]:
+    """Hazır olma durumu, aşama süreleri ve varsa hata."""
+    return {"ready": is_ready(), "timings": dict(_warmup["timings"]), "error": _warmup["error"]}
@@ -1,7 +1,7 @@
+from app.api_client import APIClient, APIError, content_hash
+from app.config import API_URL, UI_CACHE_TTL_SECONDS, UI_UPLOAD_WORKERS
+from typing import Callable, Tuple
 import streamlit as st
-import requests
-import json
-import time
 
 # Tema ayarları
 st.set_page_config(
@@ -126,8 +126,55 @@ Bu uygulama, AI Tool API'sinin özelliklerini kullanmanızı sağlar:
 - 🔑 Anahtar Kelime Çıkarma
 """)
 
-# API endpoint'i
-API_URL = "http://localhost:8000"
+@st.cache_resource
+def get_client() -> APIClient:
+    """Oturumlar ve yeniden çalıştırmalar arasında paylaşılan, bağlantı havuzlu istemci."""
+    return APIClient(API_URL)
+
+
+# Aynı girdilerle tekrarlanan istekler API'ye gitmez; listeler önbellek anahtarı için tuple olarak geçirilir.
+# Yalnızca yanıt gövdesi önbelleğe alınır; sunucunun X-Cache bilgisi yalnızca istek gerçekten
+# gönderildiğinde session state'e yazılır (bkz. fetch)
+@st.cache_data(ttl=UI_CACHE_TTL_SECONDS, show_spinner=False)
+def cached_search(query: str, top_k: int, include: Tuple[str, ...], metadata_fields: Tuple[str, ...]) -> dict:
+    body, server_cache_hit = get_client().search(query, top_k, include, metadata_fields)
+    st.session_state.server_cache_hit = server_cache_hit
+    return body
+
+
+@st.cache_data(ttl=UI_CACHE_TTL_SECONDS, show_spinner=False)
+def cached_keywords(text: str, num_keywords: int) -> dict:
+    body, server_cache_hit = get_client().keywords(text, num_keywords)
+    st.session_state.server_cache_hit = server_cache_hit
+    return body
+
+
+def fetch(cached: Callable[..., dict], *args) -> Tuple[dict, str]:
+    """
+    Önbellekli isteği çalıştırır ve yanıtın nereden geldiğini belirten etiketi döndürür.
+
+    Returns:
+        Tuple[dict, str]: (yanıt gövdesi, etiket)
+    """
+    st.session_state.server_cache_hit = None
+    body = cached(*args)
+    server_cache_hit = st.session_state.server_cache_hit
+    if server_cache_hit is None:
+        # Önbellekli fonksiyon çalışmadı: sonuç arayüz önbelleğinden, API'ye istek gitmedi
+        return body, "💾 Arayüz önbelleğinden geldi"
+    return body, "🔄 Cache'den geldi" if server_cache_hit else "🆕 Yeni sorgu"
+
+
+def show_error(error: APIError) -> None:
+    # Bağlantı hatalarında durum kodu yoktur; ayrıntı mesajı zaten açıklayıcıdır
+    st.error(error.detail if error.status_code is None else f"Hata: {error.detail}")
+
+
+client = get_client()
+
+# Bu oturumda yüklenmiş dosyaların içerik özetleri (her yeniden çalıştırmada tekrar yüklenmez)
+if 'uploaded_hashes' not in st.session_state:
+    st.session_state.uploaded_hashes = {}
 
 # Sidebar ile işlem seçimi
 islem = st.sidebar.selectbox(
@@ -141,18 +188,34 @@ if islem == "Döküman İşlemleri":
     
     # Döküman yükleme
     st.subheader("Döküman Yükleme")
-    uploaded_file = st.file_uploader("Bir metin dosyası seçin", type=['txt', 'pdf', 'md', 'rst'])
-    if uploaded_file:
-        with st.spinner('Döküman yükleniyor...'):
-            files = {"file": uploaded_file}
-            try:
-                response = requests.post(f"{API_URL}/documents/upload", files=files)
-                if response.status_code in [200, 201]:
-                    st.success(response.json()["message"])
+    uploaded_files = st.file_uploader(
+        "Metin dosyaları seçin", type=['txt', 'pdf', 'md', 'rst'], accept_multiple_files=True
+    )
+    if uploaded_files:
+        # Yalnızca bu oturumda henüz yüklenmemiş içerikler gönderilir (yeniden çalıştırmada tekrar yükleme yok)
+        pending = {}
+        for uploaded_file in uploaded_files:
+            content = uploaded_file.getvalue()
+            digest = content_hash(content)
+            if digest not in st.session_state.uploaded_hashes and digest not in pending:
+                pending[digest] = (uploaded_file.name, content, uploaded_file.type or "text/plain")
+
+        if pending:
+            progress = st.progress(0.0, text=f"0/{len(pending)} döküman işlendi")
+            for done, result in enumerate(
+                client.upload_many(pending.values(), max_workers=UI_UPLOAD_WORKERS), start=1
+            ):
+                progress.progress(done / len(pending), text=f"{done}/{len(pending)} döküman işlendi")
+                if result.error:
+                    # Başarısız dosya kaydedilmez; sonraki çalıştırmada yeniden denenir
+                    st.error(f"{result.filename}: {result.error}")
                 else:
-                    st.error(f"Hata: {response.json().get('detail', 'Bilinmeyen bir hata oluştu.')}")
-            except Exception as e:
-                st.error(f"Bağlantı hatası: {str(e)}")
+                    st.session_state.uploaded_hashes[result.content_hash] = result.filename
+                    st.success(f"{result.filename}: {result.message}")
+            # Yeni dökümanlar eklendiğinden önceki arama sonuçları geçersiz
+            cached_search.clear()
+        else:
+            st.info(f"{len(uploaded_files)} döküman bu oturumda zaten yüklendi.")
     
     # Vektör arama
     st.subheader("Vektör Arama")
@@ -169,52 +232,47 @@ if islem == "Döküman İşlemleri":
         if search_query:
             with st.spinner('Arama yapılıyor...'):
                 try:
-                    response = requests.post(
-                        f"{API_URL}/vector/search",
-                        json={"query": search_query, "top_k": top_k}
+                    # Parçanın tamamı yerine sorgu merkezli alıntı ve gereken metadata
+                    body, label = fetch(
+                        cached_search, search_query, int(top_k), ("snippet", "metadata"), ("source", "page")
                     )
-                    if response.status_code == 200:
-                        results = response.json()["results"]
-                        
-                        # Cache durumunu kontrol et
-                        is_cached = response.headers.get("X-Cache") == "HIT"
-                        cache_status = "🔄 Cache'den geldi" if is_cached else "🆕 Yeni sorgu"
-                        
-                        st.markdown(f"### 🔍 Arama Sonuçları ({cache_status})")
-                        
-                        if not results:
-                            st.warning("Aramanızla eşleşen sonuç bulunamadı.")
-                        else:
-                            for idx, result in enumerate(results):
-                                st.markdown("---")
-                                st.markdown(f"#### 📄 Döküman {idx + 1}")
-                                
-                                # Benzerlik skoru - ChromaDB'den gelen değeri normalize et
-                                similarity = result.get("similarity", 0)
-                                normalized_similarity = 1 - min(max(similarity, 0), 1)  # Değeri 0-1 arasına normalize et
-                                
-                                st.markdown("**Benzerlik Oranı:**")
-                                st.progress(normalized_similarity)
-                                st.markdown(f"**{normalized_similarity * 100:.1f}%**")
-                                
-                                # İçerik
-                                st.markdown("**İçerik:**")
-                                document_text = result.get("content", "")
-                                if document_text:
-                                    st.markdown(f"""
-                                    <div style="background-color: {'#2D2D2D' if theme == 'Dark' else '#f0f2f6'}; 
-                                         color: {'#E0E0E0' if theme == 'Dark' else '#1f1f1f'}; 
-                                         padding: 10px; 
-                                         border-radius: 5px;">
-                                        {document_text}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                else:
-                                    st.info("Bu döküman için içerik bulunamadı.")
+                    results = body["results"]
+                    
+                    st.markdown(f"### 🔍 Arama Sonuçları ({label})")
+                    
+                    if not results:
+                        st.warning("Aramanızla eşleşen sonuç bulunamadı.")
                     else:
-                        st.error(f"Hata: {response.json().get('detail', 'Bilinmeyen bir hata oluştu.')}")
-                except Exception as e:
-                    st.error(f"Bağlantı hatası: {str(e)}")
+                        for idx, result in enumerate(results):
+                            st.markdown("---")
+                            st.markdown(f"#### 📄 Döküman {idx + 1}")
+                            
+                            # Benzerlik skoru - ChromaDB'den gelen değeri normalize et
+                            similarity = result.get("similarity", 0)
+                            normalized_similarity = 1 - min(max(similarity, 0), 1)  # Değeri 0-1 arasına normalize et
+                            
+                            st.markdown("**Benzerlik Oranı:**")
+                            st.progress(normalized_similarity)
+                            st.markdown(f"**{normalized_similarity * 100:.1f}%**")
+                            
+                            # İçerik
+                            st.markdown("**İçerik:**")
+                            metadata = result.get("metadata", {})
+                            st.caption(f"{metadata.get('source', '')} · sayfa {metadata.get('page', '-')}")
+                            document_text = result.get("snippet", "")
+                            if document_text:
+                                st.markdown(f"""
+                                <div style="background-color: {'#2D2D2D' if theme == 'Dark' else '#f0f2f6'}; 
+                                     color: {'#E0E0E0' if theme == 'Dark' else '#1f1f1f'}; 
+                                     padding: 10px; 
+                                     border-radius: 5px;">
+                                    {document_text}
+                                </div>
+                                """, unsafe_allow_html=True)
+                            else:
+                                st.info("Bu döküman için içerik bulunamadı.")
+                except APIError as e:
+                    show_error(e)
         else:
             st.warning("Lütfen bir arama sorgusu girin.")
 
@@ -240,36 +298,29 @@ elif islem == "Matematik İşlemleri":
         if operation:
             with st.spinner('İşlem çözülüyor...'):
                 try:
-                    response = requests.post(
-                        f"{API_URL}/math/solve",
-                        json={"operation": operation}
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        st.balloons()
-                        
-                        # Sonucu göster
+                    result = client.solve(operation)
+                    st.balloons()
+                    
+                    # Sonucu göster
+                    st.markdown(f"""
+                    <div style="background-color: {'#2D2D2D' if theme == 'Dark' else '#f0f2f6'}; 
+                         color: {'#E0E0E0' if theme == 'Dark' else '#1f1f1f'}; 
+                         padding: 20px; 
+                         margin: 10px 0; 
+                         border-radius: 5px; 
+                         text-align: center;">
+                        <h2 style="margin: 0;">Sonuç: {result['result']}</h2>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    # İşlem detayları
+                    with st.expander("İşlem Detayları"):
                         st.markdown(f"""
-                        <div style="background-color: {'#2D2D2D' if theme == 'Dark' else '#f0f2f6'}; 
-                             color: {'#E0E0E0' if theme == 'Dark' else '#1f1f1f'}; 
-                             padding: 20px; 
-                             margin: 10px 0; 
-                             border-radius: 5px; 
-                             text-align: center;">
-                            <h2 style="margin: 0;">Sonuç: {result['result']}</h2>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # İşlem detayları
-                        with st.expander("İşlem Detayları"):
-                            st.markdown(f"""
-                            - **Girilen İşlem:** `{operation}`
-                            - **Sayısal Sonuç:** `{result['result']}`
-                            """)
-                    else:
-                        st.error(f"Hata: {response.json().get('detail', 'Bilinmeyen bir hata oluştu.')}")
-                except Exception as e:
-                    st.error(f"Bağlantı hatası: {str(e)}")
+                        - **Girilen İşlem:** `{operation}`
+                        - **Sayısal Sonuç:** `{result['result']}`
+                        """)
+                except APIError as e:
+                    show_error(e)
         else:
             st.warning("Lütfen bir matematik işlemi girin.")
 
@@ -284,36 +335,25 @@ else:
         if text_input:
             with st.spinner('Anahtar kelimeler çıkarılıyor...'):
                 try:
-                    response = requests.post(
-                        f"{API_URL}/keywords",
-                        json={"text": text_input, "num_keywords": num_keywords}
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        # Cache durumunu kontrol et
-                        is_cached = response.headers.get("X-Cache") == "HIT"
-                        cache_status = "🔄 Cache'den geldi" if is_cached else "🆕 Yeni sorgu"
-                        
-                        st.markdown(f"### Anahtar Kelimeler ({cache_status})")
-                        
-                        # Anahtar kelimeleri kartlar halinde göster
-                        for i, keyword in enumerate(result["keywords"]):
-                            st.markdown(f"""
-                            <div style="background-color: {'#2D2D2D' if theme == 'Dark' else '#f0f2f6'}; 
-                                 color: {'#E0E0E0' if theme == 'Dark' else '#1f1f1f'}; 
-                                 padding: 15px; 
-                                 margin: 10px 0; 
-                                 border-radius: 5px; 
-                                 text-align: center;">
-                                <h3 style="margin: 0;">{keyword}</h3>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        st.info(f"Toplam {result['total_keywords']} anahtar kelime bulundu.")
-                    else:
-                        st.error(f"Hata: {response.json().get('detail', 'Bilinmeyen bir hata oluştu.')}")
-                except Exception as e:
-                    st.error(f"Bağlantı hatası: {str(e)}")
+                    result, label = fetch(cached_keywords, text_input, num_keywords)
+                    
+                    st.markdown(f"### Anahtar Kelimeler ({label})")
+                    
+                    # Anahtar kelimeleri kartlar halinde göster
+                    for i, keyword in enumerate(result["keywords"]):
+                        st.markdown(f"""
+                        <div style="background-color: {'#2D2D2D' if theme == 'Dark' else '#f0f2f6'}; 
+                             color: {'#E0E0E0' if theme == 'Dark' else '#1f1f1f'}; 
+                             padding: 15px; 
+                             margin: 10px 0; 
+                             border-radius: 5px; 
+                             text-align: center;">
+                            <h3 style="margin: 0;">{keyword}</h3>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    st.info(f"Toplam {result['total_keywords']} anahtar kelime bulundu.")
+                except APIError as e:
+                    show_error(e)
         else:
             st.warning("Lütfen bir metin girin.") 
\ No newline at end of file
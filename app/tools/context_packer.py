@@ -0,0 +1,170 @@
+"""
+Soru-cevap için bağlam paketleme.
+
+Arama sonuçları alaka sırasıyla bir token bütçesine yerleştirilir. Metin
+bölücü ardışık parçalar arasında örtüşme (chunk_overlap) bıraktığı için
+aynı kaynaktan gelen parçalardan biri diğerinin devamıysa tek pasajda
+birleştirilir, birinin tamamen içinde kalan parça atlanır; böylece aynı
+metin bağlama iki kez girmez. Parça numarası (metadata["chunk"]) varsa
+komşuluk ona göre belirlenir, yoksa metin örtüşmesine bakılır.
+"""
+from app.config import ASK_CHARS_PER_TOKEN, ASK_MIN_OVERLAP
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+
+
+def estimate_tokens(text: str, chars_per_token: float = ASK_CHARS_PER_TOKEN) -> int:
+    """Karakter sayısından yaklaşık token sayısı (tokenizer çağırmadan)."""
+    return max(1, int(len(text) / chars_per_token + 0.5))
+
+
+def overlap_length(head: str, tail: str, min_overlap: int = ASK_MIN_OVERLAP) -> int:
+    """`head`in sonu ile `tail`in başının ortak olduğu en uzun kısmın uzunluğu (yoksa 0)."""
+    for size in range(min(len(head), len(tail)), min_overlap - 1, -1):
+        if head.endswith(tail[:size]):
+            return size
+    return 0
+
+
+def merge_passage(existing: str, text: str, min_overlap: int = ASK_MIN_OVERLAP) -> Optional[str]:
+    """
+    İki parçayı örtüşmeleri üzerinden birleştirir.
+
+    Returns:
+        Optional[str]: Birleşik metin; parçalar örtüşmüyorsa None
+    """
+    if text in existing:
+        return existing
+    if existing in text:
+        return text
+    size = overlap_length(existing, text, min_overlap)
+    if size:
+        return existing + text[size:]
+    size = overlap_length(text, existing, min_overlap)
+    if size:
+        return text + existing[size:]
+    return None
+
+
+def join_adjacent(head: str, tail: str, min_overlap: int = ASK_MIN_OVERLAP) -> str:
+    """Dökümanda art arda gelen iki parçayı ortak kısmı bir kez yazarak birleştirir."""
+    size = overlap_length(head, tail, min_overlap)
+    return head + tail[size:] if size else f"{head} {tail}"
+
+
+def _combine(passage: Dict[str, Any], text: str, span: Optional[Tuple[int, int]], min_overlap: int) -> Optional[str]:
+    """
+    Parçayı pasaja eklemenin sonucunu döndürür; eklenemiyorsa None.
+
+    Parça numarası (metadata["chunk"]) varsa yalnızca komşu parçalar birleştirilir;
+    tekrar eden kalıp metinlerin yanlışlıkla örtüşme sayılmasını önler.
+    Numara yoksa metin örtüşmesine bakılır.
+    """
+    current = passage["span"]
+    if span is None or current is None:
+        return merge_passage(passage["text"], text, min_overlap)
+    if span[0] >= current[0] and span[1] <= current[1]:
+        return passage["text"]
+    if span[0] == current[1] + 1:
+        return join_adjacent(passage["text"], text, min_overlap)
+    if span[1] == current[0] - 1:
+        return join_adjacent(text, passage["text"], min_overlap)
+    return None
+
+
+def _merge_into(passage: Dict[str, Any], text: str, span: Optional[Tuple[int, int]], chunks: int, combined: str) -> None:
+    if combined != passage["text"]:
+        passage["chunks"] += chunks
+    if span is not None and passage["span"] is not None:
+        passage["span"] = (min(span[0], passage["span"][0]), max(span[1], passage["span"][1]))
+    passage.update(text=combined, tokens=estimate_tokens(combined))
+
+
+def _absorb_neighbours(passage: Dict[str, Any], passages: List[Dict[str, Any]], min_overlap: int) -> int:
+    """
+    Büyüyen pasaja artık komşu olan diğer pasajları katar (örn: 0 ve 2 arasına 1 gelince).
+
+    Returns:
+        int: Örtüşme kaldırıldığı için serbest kalan token sayısı
+    """
+    freed = 0
+    for other in list(passages):
+        if other is passage or other["source"] != passage["source"]:
+            continue
+        combined = _combine(passage, other["text"], other["span"], min_overlap)
+        if combined is None:
+            continue
+        before = passage["tokens"] + other["tokens"]
+        _merge_into(passage, other["text"], other["span"], other["chunks"], combined)
+        passage["score"] = max(passage["score"], other["score"])
+        freed += before - passage["tokens"]
+        passages.remove(other)
+    return freed
+
+
+def pack_context(
+    results: List[Tuple["Document", float]],
+    budget_tokens: int,
+    min_overlap: int = ASK_MIN_OVERLAP
+) -> List[Dict[str, Any]]:
+    """
+    Arama sonuçlarını token bütçesi içinde pasajlara yerleştirir.
+
+    Args:
+        results (List[Tuple[Document, float]]): Alaka sırasıyla (döküman, skor) çiftleri
+        budget_tokens (int): Bağlam için ayrılan en fazla token
+        min_overlap (int): Örtüşme sayılacak en kısa ortak metin (karakter)
+
+    Returns:
+        List[Dict[str, Any]]: {"source", "text", "score", "chunks", "tokens", "span"} pasajları
+    """
+    passages: List[Dict[str, Any]] = []
+    used = 0
+    for doc, score in results:
+        source = doc.metadata.get("source", "")
+        text = doc.page_content.strip()
+        if not text:
+            continue
+        number = doc.metadata.get("chunk")
+        span = (number, number) if isinstance(number, int) else None
+
+        # Aynı kaynaktaki bir pasajın komşusuysa (veya içindeyse) onu büyüt
+        merged = False
+        for passage in passages:
+            if passage["source"] != source:
+                continue
+            combined = _combine(passage, text, span, min_overlap)
+            if combined is None:
+                continue
+            tokens = estimate_tokens(combined)
+            if used - passage["tokens"] + tokens <= budget_tokens:
+                used += tokens - passage["tokens"]
+                _merge_into(passage, text, span, 1, combined)
+                used -= _absorb_neighbours(passage, passages, min_overlap)
+            merged = True
+            break
+        if merged:
+            continue
+
+        tokens = estimate_tokens(text)
+        remaining = budget_tokens - used
+        if tokens > remaining:
+            # En alakalı parça bile sığmıyorsa kesilerek eklenir, diğerleri atlanır
+            if passages or remaining <= 0:
+                continue
+            text = text[:int(remaining * ASK_CHARS_PER_TOKEN)]
+            tokens = estimate_tokens(text)
+        passages.append({
+            "source": source, "text": text, "score": score, "chunks": 1, "tokens": tokens, "span": span
+        })
+        used += tokens
+    return passages
+
+
+def format_context(passages: List[Dict[str, Any]]) -> str:
+    """Pasajları numaralı kaynaklarla prompt metnine çevirir."""
+    return "\n\n".join(
+        f"[{i}] ({passage['source']})\n{passage['text']}" for i, passage in enumerate(passages, 1)
+    )
@@ -0,0 +1,92 @@
+"""
+Sorgu embedding'leri için dinamik mikro-toplama (micro-batching).
+
+Eşzamanlı gelen sorgular en fazla `max_wait_ms` milisaniye ya da
+`max_batch_size` adet olana kadar biriktirilir, tek bir toplu çağrı ile
+olay döngüsü dışında vektörlenir ve sonuçlar bekleyen isteklere dağıtılır.
+"""
+from app.config import EMBED_BATCH_WINDOW_MS, EMBED_BATCH_MAX_SIZE
+from app.metrics import Histogram
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+import asyncio
+import time
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = EMBED_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBED_BATCH_WINDOW_MS
+    ):
+        """
+        Args:
+            embed_fn (Callable): Metin listesini vektör listesine çeviren fonksiyon
+            max_batch_size (int): Bir toplu çağrıdaki en fazla sorgu
+            max_wait_ms (float): İlk sorgunun toplu çağrı için en fazla bekleme süresi
+        """
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batch_sizes: Counter = Counter()
+        self.total_items = 0
+        # Sorgu başına kuyrukta bekleme; /metrics okunurken dışa aktarılır
+        self.queue_wait = Histogram(
+            "embedding_queue_wait_seconds", "Sorgu embedding'inin toplu çağrı başlayana kadar bekleme süresi"
+        )
+
+    async def embed(self, text: str) -> List[float]:
+        """Sorguyu bir sonraki toplu çağrıya ekler ve vektörünü bekler."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        self.batch_sizes[len(batch)] += 1
+        self.total_items += len(batch)
+        for _, _, enqueued in batch:
+            self.queue_wait.observe(started - enqueued)
+
+        # Aynı sorgu bir kez vektörlenir
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            vectors = await asyncio.to_thread(self.embed_fn, texts)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future, _ in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> dict:
+        """Ulaşılan toplu çağrı boyutları (kuyrukta bekleme süreleri `queue_wait` histogramındadır)."""
+        batches = sum(self.batch_sizes.values())
+        return {
+            "batches": batches,
+            "items": self.total_items,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "avg_batch_size": self.total_items / batches if batches else 0.0,
+        }
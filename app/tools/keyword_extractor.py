@@ -0,0 +1,222 @@
+"""
+Süreç içi istatistiksel anahtar kelime çıkarıcı.
+
+YAKE yaklaşımı temel alınır: her kelime için büyük harf kullanımı, metindeki
+konumu, sıklığı, bağlam çeşitliliği ve geçtiği cümle oranı birleştirilerek
+bir skor hesaplanır (düşük skor daha önemli). 1..n kelimelik adayların skoru
+kelime skorlarından türetilir. Koleksiyondaki doküman sıklıkları
+verildiğinde skor IDF ile ağırlıklandırılır (TF-IDF etkisi).
+"""
+from app.config import KEYWORD_MAX_NGRAM, KEYWORD_AUTO_MIN_WORDS
+from app.database.bm25_index import TOKEN_PATTERN, fold_case
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import math
+import re
+import statistics
+
+STOPWORDS_TR = frozenset("""
+acaba ama ancak artık aslında az bana bazen bazı bazıları belki ben beni benim beri bile bir birçok
+biri birkaç birkez birşey birşeyi biz bize bizi bizim böyle böylece bu buna bunda bundan bunlar
+bunları bunların bunu bunun burada bütün çoğu çok çünkü da daha dahi de defa değil diğer diye dolayı
+dolayısıyla edecek eden ederek edilecek ediliyor edilmesi ediyor eğer elbette en etmesi etti ettiği
+ettiğini gibi göre halen hangi hatta hem henüz hep hepsi her herhangi herkes hiç hiçbir için ile
+ilgili ise işte itibaren iyi kadar karşın kendi kendine kez ki kim kime kimi kimse mı mi mu mü
+nasıl ne neden nedenle nerde nerede nereye niye niçin o olan olarak oldu olduğu olduğunu olmak
+olması olmayan olmaz olsa olup olur olursa oluyor on ona ondan onlar onlardan onları onların onu
+onun orada öyle pek rağmen sadece sanki şey şeyler şimdi şöyle şu şuna şunda şundan şunu tarafından
+tüm üzere var vardır ve veya ya yani yapacak yapılan yapılması yapıyor yapmak yaptı yaptığı yerine
+yine yoksa zaten
+""".split())
+
+STOPWORDS_EN = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+same she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves
+""".split())
+
+STOPWORDS = STOPWORDS_TR | STOPWORDS_EN
+
+SOURCE_LOCAL = "local"
+SOURCE_LLM = "llm"
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;:])\s+|\n+")
+# Aday n-gram'ları noktalama işaretlerini aşmaz
+_PHRASE_SPLIT = re.compile(r"[,()\[\]\"“”«»]")
+
+
+def _is_stopword(word: str) -> bool:
+    return word in STOPWORDS or len(word) < 2 or word.replace(".", "").isdigit()
+
+
+class KeywordExtractor:
+    def __init__(
+        self,
+        max_ngram: int = KEYWORD_MAX_NGRAM,
+        document_frequencies: Optional[Callable[[List[str]], Tuple[Dict[str, int], int]]] = None,
+        min_words: int = KEYWORD_AUTO_MIN_WORDS
+    ):
+        """
+        Args:
+            max_ngram (int): Bir anahtar ifadedeki en fazla kelime
+            document_frequencies (Callable): Terimler için (doküman sıklıkları, toplam doküman) döndüren fonksiyon
+            min_words (int): Yerel sonuca güvenmek için gereken en az kelime sayısı (auto modu)
+        """
+        self.max_ngram = max_ngram
+        self.document_frequencies = document_frequencies
+        self.min_words = min_words
+
+    def _sentences(self, text: str) -> List[List[List[Tuple[str, str]]]]:
+        """Metni cümle -> ifade parçası -> (kelime, normalize kelime) yapısına böler."""
+        sentences = []
+        for sentence in _SENTENCE_SPLIT.split(text):
+            chunks = [
+                [(match.group(), fold_case(match.group())) for match in TOKEN_PATTERN.finditer(chunk)]
+                for chunk in _PHRASE_SPLIT.split(sentence)
+            ]
+            chunks = [chunk for chunk in chunks if chunk]
+            if chunks:
+                sentences.append(chunks)
+        return sentences
+
+    def _word_scores(self, sentences) -> Tuple[Dict[str, float], Counter, Dict[str, str]]:
+        """YAKE kelime skorları (düşük = önemli), kelime sıklıkları ve yüzey biçimleri."""
+        frequency: Counter = Counter()
+        uppercase: Counter = Counter()
+        positions: Dict[str, List[int]] = defaultdict(list)
+        left: Dict[str, Counter] = defaultdict(Counter)
+        right: Dict[str, Counter] = defaultdict(Counter)
+        surfaces: Dict[str, str] = {}
+        initial: Dict[str, str] = {}
+
+        for index, sentence in enumerate(sentences):
+            first = True
+            for chunk in sentence:
+                for i, (surface, word) in enumerate(chunk):
+                    frequency[word] += 1
+                    positions[word].append(index)
+                    # Cümle başı dışındaki büyük harf ve kısaltmalar önem işaretidir
+                    if (surface.isupper() and len(surface) > 1) or (surface[0].isupper() and not first):
+                        uppercase[word] += 1
+                    # Yüzey biçimi cümle ortasındaki ilk kullanımdan alınır (OpenAI, Google gibi adlar korunur)
+                    if not first:
+                        surfaces.setdefault(word, surface)
+                    elif surface.isupper() and len(surface) > 1:
+                        initial.setdefault(word, surface)
+                    else:
+                        initial.setdefault(word, fold_case(surface[0]) + surface[1:])
+                    if i > 0:
+                        left[word][chunk[i - 1][1]] += 1
+                    if i + 1 < len(chunk):
+                        right[word][chunk[i + 1][1]] += 1
+                    first = False
+
+        content = [frequency[word] for word in frequency if not _is_stopword(word)] or [1]
+        mean, deviation = statistics.mean(content), statistics.pstdev(content)
+        max_frequency = max(content)
+
+        scores = {}
+        for word, tf in frequency.items():
+            casing = uppercase[word] / (1 + math.log(tf))
+            position = math.log(math.log(3 + statistics.median(positions[word])))
+            normalized = tf / (mean + deviation)
+            diversity_left = len(left[word]) / max(sum(left[word].values()), 1)
+            diversity_right = len(right[word]) / max(sum(right[word].values()), 1)
+            relatedness = 1 + (diversity_left + diversity_right) * tf / max_frequency
+            spread = len(set(positions[word])) / len(sentences)
+            scores[word] = relatedness * position / (
+                casing + normalized / relatedness + spread / relatedness
+            )
+        return scores, frequency, {**initial, **surfaces}
+
+    def _candidates(self, text: str) -> Tuple[List[Tuple[Tuple[str, ...], float]], Dict[str, str], Counter]:
+        """Skor sırasıyla (n-gram, skor) adayları, yüzey biçimleri ve kelime sıklıkları."""
+        sentences = self._sentences(text)
+        if not sentences:
+            return [], {}, Counter()
+        scores, frequency, surfaces = self._word_scores(sentences)
+
+        counts: Counter = Counter()
+        for sentence in sentences:
+            for chunk in sentence:
+                words = [word for _, word in chunk]
+                for n in range(1, self.max_ngram + 1):
+                    for start in range(len(words) - n + 1):
+                        gram = tuple(words[start:start + n])
+                        if not any(_is_stopword(word) for word in gram):
+                            counts[gram] += 1
+
+        idf = self._idf({word for gram in counts for word in gram})
+        ranked = []
+        for gram, tf in counts.items():
+            word_scores = [scores[word] for word in gram]
+            # Çarpım yerine geometrik ortalama: uzun ifadeler yalnızca uzun oldukları için öne geçmez
+            score = math.prod(word_scores) ** (1 / len(gram)) / (tf * (1 + sum(word_scores)))
+            if idf:
+                score /= statistics.mean(idf[word] for word in gram)
+            ranked.append((gram, score))
+        ranked.sort(key=lambda item: item[1])
+        return ranked, surfaces, frequency
+
+    def _idf(self, words: Iterable[str]) -> Dict[str, float]:
+        if self.document_frequencies is None:
+            return {}
+        frequencies, total = self.document_frequencies(list(words))
+        if not total:
+            return {}
+        return {word: math.log((total + 1) / (frequencies.get(word, 0) + 1)) + 1 for word in frequencies}
+
+    def extract(self, text: str, num_keywords: int) -> List[str]:
+        """
+        Metinden en önemli `num_keywords` anahtar ifadeyi çıkarır.
+
+        Yeterli aday yoksa kalan yerler metindeki diğer kelimelerle doldurulur;
+        metinde daha az farklı kelime varsa bulunanlar döner.
+        """
+        ranked, surfaces, _ = self._candidates(text)
+        return self._select(ranked, surfaces, text, num_keywords)
+
+    def _select(self, ranked, surfaces, text: str, num_keywords: int) -> List[str]:
+        selected: List[Tuple[str, ...]] = []
+        for gram, _ in ranked:
+            # Seçilmiş bir ifadeyle kelime paylaşan adaylar tekrar sayılır
+            if any(set(gram) & set(chosen) for chosen in selected):
+                continue
+            selected.append(gram)
+            if len(selected) == num_keywords:
+                break
+
+        keywords = [" ".join(surfaces.get(word, word) for word in gram) for gram in selected]
+        if len(keywords) < num_keywords:
+            used = {word for gram in selected for word in gram}
+            for gram, _ in ranked:
+                if len(keywords) == num_keywords:
+                    break
+                if len(gram) == 1 and gram[0] not in used:
+                    used.add(gram[0])
+                    keywords.append(surfaces.get(gram[0], gram[0]))
+            for word in dict.fromkeys(fold_case(match.group()) for match in TOKEN_PATTERN.finditer(text)):
+                if len(keywords) == num_keywords:
+                    break
+                if word not in used:
+                    used.add(word)
+                    keywords.append(surfaces.get(word, word))
+        return keywords
+
+    def extract_confident(self, text: str, num_keywords: int) -> Optional[List[str]]:
+        """
+        Yerel sonuç güvenilirse anahtar kelimeleri, değilse None döndürür (auto modu).
+
+        Metin kısaysa, yeterli aday yoksa ya da hiçbir aday tekrar etmiyorsa
+        (belirgin bir konu yoksa) sonuç belirsiz kabul edilir.
+        """
+        ranked, surfaces, frequency = self._candidates(text)
+        if sum(frequency.values()) < self.min_words or len(ranked) < num_keywords:
+            return None
+        if not any(tf > 1 for word, tf in frequency.items() if not _is_stopword(word)):
+            return None
+        return self._select(ranked, surfaces, text, num_keywords)
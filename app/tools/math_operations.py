@@ -1,11 +1,13 @@
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
-import os
-from dotenv import load_dotenv
-
-# .env dosyasını yükle
-load_dotenv()
+from app.config import LLM_MODEL, MATH_ANGLE_MODE
+from app.llm.registry import LLMRegistry, LimitedChain, get_registry
+from app.llm.scheduler import LLMUnavailableError, PRIORITY_HIGH
+from app.metrics import span
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import ast
+import math
+import operator
+import numpy as np
 
 # Matematik işlemleri için prompt template
 MATH_PROMPT = """Sen bir matematik asistanısın. Sana verilen matematik işlemini çöz ve sadece sonucu döndür.
@@ -15,44 +17,455 @@ Lütfen sadece sayısal sonucu ver, başka açıklama yapma.
 
 Sonuç:"""
 
+# Yerel motorun kabul edeceği en uzun ifade
+MAX_EXPRESSION_LENGTH = 512
+
+# Sonucun hangi yoldan geldiğini belirten değerler
+SOURCE_LOCAL = "local"
+SOURCE_LLM = "llm"
+
+
+class UnsupportedExpression(Exception):
+    """İfade yerel motor tarafından ayrıştırılamadığında fırlatılır (LLM'e düşülür)."""
+
+
+class MathDomainError(ValueError):
+    """İfade geçerli ama sonucu tanımsız olduğunda fırlatılır (örn: 1/0, sqrt(-1))."""
+
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_CONSTANTS = {
+    "pi": math.pi,
+    "π": math.pi,
+    "e": math.e,
+}
+
+# Kullanıcıların yazdığı alternatif semboller
+_REPLACEMENTS = {
+    "^": "**",
+    "×": "*",
+    "÷": "/",
+    "−": "-",
+    "√": "sqrt",
+}
+
+
+def _log(x: float, base: float = 10.0) -> float:
+    return math.log(x, base)
+
+
+# Toplu değerlendirmede eleman başına hata kodları (0: hata yok)
+DIVISION_BY_ZERO = 1
+UNDEFINED = 2
+NOT_REAL = 3
+
+ERROR_MESSAGES = {
+    DIVISION_BY_ZERO: "Sıfıra bölme hatası",
+    UNDEFINED: "Tanımsız işlem",
+    NOT_REAL: "Sonuç gerçel bir sayı değil",
+}
+
+_VECTOR_BINARY_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power,
+}
+
+_VECTOR_UNARY_OPERATORS = {
+    ast.UAdd: np.positive,
+    ast.USub: np.negative,
+}
+
+# Fonksiyonların tanım kümesi dışında kalan girdiler (math modülünün ValueError verdiği durumlar)
+_VECTOR_DOMAINS = {
+    "sqrt": lambda x: x < 0,
+    "log": lambda x, base=10.0: (x <= 0) | (np.asarray(base) <= 0) | (np.asarray(base) == 1),
+    "log10": lambda x: x <= 0,
+    "log2": lambda x: x <= 0,
+    "ln": lambda x: x <= 0,
+    "asin": lambda x: np.abs(x) > 1,
+    "acos": lambda x: np.abs(x) > 1,
+}
+
+# Derlenmiş ifade düğümü: (değişken dizileri, hata kodları) -> değerler
+Program = Callable[[Dict[str, np.ndarray], np.ndarray], np.ndarray]
+
+
+def _flag(errors: np.ndarray, mask, code: int) -> None:
+    """Henüz hata almamış ve `mask` ile seçilen elemanlara hata kodunu yazar (ilk hata korunur)."""
+    mask = np.broadcast_to(mask, errors.shape)
+    errors[mask & (errors == 0)] = code
+
+
+class EvaluationPlan:
+    """Bir kez derlenmiş ifade; değişken dizilerinin tüm elemanları için NumPy ile tek geçişte hesaplanır."""
+
+    def __init__(self, expression: str, variables: Tuple[str, ...], program: Program):
+        self.expression = expression
+        self.variables = variables
+        self._program = program
+
+    def evaluate(self, bindings: Dict[str, np.ndarray], size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        İfadeyi değişken dizileri üzerinde hesaplar.
+
+        Args:
+            bindings (Dict[str, np.ndarray]): Değişken adı -> `size` uzunluğunda değerler
+            size (int): Eleman sayısı
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sonuçlar ve eleman başına hata kodları (0: hata yok)
+        """
+        errors = np.zeros(size, dtype=np.int8)
+        with np.errstate(all="ignore"):
+            values = np.broadcast_to(np.asarray(self._program(bindings, errors), dtype=float), (size,))
+        _flag(errors, ~np.isfinite(values), NOT_REAL)
+        return values, errors
+
+
+class SafeEvaluator:
+    """
+    AST tabanlı, güvenli matematik ifadesi değerlendiricisi.
+
+    Sadece sayılar, aritmetik operatörler, parantezler ve izin verilen
+    fonksiyon/sabitler kabul edilir; geri kalan her şey
+    UnsupportedExpression ile reddedilir.
+    """
+
+    def __init__(self, angle_mode: str = MATH_ANGLE_MODE):
+        if angle_mode not in ("degrees", "radians"):
+            raise ValueError(f"Geçersiz açı birimi: {angle_mode}")
+        self.angle_mode = angle_mode
+        self.functions = self._build_functions()
+        self.vector_functions = self._build_vector_functions()
+
+    def _build_functions(self):
+        if self.angle_mode == "degrees":
+            to_rad, from_rad = math.radians, math.degrees
+        else:
+            to_rad = from_rad = lambda x: x
+
+        return {
+            "sqrt": math.sqrt,
+            "abs": abs,
+            "exp": math.exp,
+            "log": _log,
+            "log10": math.log10,
+            "log2": math.log2,
+            "ln": math.log,
+            "sin": lambda x: math.sin(to_rad(x)),
+            "cos": lambda x: math.cos(to_rad(x)),
+            "tan": lambda x: math.tan(to_rad(x)),
+            "asin": lambda x: from_rad(math.asin(x)),
+            "acos": lambda x: from_rad(math.acos(x)),
+            "atan": lambda x: from_rad(math.atan(x)),
+        }
+
+    def _build_vector_functions(self):
+        if self.angle_mode == "degrees":
+            to_rad, from_rad = np.radians, np.degrees
+        else:
+            to_rad = from_rad = lambda x: x
+
+        return {
+            "sqrt": np.sqrt,
+            "abs": np.abs,
+            "exp": np.exp,
+            "log": lambda x, base=10.0: np.log(x) / np.log(base),
+            "log10": np.log10,
+            "log2": np.log2,
+            "ln": np.log,
+            "sin": lambda x: np.sin(to_rad(x)),
+            "cos": lambda x: np.cos(to_rad(x)),
+            "tan": lambda x: np.tan(to_rad(x)),
+            "asin": lambda x: from_rad(np.arcsin(x)),
+            "acos": lambda x: from_rad(np.arccos(x)),
+            "atan": lambda x: from_rad(np.arctan(x)),
+        }
+
+    @staticmethod
+    def normalize(expression: str) -> str:
+        """İfadedeki alternatif sembolleri Python karşılıklarına çevirir."""
+        for old, new in _REPLACEMENTS.items():
+            expression = expression.replace(old, new)
+        return expression.strip()
+
+    def parse(self, expression: str, variables: Iterable[str] = ()) -> ast.AST:
+        """
+        İfadeyi ayrıştırır ve izin verilen düğümlerden oluştuğunu doğrular.
+
+        Args:
+            expression (str): Ayrıştırılacak ifade
+            variables (Iterable[str]): Sabitlere ek olarak izin verilen değişken adları
+
+        Raises:
+            UnsupportedExpression: İfade yerel motorla çözülemiyorsa
+        """
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            raise UnsupportedExpression("İfade çok uzun")
+        try:
+            tree = ast.parse(self.normalize(expression), mode="eval")
+        except (SyntaxError, ValueError) as e:
+            raise UnsupportedExpression(str(e))
+        self._validate(tree.body, frozenset(variables))
+        return tree.body
+
+    def _validate(self, node: ast.AST, variables: frozenset = frozenset()) -> None:
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise UnsupportedExpression(f"Desteklenmeyen sabit: {node.value!r}")
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in _BINARY_OPERATORS:
+                raise UnsupportedExpression("Desteklenmeyen operatör")
+            self._validate(node.left, variables)
+            self._validate(node.right, variables)
+        elif isinstance(node, ast.UnaryOp):
+            if type(node.op) not in _UNARY_OPERATORS:
+                raise UnsupportedExpression("Desteklenmeyen operatör")
+            self._validate(node.operand, variables)
+        elif isinstance(node, ast.Name):
+            if node.id not in _CONSTANTS and node.id not in variables:
+                raise UnsupportedExpression(f"Bilinmeyen isim: {node.id}")
+        elif isinstance(node, ast.Call):
+            if (
+                not isinstance(node.func, ast.Name)
+                or node.func.id not in self.functions
+                or node.keywords
+                or not 1 <= len(node.args) <= 2
+                or (len(node.args) == 2 and node.func.id != "log")
+            ):
+                raise UnsupportedExpression("Desteklenmeyen fonksiyon çağrısı")
+            for arg in node.args:
+                self._validate(arg, variables)
+        else:
+            raise UnsupportedExpression(f"Desteklenmeyen ifade: {type(node).__name__}")
+
+    def _eval(self, node: ast.AST) -> float:
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.BinOp):
+            return _BINARY_OPERATORS[type(node.op)](self._eval(node.left), self._eval(node.right))
+        if isinstance(node, ast.UnaryOp):
+            return _UNARY_OPERATORS[type(node.op)](self._eval(node.operand))
+        if isinstance(node, ast.Name):
+            return _CONSTANTS[node.id]
+        return self.functions[node.func.id](*(self._eval(arg) for arg in node.args))
+
+    def _compile(self, node: ast.AST) -> Program:
+        """Doğrulanmış düğümü NumPy işlemleriyle çalışan iç içe fonksiyonlara çevirir."""
+        if isinstance(node, ast.Constant):
+            constant = float(node.value)
+            return lambda env, errors: constant
+        if isinstance(node, ast.Name):
+            if node.id in _CONSTANTS:
+                constant = _CONSTANTS[node.id]
+                return lambda env, errors: constant
+            name = node.id
+            return lambda env, errors: env[name]
+        if isinstance(node, ast.UnaryOp):
+            unary, operand = _VECTOR_UNARY_OPERATORS[type(node.op)], self._compile(node.operand)
+            return lambda env, errors: unary(operand(env, errors))
+        if isinstance(node, ast.BinOp):
+            binary = _VECTOR_BINARY_OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            kind = type(node.op)
+
+            def run_binary(env, errors):
+                a, b = left(env, errors), right(env, errors)
+                if kind in (ast.Div, ast.FloorDiv, ast.Mod):
+                    _flag(errors, np.equal(b, 0), DIVISION_BY_ZERO)
+                elif kind is ast.Pow:
+                    _flag(errors, np.equal(a, 0) & np.less(b, 0), DIVISION_BY_ZERO)
+                return binary(a, b)
+            return run_binary
+
+        function = self.vector_functions[node.func.id]
+        domain = _VECTOR_DOMAINS.get(node.func.id)
+        args = [self._compile(arg) for arg in node.args]
+
+        def run_call(env, errors):
+            values = [arg(env, errors) for arg in args]
+            if domain is not None:
+                _flag(errors, domain(*values), UNDEFINED)
+            return function(*values)
+        return run_call
+
+    def compile(self, expression: str, variables: Iterable[str] = ()) -> EvaluationPlan:
+        """
+        İfadeyi değişken dizileri üzerinde vektörel hesaplanacak bir plana derler.
+
+        Args:
+            expression (str): Derlenecek ifade (örn: "sin(x) * 2 + log(y)")
+            variables (Iterable[str]): İfadede kullanılabilecek değişken adları
+
+        Returns:
+            EvaluationPlan: Tekrar tekrar çalıştırılabilen değerlendirme planı
+
+        Raises:
+            UnsupportedExpression: İfade yerel motorla çözülemiyorsa
+        """
+        variables = frozenset(variables)
+        node = self.parse(expression, variables)
+        used = tuple(sorted({
+            child.id for child in ast.walk(node) if isinstance(child, ast.Name) and child.id in variables
+        }))
+        return EvaluationPlan(expression, used, self._compile(node))
+
+    def evaluate(self, expression: str) -> float:
+        """
+        İfadeyi yerel olarak hesaplar.
+
+        Args:
+            expression (str): Hesaplanacak ifade (örn: "sqrt(16) + 5")
+
+        Returns:
+            float: İfadenin sonucu
+
+        Raises:
+            UnsupportedExpression: İfade ayrıştırılamıyorsa
+            MathDomainError: Sonuç tanımsızsa
+        """
+        node = self.parse(expression)
+        try:
+            result = self._eval(node)
+        except ZeroDivisionError:
+            raise MathDomainError("Sıfıra bölme hatası")
+        except (ValueError, OverflowError) as e:
+            raise MathDomainError(f"Tanımsız işlem: {str(e)}")
+        if isinstance(result, complex) or math.isnan(result) or math.isinf(result):
+            raise MathDomainError("Sonuç gerçel bir sayı değil")
+        return float(result)
+
+
 class MathOperations:
-    def __init__(self):
-        # LLM modelini başlat
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-pro",
-            temperature=0,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
-        
+    # Hangi yolun kaç kez yanıt verdiğini tutan süreç geneli sayaçlar
+    stats = {SOURCE_LOCAL: 0, SOURCE_LLM: 0}
+
+    def __init__(self, registry: Optional[LLMRegistry] = None, angle_mode: str = MATH_ANGLE_MODE):
+        """
+        Args:
+            registry (LLMRegistry): Paylaşılan LLM kaydı; verilmezse süreç geneli kayıt kullanılır
+            angle_mode (str): Trigonometrik fonksiyonların açı birimi
+        """
+        # Yerel değerlendirici
+        self.evaluator = SafeEvaluator(angle_mode)
+        self.registry = registry
+
         # Prompt template'i oluştur
         self.prompt = PromptTemplate(
             input_variables=["operation"],
             template=MATH_PROMPT
         )
-        
-        # LLM Chain'i oluştur
-        self.chain = LLMChain(
-            llm=self.llm,
-            prompt=self.prompt
-        )
-    
+
+    @property
+    def chain(self) -> LimitedChain:
+        """Paylaşılan istemciyi kullanan LLM zinciri."""
+        registry = self.registry or get_registry()
+        # Sıcaklık çağrı anında uygulanır; Gemini generation_config'i istemci ayarlarıyla birleştirir
+        return registry.chain("math", self.prompt, model=LLM_MODEL, generation_config={"temperature": 0})
+
+    async def solve(self, operation: str) -> dict:
+        """
+        İşlemi önce yerel motorla, çözülemezse LLM ile çözer.
+
+        Args:
+            operation (str): Çözülecek matematik işlemi (örn: "3 * 4 + 2")
+
+        Returns:
+            dict: {"result": float, "source": "local" | "llm"}
+        """
+        try:
+            with span("math.local"):
+                result = self.evaluator.evaluate(operation)
+            source = SOURCE_LOCAL
+        except UnsupportedExpression:
+            result = await self.solve_operation(operation)
+            source = SOURCE_LLM
+
+        MathOperations.stats[source] += 1
+        return {"result": result, "source": source}
+
+    def solve_batch(self, expressions: List[str], variables: Dict[str, List[float]]) -> List[dict]:
+        """
+        İfadeleri değişken dizilerinin her elemanı için yerel motorla vektörel hesaplar.
+
+        LLM'e düşülmez: yerel motorun çözemediği ifade için yalnızca hata döner.
+
+        Args:
+            expressions (List[str]): Hesaplanacak ifadeler (örn: ["sin(x) * 2 + log(y)"])
+            variables (Dict[str, List[float]]): Değişken adı -> değerler (hepsi aynı uzunlukta)
+
+        Returns:
+            List[dict]: İfade başına {"expression", "results", "errors", "error"};
+                hatalı elemanların sonucu None, `errors` [{"index", "error"}] listesidir
+
+        Raises:
+            ValueError: Değişken adı geçersizse veya dizilerin uzunlukları farklıysa
+        """
+        for name in variables:
+            if not name.isidentifier() or name in _CONSTANTS or name in self.evaluator.functions:
+                raise ValueError(f"Geçersiz değişken adı: {name}")
+        sizes = {len(values) for values in variables.values()}
+        if len(sizes) > 1:
+            raise ValueError("Tüm değişken dizileri aynı uzunlukta olmalı")
+        size = sizes.pop() if sizes else 1
+        bindings = {name: np.asarray(values, dtype=float) for name, values in variables.items()}
+
+        items = []
+        for expression in expressions:
+            try:
+                plan = self.evaluator.compile(expression, bindings)
+            except UnsupportedExpression as e:
+                items.append({"expression": expression, "results": [], "errors": [], "error": str(e)})
+                continue
+            values, codes = plan.evaluate(bindings, size)
+            results = values.tolist()
+            errors = []
+            for index in np.flatnonzero(codes).tolist():
+                results[index] = None
+                errors.append({"index": index, "error": ERROR_MESSAGES[int(codes[index])]})
+            items.append({"expression": expression, "results": results, "errors": errors, "error": None})
+            MathOperations.stats[SOURCE_LOCAL] += 1
+        return items
+
     async def solve_operation(self, operation: str) -> float:
         """
         Verilen matematik işlemini LLM kullanarak çözer.
-        
+
         Args:
             operation (str): Çözülecek matematik işlemi (örn: "3 * 4 + 2")
-            
+
         Returns:
             float: İşlemin sonucu
         """
         try:
             # LLM'den yanıt al
-            response = await self.chain.ainvoke({"operation": operation})
+            # Kısa, etkileşimli çağrı olduğu için kuyrukta öne alınır
+            response = await self.chain.ainvoke({"operation": operation}, priority=PRIORITY_HIGH)
             result = response['text'].strip()
-            
+
             # Sonucu float'a çevir
             return float(result)
+        except LLMUnavailableError:
+            raise
         except ValueError as e:
             raise ValueError(f"Sonuç sayısal bir değere dönüştürülemedi: {str(e)}")
         except Exception as e:
@@ -61,4 +474,4 @@ class MathOperations:
 class MathTool:
     @staticmethod
     def multiply(a: float, b: float) -> float:
-        return a * b 
\ No newline at end of file
+        return a * b
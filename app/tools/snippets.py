@@ -0,0 +1,79 @@
+"""
+Arama sonuçları için sorgu merkezli kısa alıntılar (snippet).
+
+Parçanın tamamı yerine sorgu terimlerinin en yoğun geçtiği pencere
+döndürülür. Terimler BM25 indeksiyle aynı kurallarla (Türkçe büyük/küçük
+harf) küçültülür ve istek başına bir kez derlenen tek desenle aranır;
+pencere kelime ortasında başlamaz ve bitmez.
+"""
+from app.config import SEARCH_SNIPPET_LENGTH
+from app.database.bm25_index import fold_case, tokenize
+from typing import Optional, Pattern
+import re
+
+ELLIPSIS = "…"
+
+
+def query_pattern(query: str) -> Optional[Pattern]:
+    """Sorgu terimlerini küçültülmüş metinde bulan desen; sorguda terim yoksa None."""
+    terms = sorted(set(tokenize(query)), key=len, reverse=True)
+    if not terms:
+        return None
+    # Kelime sınırı kontrolü eşleşmelerde yapılır; sınır ifadeli desen her konumda ~3 kat yavaş
+    return re.compile("|".join(map(re.escape, terms)))
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def make_snippet(text: str, pattern: Optional[Pattern], length: int = SEARCH_SNIPPET_LENGTH) -> str:
+    """
+    Metinden sorgu terimlerini en çok içeren `length` karakterlik pencereyi alır.
+
+    Args:
+        text (str): Parça metni
+        pattern (Pattern): query_pattern ile derlenmiş terim deseni
+        length (int): En büyük alıntı uzunluğu (üç nokta hariç)
+
+    Returns:
+        str: Alıntı; kırpılan uçlarda "…" bulunur. Terim geçmiyorsa metnin başı.
+    """
+    if len(text) <= length:
+        return text
+
+    folded = fold_case(text)
+    # Küçültme uzunluğu değiştirdiyse (nadir) ofsetler metne uymaz; baştan alıntı yapılır
+    hits = [] if pattern is None or len(folded) != len(text) else [
+        match.span() for match in pattern.finditer(folded)
+        if not (match.start() and _is_word_char(folded[match.start() - 1]))
+        and not (match.end() < len(folded) and _is_word_char(folded[match.end()]))
+    ]
+
+    # En çok terimi kapsayan pencere (iki işaretçi)
+    best_first, best_last, first = 0, -1, 0
+    for last, (_, end) in enumerate(hits):
+        while first < last and end - hits[first][0] > length:
+            first += 1
+        if last - first > best_last - best_first:
+            best_first, best_last = first, last
+
+    if best_last < 0:
+        start = 0
+    else:
+        # Terim kümesini pencerenin ortasına yerleştir
+        cluster_start, cluster_end = hits[best_first][0], hits[best_last][1]
+        start = cluster_start - (length - (cluster_end - cluster_start)) // 2
+        start = max(0, min(start, len(text) - length))
+    end = start + length
+
+    # Kelime sınırlarına çek
+    if start > 0 and not text[start - 1].isspace():
+        space = text.find(" ", start, end)
+        start = space + 1 if space >= 0 else start
+    if end < len(text) and not text[end].isspace():
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+
+    snippet = text[start:end].strip()
+    return f"{ELLIPSIS if start > 0 else ''}{snippet}{ELLIPSIS if end < len(text) else ''}"
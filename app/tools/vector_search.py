@@ -1,6 +1,18 @@
+from typing import Any, Dict, List
+
 class VectorSearchTool:
     def __init__(self, vector_store):
         self.vector_store = vector_store
     
-    def search(self, query):
-        return self.vector_store.search_similar(query) 
\ No newline at end of file
+    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Vektör deposunda benzerlik araması yapar.
+
+        Args:
+            query (str): Arama sorgusu
+            n_results (int): Döndürülecek sonuç sayısı
+
+        Returns:
+            List[dict]: id, content, metadata ve similarity alanlarıyla sonuçlar
+        """
+        return self.vector_store.search_similar(query, n_results=n_results)
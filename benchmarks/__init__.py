@@ -0,0 +1,5 @@
+"""
+Çevrimdışı performans ölçümleri.
+
+Örnek: python -m benchmarks.bench_pdf_extraction --pages 120
+"""
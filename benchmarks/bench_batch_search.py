@@ -0,0 +1,68 @@
+"""
+N ardışık /vector/search çağrısını tek bir /vector/search/batch çağrısıyla karşılaştırır.
+
+Ölçüm geçici bir Chroma dizininde, sentetik bir korpus üzerinde yapılır.
+
+Kullanım:
+    python -m benchmarks.bench_batch_search --queries 50 --documents 200
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("CHROMA_PERSIST_DIRECTORY", tempfile.mkdtemp(prefix="bench-chroma-"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.resources import get_vectorstore  # noqa: E402
+from benchmarks.synthetic import make_corpus, make_sentence  # noqa: E402
+
+
+def make_queries(count: int, seed: int):
+    rng = random.Random(seed)
+    return [{"query": make_sentence(rng, 5), "top_k": 5} for _ in range(count)]
+
+
+def run(queries: int, documents: int) -> dict:
+    corpus = make_corpus(documents)
+    get_vectorstore().add_texts(corpus, metadatas=[{"source": f"doc-{i}"} for i in range(len(corpus))])
+
+    # Embedding önbelleği iki yöntemi etkilemesin diye farklı sorgu kümeleri kullanılır
+    sequential_queries = make_queries(queries, seed=1)
+    batch_queries = make_queries(queries, seed=2)
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        for query in sequential_queries:
+            client.post("/vector/search", json=query).raise_for_status()
+        sequential_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.post("/vector/search/batch", json={"queries": batch_queries}).raise_for_status()
+        batch_seconds = time.perf_counter() - start
+
+    return {
+        "queries": queries,
+        "documents": documents,
+        "sequential_seconds": round(sequential_seconds, 4),
+        "batch_seconds": round(batch_seconds, 4),
+        "sequential_queries_per_second": round(queries / sequential_seconds, 1),
+        "batch_queries_per_second": round(queries / batch_seconds, 1),
+        "speedup": round(sequential_seconds / batch_seconds, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.queries, args.documents), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Metin normalleştirme ve parçalama yolunu önceki yolla karşılaştırır.
+
+Önceki yol: iki regex değişimi ve encode/decode turuyla temizlik, ardından
+sınırlı tamponlu `legacy_iter_chunks` üzerinde RecursiveCharacterTextSplitter.
+Yeni yol: tek geçişli `normalize` ve `SentenceChunker` (cümle sınırları ve
+kaynak ofsetleriyle). İki yol da metin dosyası yüklemesindeki gibi 64 KB'lık
+gürültülü ham bloklarla beslenir; tepe bellek tracemalloc ile ölçülür.
+
+Kullanım:
+    python -m benchmarks.bench_chunking --megabytes 4 --output chunking.json
+"""
+from app.ingestion.chunker import SentenceChunker, normalize
+from app.ingestion.pipeline import iter_text_blocks
+from benchmarks.report import environment, measure, save
+from benchmarks.synthetic import add_noise, make_text
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from bisect import bisect_right
+from typing import Callable, Iterable, Iterator, List, Tuple
+import argparse
+import io
+import re
+import tracemalloc
+
+
+def legacy_clean_text(text: str) -> str:
+    """Tek geçişli normalleştirmeden önceki clean_text."""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.,;!?-]', '', text)
+    text = text.encode('utf-8', 'ignore').decode('utf-8')
+    return text.strip()
+
+
+def legacy_iter_chunks(
+    pages: Iterable[Tuple[int, str]],
+    splitter,
+    buffer_size: int = 8000
+) -> Iterator[Tuple[str, int]]:
+    """
+    Sayfaları sınırlı bir tampon üzerinde parçalar (SentenceChunker'dan önceki yükleme yolu).
+
+    Tampon `buffer_size` karakteri aştığında son parça hariç tüm parçalar
+    üretilir; son parça bir sonraki sayfanın başına eklenir ve böylece
+    splitter'ın örtüşmesi sayfa sınırlarında da korunur.
+
+    Args:
+        pages (Iterable): (sayfa numarası, metin) çiftleri
+        splitter: split_text(str) -> List[str] sağlayan text splitter
+        buffer_size (int): Parçalamanın tetikleneceği tampon boyutu
+
+    Yields:
+        Tuple[str, int]: (parça metni, parçanın başladığı sayfa)
+    """
+    buffer = ""
+    # Tampondaki sayfa başlangıçları: (ofset, sayfa)
+    offsets: List[int] = []
+    numbers: List[int] = []
+
+    def locate(chunks: List[str]) -> List[Tuple[str, int, int]]:
+        located, cursor = [], 0
+        for chunk in chunks:
+            start = buffer.find(chunk, cursor)
+            if start < 0:
+                start = cursor
+            located.append((chunk, start, numbers[max(bisect_right(offsets, start) - 1, 0)]))
+            cursor = start + 1
+        return located
+
+    for number, text in pages:
+        if not text:
+            continue
+        if buffer:
+            buffer += " "
+        offsets.append(len(buffer))
+        numbers.append(number)
+        buffer += text
+
+        if len(buffer) < buffer_size:
+            continue
+
+        located = locate(splitter.split_text(buffer))
+        for chunk, _, page in located[:-1]:
+            yield chunk, page
+
+        # Son parçayı tamponda bırak
+        _, keep_from, _ = located[-1]
+        buffer = buffer[keep_from:]
+        keep = bisect_right(offsets, keep_from) - 1
+        offsets = [0] + [offset - keep_from for offset in offsets[keep + 1:]]
+        numbers = numbers[keep:]
+
+    if buffer:
+        for chunk, _, page in locate(splitter.split_text(buffer)):
+            yield chunk, page
+
+
+def peak_memory(fn: Callable[[], Iterable]) -> float:
+    """Üretilen parçaları saklamadan tüketirken ayrılan tepe belleği (MB) döndürür."""
+    tracemalloc.start()
+    try:
+        for _ in fn():
+            pass
+        return round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def run(megabytes: float, chunk_size: int, chunk_overlap: int, repeats: int) -> dict:
+    paragraph = add_noise(make_text(1))
+    raw = (paragraph + "\n\n") * max(1, int(megabytes * 1e6 / (len(paragraph.encode("utf-8")) + 2)))
+    blocks = list(iter_text_blocks(io.BytesIO(raw.encode("utf-8"))))
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len)
+    chunker = SentenceChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    def legacy():
+        return legacy_iter_chunks(((1, legacy_clean_text(block)) for block in blocks), splitter)
+
+    def current():
+        return chunker.iter_chunks((1, block) for block in blocks)
+
+    legacy_chunks = list(legacy())
+    current_chunks = list(current())
+    report = {
+        "environment": environment(),
+        "parameters": {
+            "megabytes": round(len(raw.encode("utf-8")) / 1e6, 2), "blocks": len(blocks),
+            "chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "repeats": repeats,
+        },
+        "normalize": {
+            "legacy": measure(lambda: [legacy_clean_text(block) for block in blocks], repeats),
+            "current": measure(lambda: [normalize(block) for block in blocks], repeats),
+        },
+        "pipeline": {
+            "legacy": measure(lambda: list(legacy()), repeats),
+            "current": measure(lambda: list(current()), repeats),
+        },
+        "chunks": {
+            "legacy": len(legacy_chunks),
+            "current": len(current_chunks),
+            "legacy_mean_length": round(sum(len(chunk) for chunk, _ in legacy_chunks) / len(legacy_chunks), 1),
+            "current_mean_length": round(sum(len(chunk.text) for chunk in current_chunks) / len(current_chunks), 1),
+        },
+        "peak_memory_mb": {"legacy": peak_memory(legacy), "current": peak_memory(current)},
+    }
+    for stage in ("normalize", "pipeline"):
+        result = report[stage]
+        for path in ("legacy", "current"):
+            result[path]["mb_per_second"] = round(report["parameters"]["megabytes"] / (result[path]["mean_ms"] / 1000), 2)
+        result["speedup"] = round(result["legacy"]["mean_ms"] / result["current"]["mean_ms"], 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=4, help="Üretilecek ham metin boyutu")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Sonuçların kaydedileceği JSON dosyası")
+    args = parser.parse_args()
+    save(run(args.megabytes, args.chunk_size, args.chunk_overlap, args.repeats), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Embedding arka uçlarını sabit bir Türkçe/İngilizce korpus üzerinde karşılaştırır.
+
+Ölçülen değerler saniyedeki cümle sayısı ve recall@k'dır. Referans mevcut
+HuggingFaceEmbeddings (PyTorch) arka ucudur; recall, her sorgunun
+referanstaki en yakın k cümlesinin aday arka uçta da ilk k'da bulunma oranıdır.
+ONNX modelleri önceden `python -m app.database.onnx_embeddings` ile
+üretilmiş olmalıdır. Yüklenemeyen arka uç raporda hata ile gösterilir.
+
+Kullanım:
+    python -m benchmarks.bench_embeddings --sentences 2000 --queries 100 --threads 4
+"""
+from app.config import EMBEDDING_MODEL, ONNX_MODEL_DIR
+from benchmarks.synthetic import make_sentence
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+
+def make_sentences(count: int, seed: int):
+    rng = random.Random(seed)
+    return [make_sentence(rng, rng.randint(4, 24)) for _ in range(count)]
+
+
+def load_backends(threads: int, batch_size: int) -> dict:
+    def huggingface():
+        from langchain.embeddings import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, encode_kwargs={"batch_size": batch_size})
+
+    def onnx(quantized):
+        from app.database.onnx_embeddings import OnnxEmbeddings
+        return lambda: OnnxEmbeddings(
+            ONNX_MODEL_DIR, quantized=quantized, intra_op_threads=threads, batch_size=batch_size
+        )
+
+    backends = {}
+    for name, factory in [("huggingface", huggingface), ("onnx_fp32", onnx(False)), ("onnx_int8", onnx(True))]:
+        try:
+            backends[name] = factory()
+        except Exception as e:
+            backends[name] = e
+    return backends
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def run(sentences: int, queries: int, k: int, threads: int, batch_size: int) -> dict:
+    corpus = make_sentences(sentences, seed=0)
+    query_texts = make_sentences(queries, seed=1)
+    report = {"sentences": sentences, "queries": queries, "top_k": k, "threads": threads}
+    neighbours = {}
+
+    for name, backend in load_backends(threads, batch_size).items():
+        if isinstance(backend, Exception):
+            report[name] = {"error": str(backend)}
+            continue
+        # İlk çağrı ölçüme katılmaz (ısınma)
+        backend.embed_documents(corpus[:batch_size])
+        start = time.perf_counter()
+        vectors = np.asarray(backend.embed_documents(corpus), dtype=np.float32)
+        seconds = time.perf_counter() - start
+        neighbours[name] = top_k(vectors, np.asarray(backend.embed_documents(query_texts), dtype=np.float32), k)
+        report[name] = {"sentences_per_second": round(sentences / seconds, 1)}
+
+    reference = neighbours.get("huggingface")
+    for name, found in neighbours.items():
+        if reference is not None:
+            report[name]["recall_at_k"] = round(float(np.mean([
+                len(set(a) & set(b)) / k for a, b in zip(found, reference)
+            ])), 4)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sentences, args.queries, args.top_k, args.threads, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Koleksiyon büyüdükçe filtresiz ve filtreli arama gecikmesini ölçer.
+
+Üç yol karşılaştırılır: filtresiz HNSW araması, Chroma'ya iletilen
+`where` filtresi ve kaynak indeksiyle yalnızca adayların tam skorlanması.
+Vektörler rastgele üretilir; embedding modeli gerekmez.
+
+Kullanım:
+    python -m benchmarks.bench_filtered_search --sizes 1000 5000 20000 --sources 200
+"""
+from app.database.metadata_index import SourceIndex, build_where, exact_search
+from langchain.vectorstores import Chroma
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+DIMENSION = 384
+
+
+def percentile_ms(samples, q):
+    return round(1000 * float(np.percentile(samples, q)), 3)
+
+
+def measure(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": percentile_ms(samples, 50), "p95_ms": percentile_ms(samples, 95),
+            "mean_ms": round(1000 * statistics.mean(samples), 3)}
+
+
+def run(sizes, sources: int, k: int, repeats: int) -> list:
+    rng = np.random.default_rng(0)
+    vectorstore = Chroma(persist_directory=tempfile.mkdtemp(prefix="bench-filter-"), collection_name="bench")
+    index = SourceIndex()
+    report, total = [], 0
+
+    for size in sizes:
+        # Koleksiyonu hedef boyuta büyüt
+        while total < size:
+            count = min(5000, size - total)
+            vectors = rng.standard_normal((count, DIMENSION)).astype(np.float32)
+            ids = [f"chunk-{total + i}" for i in range(count)]
+            metadatas = [{"source": f"doc-{(total + i) % sources}.pdf", "page": (total + i) % 30} for i in range(count)]
+            vectorstore._collection.add(
+                ids=ids, embeddings=vectors.tolist(), metadatas=metadatas,
+                documents=[f"parça {total + i}" for i in range(count)]
+            )
+            for id_, metadata in zip(ids, metadatas):
+                index.add(metadata["source"], [id_])
+            total += count
+
+        query = rng.standard_normal(DIMENSION).astype(np.float32).tolist()
+        where = build_where({"source": "doc-7.pdf"})
+        candidates = index.candidates(["doc-7.pdf"])
+
+        report.append({
+            "collection_size": size,
+            "candidates": len(candidates),
+            "unfiltered": measure(lambda: vectorstore.similarity_search_by_vector_with_relevance_scores(query, k=k), repeats),
+            "filtered_pushdown": measure(
+                lambda: vectorstore.similarity_search_by_vector_with_relevance_scores(query, k=k, filter=where), repeats
+            ),
+            "filtered_local_index": measure(lambda: exact_search(vectorstore, query, candidates, k), repeats),
+        })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--sources", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.sources, args.top_k, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
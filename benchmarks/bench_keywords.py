@@ -0,0 +1,46 @@
+"""
+Yerel anahtar kelime çıkarıcının metin uzunluğuna göre gecikmesini ölçer.
+
+Her boyut için sentetik bir metin üretilir ve `KeywordExtractor.extract`
+tekrarlı çağrılır. LLM yolu ağ gerektirdiği için ölçülmez; karşılaştırma
+için /keywords isteğinin `mode=llm` gecikmesi ayrıca ölçülebilir.
+
+Kullanım:
+    python -m benchmarks.bench_keywords --paragraphs 1 5 20 --runs 20
+"""
+from app.tools.keyword_extractor import KeywordExtractor
+from benchmarks.synthetic import make_text
+import argparse
+import json
+import statistics
+import time
+
+
+def run(paragraphs: list, runs: int, num_keywords: int) -> dict:
+    extractor = KeywordExtractor()
+    report = {}
+    for count in paragraphs:
+        text = make_text(paragraphs=count)
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            extractor.extract(text, num_keywords)
+            samples.append((time.perf_counter() - start) * 1000)
+        report[f"{len(text.split())}_words"] = {
+            "median_ms": round(statistics.median(samples), 3),
+            "max_ms": round(max(samples), 3),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--num-keywords", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.paragraphs, args.runs, args.num_keywords), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Uç noktalar için asenkron yük üreteci.
+
+Varsayılan olarak uygulama aynı süreçte ASGI üzerinden çağrılır (ağ yok):
+sahte LLM (`--llm-latency` ile gecikmeli), kelime karması embedding'i ve
+NumPy vektör deposu kullanılır; önce sentetik dökümanlar /documents/upload
+ile yüklenir. Her uç nokta her eşzamanlılık düzeyinde ayrı ayrı ölçülür ve
+saniyedeki istek sayısı, p50/p95/p99 gecikme ve hata sayıları raporlanır.
+`--base-url` verilirse çalışan bir sunucuya HTTP ile yük gönderilir.
+
+İstemci ve uygulama aynı olay döngüsünü paylaştığı için süreç içi
+sonuçlar mutlak kapasite değil, sürümler arası karşılaştırma içindir.
+
+Kullanım:
+    python -m benchmarks.bench_load --concurrency 1 8 32 --requests 200 --output load.json
+    python -m benchmarks.report baseline.json load.json
+"""
+from benchmarks.report import environment, save, summarize, use_offline_backends
+from benchmarks.synthetic import ENGLISH_WORDS, TURKISH_WORDS, make_corpus, make_sentence, make_text
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import time
+
+import httpx
+
+# Sıra numarasından istek gövdesi üreten fonksiyon
+Scenario = Callable[[int], Dict[str, Any]]
+
+
+def respond(prompt: str) -> str:
+    """Sahte LLM için istem türüne uygun, deterministik yanıt."""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    if "matematik" in prompt:
+        return str(rng.randint(1, 1000))
+    if "anahtar kelime" in prompt:
+        return ", ".join(rng.sample(TURKISH_WORDS, 5))
+    return make_sentence(rng, 40)
+
+
+def make_scenarios(query_pool: int, seed: int = 0) -> Dict[str, tuple]:
+    """
+    Ölçülecek uç noktalar: ad -> (metot, yol, gövde üreteci veya None).
+
+    Arama ve anahtar kelime istekleri `query_pool` büyüklüğünde bir havuzdan
+    seçilir; havuz küçüldükçe önbellek isabeti artar.
+    """
+    rng = random.Random(seed)
+    queries = [make_sentence(rng, rng.randint(2, 6)) for _ in range(query_pool)]
+    texts = [make_text(1, rng.randint(2, 6), seed=seed + i) for i in range(query_pool)]
+    values = [round(rng.uniform(1, 360), 2) for _ in range(100)]
+
+    def pick(pool: List[str], i: int) -> str:
+        return pool[(i * 7919) % len(pool)]
+
+    def search(mode: str) -> Scenario:
+        return lambda i: {"query": pick(queries, i), "top_k": 5, "mode": mode}
+
+    return {
+        "health": ("GET", "/health/live", None),
+        "math_local": ("POST", "/math/solve", lambda i: {"operation": f"sqrt({i % 97 + 1}) * sin({i % 360}) + 2 ^ 3"}),
+        "math_llm": ("POST", "/math/solve", lambda i: {"operation": f"{i % 50} artı {i % 7} kaç eder"}),
+        "math_batch": ("POST", "/math/solve/batch", lambda i: {
+            "expression": "sin(x) * 2 + log(x + 1) / (x - 180)", "variables": {"x": values}
+        }),
+        "search_vector": ("POST", "/vector/search", search("vector")),
+        "search_lexical": ("POST", "/vector/search", search("lexical")),
+        "search_hybrid": ("POST", "/vector/search", search("hybrid")),
+        "search_batch": ("POST", "/vector/search/batch", lambda i: {
+            "queries": [{"query": pick(queries, i + j), "top_k": 5} for j in range(10)]
+        }),
+        "keywords_fast": ("POST", "/keywords", lambda i: {"text": pick(texts, i), "num_keywords": 5, "mode": "fast"}),
+        "keywords_llm": ("POST", "/keywords", lambda i: {"text": pick(texts, i), "num_keywords": 5, "mode": "llm"}),
+        "ask": ("POST", "/ask", lambda i: {"question": pick(queries, i), "mode": "hybrid"}),
+        "metrics": ("GET", "/metrics", None),
+        "upload": ("POST", "/documents/upload", None),
+    }
+
+
+def upload_file(i: int, prefix: str = "load") -> Dict[str, Any]:
+    rng = random.Random(f"{prefix}-{i}")
+    words = ENGLISH_WORDS if i % 2 else TURKISH_WORDS
+    text = f"{prefix} {i}. " + " ".join(rng.choice(words) for _ in range(rng.randint(100, 400)))
+    return {"files": {"file": (f"{prefix}-{i}.txt", text.encode("utf-8"), "text/plain")}}
+
+
+async def send(client: httpx.AsyncClient, name: str, scenario: tuple, i: int) -> httpx.Response:
+    method, path, body = scenario
+    if name == "upload":
+        return await client.post(path, **upload_file(i, prefix=f"load-{time.monotonic_ns()}"))
+    if body is None:
+        return await client.request(method, path)
+    return await client.request(method, path, json=body(i))
+
+
+def server_first_token(response: httpx.Response) -> Optional[float]:
+    """/ask akışındaki `timings` olayından sunucunun ölçtüğü ilk token süresi (ms)."""
+    event = None
+    for line in response.text.splitlines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: ") and event == "timings":
+            return json.loads(line[len("data: "):]).get("first_token")
+    return None
+
+
+async def run_level(
+    client: httpx.AsyncClient, name: str, scenario: tuple, concurrency: int, requests: int, offset: int = 0
+) -> Dict[str, Any]:
+    """
+    `requests` isteği `concurrency` eşzamanlı işçiyle gönderir ve sonuçları özetler.
+
+    İstek gövdeleri `offset`ten başlayan sıra numaralarıyla üretilir; düzeyler
+    farklı başlangıç kullanınca bir düzey diğerinin önbelleğini ısıtmaz.
+    """
+    counter = itertools.count()
+    latencies: List[float] = []
+    first_tokens: List[float] = []
+    statuses: Counter = Counter()
+
+    async def worker():
+        while (n := next(counter)) < requests:
+            start = time.perf_counter()
+            try:
+                response = await send(client, name, scenario, offset + n)
+                status = response.status_code
+            except Exception as e:
+                response, status = None, type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] += 1
+            if name == "ask" and response is not None and status == 200:
+                first_token = server_first_token(response)
+                if first_token is not None:
+                    first_tokens.append(first_token / 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    errors = sum(count for status, count in statuses.items() if not (status.isdigit() and int(status) < 400))
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4),
+        "throughput_rps": round(requests / elapsed, 1),
+        **summarize(latencies),
+        "status_counts": dict(statuses),
+    }
+    if first_tokens:
+        result["server_first_token"] = summarize(first_tokens)
+    return result
+
+
+async def seed(client: httpx.AsyncClient, documents: int, paragraphs: int) -> Dict[str, Any]:
+    """Sentetik dökümanları yükler ve tüm işler bitene kadar bekler."""
+    start = time.perf_counter()
+    pending, job_ids = list(enumerate(make_corpus(documents, paragraphs))), []
+    while pending:
+        i, text = pending[0]
+        response = await client.post(
+            "/documents/upload", files={"file": (f"seed-{i}.txt", text.encode("utf-8"), "text/plain")}
+        )
+        if response.status_code == 503:
+            # Yükleme kuyruğu dolu; işlerin ilerlemesini bekle
+            await asyncio.sleep(0.05)
+            continue
+        response.raise_for_status()
+        job_ids.append(response.json()["job_id"])
+        pending.pop(0)
+
+    chunks = 0
+    for job_id in job_ids:
+        while True:
+            job = (await client.get(f"/documents/jobs/{job_id}")).json()
+            if job["status"] in ("completed", "failed"):
+                chunks += job["progress"].get("chunks", 0)
+                break
+            await asyncio.sleep(0.02)
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": documents,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "documents_per_second": round(documents / elapsed, 1),
+    }
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while (await client.get("/health/ready")).status_code != 200:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Uygulama hazır olmadı")
+        await asyncio.sleep(0.05)
+
+
+async def wait_for_ingestion(client: httpx.AsyncClient) -> None:
+    """Yük sırasında kuyruğa alınan yüklemeler bitene kadar bekler (sonraki ölçümü etkilemesin)."""
+    while True:
+        metrics = (await client.get("/metrics")).text
+        depth = next(
+            (line.split()[-1] for line in metrics.splitlines() if line.startswith("ai_tools_ingestion_queue_depth ")),
+            "0"
+        )
+        if float(depth) == 0:
+            return
+        await asyncio.sleep(0.05)
+
+
+@asynccontextmanager
+async def open_client(base_url: Optional[str], llm_latency: float, llm_jitter: float):
+    """Süreç içi uygulama (lifespan dahil) veya uzak sunucu için istemci açar."""
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            yield client
+        return
+
+    from app.llm.fake import fake_backend
+    from app.llm.registry import init_registry
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        # Lifespan'in oluşturduğu kaydı istem türüne göre yanıt veren sahte modelle değiştir
+        init_registry(fake_backend(responder=respond, latency=llm_latency, latency_jitter=llm_jitter, seed=0))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            yield client
+
+
+async def run(args) -> Dict[str, Any]:
+    scenarios = make_scenarios(args.query_pool)
+    names = args.endpoints or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen uç nokta: {', '.join(sorted(unknown))}")
+
+    report: Dict[str, Any] = {
+        "environment": environment(),
+        "parameters": {
+            "concurrency": args.concurrency, "requests": args.requests, "documents": args.documents,
+            "query_pool": args.query_pool, "llm_latency": args.llm_latency, "base_url": args.base_url,
+        },
+        "endpoints": {},
+    }
+    async with open_client(args.base_url, args.llm_latency, args.llm_jitter) as client:
+        await wait_until_ready(client)
+        if args.documents:
+            report["ingestion"] = await seed(client, args.documents, args.paragraphs)
+
+        for name in names:
+            report["endpoints"][name] = {}
+            for level, concurrency in enumerate(args.concurrency):
+                # Isınma: ilk istekteki tembel yüklemeler ölçüme girmesin
+                await send(client, name, scenarios[name], -1)
+                result = await run_level(
+                    client, name, scenarios[name], concurrency, args.requests, offset=level * args.requests
+                )
+                report["endpoints"][name][f"c{concurrency}"] = result
+                print(
+                    f"{name:<16} c={concurrency:<4} {result['throughput_rps']:>9.1f} rps  "
+                    f"p50={result.get('p50_ms', 0):.1f} p95={result.get('p95_ms', 0):.1f} "
+                    f"p99={result.get('p99_ms', 0):.1f} ms  hata={result['errors']}",
+                    flush=True
+                )
+                if name == "upload":
+                    await wait_for_ingestion(client)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Uç nokta ve düzey başına istek sayısı")
+    parser.add_argument("--endpoints", nargs="+", help="Ölçülecek uç noktalar (varsayılan: hepsi)")
+    parser.add_argument("--documents", type=int, default=100, help="Önceden yüklenecek sentetik döküman")
+    parser.add_argument("--paragraphs", type=int, default=3, help="Döküman başına paragraf")
+    parser.add_argument("--query-pool", type=int, default=1000, help="Farklı sorgu/metin sayısı")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Sahte LLM gecikmesi (saniye)")
+    parser.add_argument("--llm-jitter", type=float, default=0.02, help="Sahte LLM gecikmesine eklenen rastgele süre")
+    parser.add_argument("--base-url", help="Süreç içi uygulama yerine bu sunucuya yük gönder")
+    parser.add_argument("--output", help="Sonuçların kaydedileceği JSON dosyası")
+    args = parser.parse_args()
+    # Süreç içi uygulama run() içinde içe aktarılır; çevrimdışı ayarlar ondan önce yapılmalı
+    if not args.base_url:
+        use_offline_backends()
+    save(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
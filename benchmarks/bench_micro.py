@@ -0,0 +1,135 @@
+"""
+Yükleme ve arama yolunun yapı taşları için mikro ölçümler.
+
+Ölçülenler: `clean_text`, metin bölücü (`split_text` ve yüklemedeki akış
+halinde `iter_chunks`), metin ve PDF dosyaları için `iter_pages`, ve
+vector/lexical/hybrid arama (`run_search`) ile sorgu embedding'i. Sahte LLM,
+model gerektirmeyen kelime karması embedding'i ve NumPy vektör deposu
+kullanılır; ağ bağlantısı gerekmez. Korpus ve PDF sentetik olarak üretilir.
+
+Kullanım:
+    python -m benchmarks.bench_micro --paragraphs 200 --pdf-pages 40 --documents 500 --output micro.json
+"""
+from benchmarks.report import use_offline_backends
+
+use_offline_backends()
+
+from app.ingestion.pipeline import clean_text, iter_pages  # noqa: E402
+from app.main import SearchRequest, run_search, text_splitter  # noqa: E402
+from app.resources import get_document_index, get_embeddings  # noqa: E402
+from benchmarks.report import environment, measure, save  # noqa: E402
+from benchmarks.synthetic import add_noise, make_corpus, make_pdf, make_sentence, make_text  # noqa: E402
+import argparse  # noqa: E402
+import io  # noqa: E402
+import random  # noqa: E402
+
+
+def throughput(result: dict, units: float, name: str) -> dict:
+    """Ortalama süreden saniyedeki birim sayısını ekler."""
+    return {**result, f"{name}_per_second": round(units / (result["mean_ms"] / 1000), 1)}
+
+
+def bench_text(paragraphs: int, repeats: int) -> dict:
+    raw = add_noise(make_text(paragraphs))
+    cleaned = clean_text(raw)
+    chunks = text_splitter.split_text(cleaned)
+    # Sayfa başına ~3000 karakter
+    pages = [(i + 1, cleaned[start:start + 3000]) for i, start in enumerate(range(0, len(cleaned), 3000))]
+
+    return {
+        "characters": len(raw),
+        "chunks": len(chunks),
+        "clean_text": throughput(measure(lambda: clean_text(raw), repeats), len(raw), "chars"),
+        "text_splitter": throughput(
+            measure(lambda: text_splitter.split_text(cleaned), repeats), len(chunks), "chunks"
+        ),
+        "iter_chunks": throughput(
+            measure(lambda: list(text_splitter.iter_chunks(pages)), repeats), len(chunks), "chunks"
+        ),
+    }
+
+
+def extract(content: bytes, filename: str) -> list:
+    """Yükleme yolundaki gibi ham sayfa metinlerini okur (temizlik parçalayıcıda yapılır)."""
+    return list(iter_pages(io.BytesIO(content), filename, clean=False))
+
+
+def bench_extraction(paragraphs: int, pdf_pages: int, repeats: int) -> dict:
+    text_bytes = add_noise(make_text(paragraphs)).encode("utf-8")
+    pdf_bytes = make_pdf(pdf_pages)
+
+    return {
+        "text_bytes": len(text_bytes),
+        "pdf_pages": pdf_pages,
+        "extract_text": throughput(
+            measure(lambda: extract(text_bytes, "bench.txt"), repeats),
+            len(text_bytes) / 1e6, "mb"
+        ),
+        "extract_pdf": throughput(
+            measure(lambda: extract(pdf_bytes, "bench.pdf"), max(1, repeats // 5)),
+            pdf_pages, "pages"
+        ),
+    }
+
+
+def bench_search(documents: int, queries: int, top_k: int) -> dict:
+    document_index = get_document_index()
+    chunk_count = 0
+    for i, text in enumerate(make_corpus(documents)):
+        source = f"doc-{i}.txt"
+        items = [
+            (chunk, {"source": source, "chunk": n, "page": 1})
+            for n, chunk in enumerate(text_splitter.split_text(text))
+        ]
+        chunk_count += len(items)
+        document_index.upsert(source, items, set(), set())
+
+    rng = random.Random(1)
+    query_texts = [make_sentence(rng, 5) for _ in range(queries)]
+    embeddings = get_embeddings()
+    vectors = embeddings.embed_documents(query_texts)
+    report = {
+        "documents": documents,
+        "chunks": chunk_count,
+        # Önbellekte olmayan sorgular (CachedEmbeddings ilk çağrıda modele gider)
+        "embed_query": measure(lambda: embeddings.embed_query(make_sentence(rng, 5)), queries),
+    }
+    for mode in ("vector", "lexical", "hybrid"):
+        cursor = iter(range(10 ** 9))
+
+        def search():
+            i = next(cursor) % queries
+            run_search(SearchRequest(query=query_texts[i], top_k=top_k, mode=mode), vectors[i])
+
+        report[f"search_{mode}"] = throughput(measure(search, queries), 1, "queries")
+    return report
+
+
+def run(paragraphs: int, pdf_pages: int, documents: int, queries: int, top_k: int, repeats: int) -> dict:
+    return {
+        "environment": environment(),
+        "parameters": {
+            "paragraphs": paragraphs, "pdf_pages": pdf_pages, "documents": documents,
+            "queries": queries, "top_k": top_k, "repeats": repeats,
+        },
+        "text": bench_text(paragraphs, repeats),
+        "extraction": bench_extraction(paragraphs, pdf_pages, repeats),
+        "search": bench_search(documents, queries, top_k),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=200, help="Metin ölçümlerindeki paragraf sayısı")
+    parser.add_argument("--pdf-pages", type=int, default=40)
+    parser.add_argument("--documents", type=int, default=500, help="Arama ölçümü için dizinlenen döküman")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output", help="Sonuçların kaydedileceği JSON dosyası")
+    args = parser.parse_args()
+    save(run(args.paragraphs, args.pdf_pages, args.documents, args.queries, args.top_k, args.repeats), args.output)
+
+
+if __name__ == "__main__":
+    main()
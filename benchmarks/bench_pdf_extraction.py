@@ -0,0 +1,63 @@
+"""
+Seri ve paralel PDF sayfa çıkarma hızını karşılaştırır.
+
+Kullanım:
+    python -m benchmarks.bench_pdf_extraction --pages 120 --workers 4
+"""
+from app.ingestion.parallel import extract_page_range, iter_pages_parallel
+from app.ingestion.pipeline import iter_pages
+from benchmarks.synthetic import make_pdf
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+def run(pages: int, workers: int, pages_per_task: int) -> dict:
+    handle, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(handle, "wb") as f:
+        f.write(make_pdf(pages))
+
+    try:
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            serial = list(iter_pages(f, path))
+        serial_seconds = time.perf_counter() - start
+
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Süreç başlatma maliyetini ölçüme katmamak için havuzu ısıt
+            list(pool.map(extract_page_range, [path] * workers, [0] * workers, [1] * workers))
+
+            start = time.perf_counter()
+            parallel = list(iter_pages_parallel(path, pages, pool, pages_per_task, max_pending=2 * workers))
+            parallel_seconds = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    assert parallel == serial, "Paralel çıktı seri çıktıyla aynı olmalı"
+    return {
+        "pages": pages,
+        "workers": workers,
+        "pages_per_task": pages_per_task,
+        "serial_seconds": round(serial_seconds, 3),
+        "parallel_seconds": round(parallel_seconds, 3),
+        "serial_pages_per_second": round(pages / serial_seconds, 1),
+        "parallel_pages_per_second": round(pages / parallel_seconds, 1),
+        "speedup": round(serial_seconds / parallel_seconds, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, args.workers, args.pages_per_task), indent=2))
+
+
+if __name__ == "__main__":
+    main()
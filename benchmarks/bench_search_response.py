@@ -0,0 +1,134 @@
+"""
+Arama yanıtlarının boyutu ve serileştirme süresi.
+
+Serileştirme: aynı sonuçlar için önceki yol (response_model doğrulaması +
+standart JSON) ile orjson yanıtında tam içerik, alıntı (snippet) ve
+yalnızca id/skor seçimleri karşılaştırılır. Sayfalama: derin sonuçlara
+her sayfada top_k'yi büyüterek yeniden aramak ile cursor kullanmak
+karşılaştırılır (sayfa başına gecikme ve embedding çağrısı sayısı).
+
+Kullanım:
+    python -m benchmarks.bench_search_response --documents 300 --top-k 10 50 200 --output response.json
+"""
+from benchmarks.report import use_offline_backends
+
+use_offline_backends()
+
+from app.main import (  # noqa: E402
+    SearchRequest, VectorSearchResponse, app, format_results, run_search, search_response, text_splitter
+)
+from app.resources import get_document_index, get_embeddings  # noqa: E402
+from benchmarks.report import environment, measure, save, summarize  # noqa: E402
+from benchmarks.synthetic import make_corpus, make_sentence  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from typing import List  # noqa: E402
+import argparse  # noqa: E402
+import random  # noqa: E402
+import time  # noqa: E402
+
+VARIANTS = {
+    "full_orjson": {"include": ["content", "metadata"]},
+    "snippet": {"include": ["snippet", "metadata"], "metadata_fields": ["source", "page", "start", "end"]},
+    "ids_only": {"include": []},
+}
+
+
+def index_corpus(documents: int) -> int:
+    document_index = get_document_index()
+    chunks = 0
+    for i, text in enumerate(make_corpus(documents, paragraphs=12)):
+        source = f"doc-{i}.txt"
+        items = [
+            (chunk.text, {"source": source, "chunk": n, "page": chunk.page, "start": chunk.start, "end": chunk.end})
+            for n, chunk in enumerate(text_splitter.iter_chunks([(1, text)]))
+        ]
+        chunks += len(items)
+        document_index.upsert(source, items, set(), set())
+    return chunks
+
+
+def legacy_response(payload: dict) -> JSONResponse:
+    """FastAPI'nin response_model ile izlediği önceki yol: doğrulama, JSON uyumlu döküm, standart json."""
+    return JSONResponse(VectorSearchResponse.model_validate(payload).model_dump(mode="json"))
+
+
+def bench_serialization(top_ks: List[int], repeats: int) -> dict:
+    rng = random.Random(2)
+    query = make_sentence(rng, 5)
+    vector = get_embeddings().embed_query(query)
+    report = {}
+    for top_k in top_ks:
+        results, _ = run_search(SearchRequest(query=query, top_k=top_k), vector)
+        page = {"results": format_results(results)}
+        timings = {"vector": 1.0}
+
+        legacy = legacy_response({**page, "timings": timings})
+        row = {
+            "results": len(results),
+            "legacy": {"bytes": len(legacy.body), **measure(lambda: legacy_response({**page, "timings": timings}), repeats)},
+        }
+        for name, options in VARIANTS.items():
+            request = SearchRequest(query=query, top_k=top_k, **options)
+            body = search_response(request, page, timings).body
+            row[name] = {"bytes": len(body), **measure(lambda: search_response(request, page, timings), repeats)}
+        report[f"top_k_{top_k}"] = row
+    return report
+
+
+def bench_pagination(page_size: int, pages: int, queries: int) -> dict:
+    rng = random.Random(3)
+    deeper, cursor = [], []
+    embeds = {"deeper": 0, "cursor": 0}
+    with TestClient(app) as client:
+        for _ in range(queries):
+            request = {"query": make_sentence(rng, 5), "include": ["snippet", "metadata"]}
+            # Her sayfada top_k büyütülerek baştan arama
+            for number in range(1, pages + 1):
+                start = time.perf_counter()
+                body = client.post("/vector/search", json={**request, "top_k": page_size * number}).json()
+                deeper.append(time.perf_counter() - start)
+                embeds["deeper"] += "embed" in body["timings"]
+            # Cursor ile sayfalama (önbelleğe takılmamak için sorgu değiştirilir)
+            request["query"] += " devam"
+            next_cursor = None
+            for _ in range(pages):
+                start = time.perf_counter()
+                body = client.post(
+                    "/vector/search", json={**request, "top_k": page_size, "cursor": next_cursor}
+                ).json()
+                cursor.append(time.perf_counter() - start)
+                embeds["cursor"] += "embed" in body["timings"]
+                next_cursor = body.get("next_cursor")
+                if next_cursor is None:
+                    break
+    return {
+        "page_size": page_size,
+        "pages": pages,
+        "deeper_top_k": {**summarize(deeper), "embed_calls": embeds["deeper"]},
+        "cursor": {**summarize(cursor), "embed_calls": embeds["cursor"]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=300, help="Dizinlenecek sentetik döküman sayısı")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=20, help="Sayfalama ölçümündeki sorgu sayısı")
+    parser.add_argument("--output", help="Sonuçların kaydedileceği JSON dosyası")
+    args = parser.parse_args()
+
+    chunks = index_corpus(args.documents)
+    save({
+        "environment": environment(),
+        "parameters": {"documents": args.documents, "chunks": chunks, "repeats": args.repeats},
+        "serialization": bench_serialization(args.top_k, args.repeats),
+        "pagination": bench_pagination(args.page_size, args.pages, args.queries),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
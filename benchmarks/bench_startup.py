@@ -0,0 +1,74 @@
+"""
+`app.main` içe aktarma süresini, hazır olma süresini ve ilk istek gecikmesini ölçer.
+
+Her ölçüm temiz bir Python sürecinde yapılır. Süreç sırasıyla uygulamayı
+içe aktarır, lifespan'i başlatır, /health/ready 200 dönene kadar bekler ve
+ilk /vector/search isteğini gönderir.
+
+Kullanım:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    started = time.perf_counter()
+    while client.get("/health/ready").status_code != 200:
+        time.sleep(0.01)
+    ready = time.perf_counter()
+    client.post("/vector/search", json={"query": "ilk istek", "top_k": 1}).raise_for_status()
+    first_request = time.perf_counter()
+
+print(json.dumps({
+    "import_seconds": imported - start,
+    "lifespan_seconds": started - imported,
+    "ready_seconds": ready - start,
+    "first_request_seconds": first_request - ready,
+}))
+"""
+
+
+def probe() -> dict:
+    env = {
+        **os.environ,
+        "CHROMA_PERSIST_DIRECTORY": tempfile.mkdtemp(prefix="bench-startup-"),
+        "EMBEDDING_CACHE_PATH": "",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int) -> dict:
+    samples = [probe() for _ in range(runs)]
+    return {
+        key: {
+            "median": round(statistics.median(sample[key] for sample in samples), 4),
+            "max": round(max(sample[key] for sample in samples), 4),
+        }
+        for key in samples[0]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
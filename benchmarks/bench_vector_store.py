@@ -0,0 +1,76 @@
+"""
+Chroma (HNSW) ile bellek eşlemeli NumPy deposunun arama gecikmesini ve
+isabet oranını (recall@k) karşılaştırır.
+
+Vektörler rastgele üretilir; embedding modeli gerekmez. Doğruluk referansı
+float32 tam aramadır.
+
+Kullanım:
+    python -m benchmarks.bench_vector_store --size 20000 --queries 200
+"""
+from app.database.vector_store import VectorStore
+from benchmarks.bench_filtered_search import measure
+from langchain.vectorstores import Chroma
+import argparse
+import json
+import tempfile
+
+import numpy as np
+
+DIMENSION = 384
+
+
+def recall(found_ids, expected_ids) -> float:
+    return round(float(np.mean([
+        len(set(found) & set(expected)) / len(expected) for found, expected in zip(found_ids, expected_ids)
+    ])), 4)
+
+
+def run(size: int, queries: int, k: int, repeats: int) -> dict:
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((size, DIMENSION)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(size)]
+    documents = [f"parça {i}" for i in range(size)]
+    query_vectors = rng.standard_normal((queries, DIMENSION)).astype(np.float32).tolist()
+
+    stores = {
+        "chroma_hnsw": Chroma(
+            persist_directory=tempfile.mkdtemp(prefix="bench-store-"),
+            collection_name="bench",
+            collection_metadata={"hnsw:space": "cosine"}
+        )._collection
+    }
+    for dtype in ("float32", "float16", "int8"):
+        stores[f"numpy_{dtype}"] = VectorStore(path=tempfile.mkdtemp(prefix="bench-store-"), dtype=dtype)
+
+    for store in stores.values():
+        for start in range(0, size, 5000):
+            store.add(
+                ids=ids[start:start + 5000],
+                embeddings=vectors[start:start + 5000].tolist(),
+                documents=documents[start:start + 5000]
+            )
+
+    expected = stores["numpy_float32"].query(query_vectors, n_results=k)["ids"]
+    report = {"size": size, "queries": queries, "top_k": k}
+    for name, store in stores.items():
+        report[name] = {
+            "single": measure(lambda: store.query(query_vectors[:1], n_results=k), repeats),
+            "batch": measure(lambda: store.query(query_vectors, n_results=k), max(1, repeats // 10)),
+            "recall_at_k": recall(store.query(query_vectors, n_results=k)["ids"], expected),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+    print(json.dumps(run(args.size, args.queries, args.top_k, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark sonuçları için ortak yardımcılar: çevrimdışı ayarlar, gecikme
+özetleri ve karşılaştırılabilir JSON raporları.
+
+İki rapor karşılaştırmak için:
+    python -m benchmarks.report baseline.json current.json --threshold 0.1
+"""
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Ölçümü etkileyen ve rapora yazılan ayarlar
+REPORTED_SETTINGS = (
+    "LLM_BACKEND", "EMBEDDING_BACKEND", "VECTOR_BACKEND", "VECTOR_STORE_DTYPE", "FAKE_EMBEDDING_DIMENSION",
+    "LLM_MAX_CONCURRENCY", "LLM_RATE_LIMIT_PER_MINUTE", "EMBED_BATCH_SIZE",
+)
+
+
+def use_offline_backends() -> None:
+    """
+    Ağ ve model indirmesi gerektirmeyen arka uçları seçer (app içe aktarılmadan önce çağrılmalı).
+
+    Ortamda açıkça verilmiş ayarlar korunur.
+    """
+    if "CHROMA_PERSIST_DIRECTORY" not in os.environ:
+        # Geçici depo süreç sonunda silinir
+        directory = tempfile.mkdtemp(prefix="bench-")
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        os.environ["CHROMA_PERSIST_DIRECTORY"] = directory
+    for name, value in {
+        "LLM_BACKEND": "fake",
+        "EMBEDDING_BACKEND": "fake",
+        "VECTOR_BACKEND": "numpy",
+        "EMBEDDING_CACHE_PATH": "",
+        "BM25_INDEX_PATH": "",
+        "REDIS_URL": "",
+        # Yük testinde hız sınırı değil servis kapasitesi ölçülür
+        "LLM_RATE_LIMIT_PER_MINUTE": "1000000",
+        "LLM_RATE_LIMIT_BURST": "100000",
+        "LLM_QUEUE_SIZE": "100000",
+    }.items():
+        os.environ.setdefault(name, value)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Saniye cinsinden örnekleri ms cinsinden p50/p95/p99/ortalama/en büyük değerlere çevirir."""
+    if not len(samples):
+        return {}
+    values = 1000 * np.asarray(samples, dtype=float)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def measure(fn: Callable[[], Any], repeats: int, warmup: int = 1) -> Dict[str, float]:
+    """`fn`i ısınma çağrılarından sonra `repeats` kez çalıştırır ve gecikme özetini döndürür."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"repeats": repeats, **summarize(samples)}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Sonuçları karşılaştırırken gereken çalışma ortamı bilgisi."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {name: os.environ[name] for name in REPORTED_SETTINGS if name in os.environ},
+    }
+
+
+def save(report: Dict[str, Any], path: Optional[str]) -> None:
+    """Raporu yazdırır; `path` verilmişse JSON dosyasına da kaydeder."""
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+def flatten(report: Any, prefix: str = "") -> Dict[str, float]:
+    """İç içe raporu "a.b.c" -> sayı sözlüğüne çevirir (liste elemanları sıra numarasıyla)."""
+    if isinstance(report, dict):
+        items: Iterable = report.items()
+    elif isinstance(report, list):
+        items = enumerate(report)
+    else:
+        if isinstance(report, (int, float)) and not isinstance(report, bool):
+            return {prefix: float(report)}
+        return {}
+    flat: Dict[str, float] = {}
+    for key, value in items:
+        flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def direction(metric: str) -> int:
+    """Metriğin iyi yönü: +1 büyüğü iyi (throughput), -1 küçüğü iyi (gecikme), 0 karşılaştırılmaz."""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith("per_second") or name in ("throughput_rps", "speedup"):
+        return 1
+    if name.endswith("_ms") or name.endswith("_seconds") or name in ("errors", "error_rate"):
+        return -1
+    return 0
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    İki raporun ortak metriklerini karşılaştırır.
+
+    Args:
+        baseline (dict): Referans rapor
+        current (dict): Yeni rapor
+        threshold (float): Gerileme sayılacak en küçük göreli değişim (0.1 = %10)
+
+    Returns:
+        List[dict]: {"metric", "baseline", "current", "change", "regression"} satırları
+    """
+    before, after = flatten(baseline), flatten(current)
+    rows = []
+    for metric in sorted(before.keys() & after.keys()):
+        sign = direction(metric)
+        if not sign or metric.startswith("environment."):
+            continue
+        old, new = before[metric], after[metric]
+        change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+        rows.append({
+            "metric": metric,
+            "baseline": old,
+            "current": new,
+            "change": round(change, 4),
+            "regression": sign * change < -threshold,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="İki benchmark raporunu karşılaştırır")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Gerileme eşiği (göreli, 0.1 = %%10)")
+    parser.add_argument("--all", action="store_true", help="Gerilemeyen metrikleri de göster")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows if args.all else regressions:
+        marker = "GERİLEME" if row["regression"] else ""
+        print(f"{row['metric']:<70} {row['baseline']:>12.3f} {row['current']:>12.3f} {row['change']:>+8.1%} {marker}")
+    print(f"{len(rows)} metrik karşılaştırıldı, {len(regressions)} gerileme (eşik %{100 * args.threshold:g})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark ve testler için sentetik Türkçe/İngilizce veri üreticileri.
+"""
+from typing import List
+import random
+
+TURKISH_WORDS = [
+    "yapay", "zeka", "makine", "öğrenmesi", "veri", "bilgisayar", "teknoloji", "model",
+    "sistem", "analiz", "sonuç", "rapor", "şirket", "müşteri", "ürün", "geliştirme",
+    "araştırma", "güvenlik", "ağ", "yazılım", "donanım", "kullanıcı", "arayüz", "çözüm",
+    "performans", "ölçüm", "değerlendirme", "süreç", "yönetim", "bilgi", "belge", "arama",
+]
+
+ENGLISH_WORDS = [
+    "artificial", "intelligence", "machine", "learning", "data", "computer", "technology",
+    "model", "system", "analysis", "result", "report", "company", "customer", "product",
+    "development", "research", "security", "network", "software", "hardware", "user",
+    "interface", "solution", "performance", "measurement", "evaluation", "process",
+]
+
+# PDF'in standart fontu Türkçe karakterleri içermediği için ASCII karşılıkları
+_ASCII = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+
+def make_sentence(rng: random.Random, words: int = 12) -> str:
+    vocabulary = TURKISH_WORDS if rng.random() < 0.5 else ENGLISH_WORDS
+    sentence = " ".join(rng.choice(vocabulary) for _ in range(words))
+    return sentence.capitalize() + "."
+
+
+def make_text(paragraphs: int = 10, sentences_per_paragraph: int = 8, seed: int = 0) -> str:
+    """Paragraflardan oluşan karışık dilli metin üretir."""
+    rng = random.Random(seed)
+    return "\n\n".join(
+        " ".join(make_sentence(rng) for _ in range(sentences_per_paragraph))
+        for _ in range(paragraphs)
+    )
+
+
+def add_noise(text: str) -> str:
+    """Çıkarılan sayfalara benzeyen düzensiz boşluk ve özel karakterler ekler."""
+    return text.replace(". ", ".  \r\n\t• ").replace(" ve ", " ve  ").replace(" data ", " «data» ")
+
+
+def make_corpus(documents: int = 50, paragraphs: int = 3, seed: int = 0) -> List[str]:
+    """Birbirinden farklı dökümanlar üretir."""
+    return [make_text(paragraphs, seed=seed + i) for i in range(documents)]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int = 10, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    """
+    Harici kütüphane kullanmadan çok sayfalı, metin içeren bir PDF üretir.
+
+    Args:
+        pages (int): Sayfa sayısı
+        lines_per_page (int): Sayfa başına satır
+        seed (int): Rastgele üretici tohumu
+
+    Returns:
+        bytes: PDF dosyasının içeriği
+    """
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Sayfa ağacı, sayfalar oluşturulduktan sonra doldurulur
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    kids = []
+    for _ in range(pages):
+        lines = [make_sentence(rng, 10).translate(_ASCII) for _ in range(lines_per_page)]
+        content = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(
+            f"({_escape(line)}) Tj T*" for line in lines
+        ) + " ET"
+        stream = content.encode("latin-1")
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
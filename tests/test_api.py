@@ -1,11 +1,28 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+import asyncio
+import json
 import os
+import time
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def client():
+    # Lifespan (LLM kaydı, önbellek, yükleme kuyruğu) testler boyunca açık kalır
+    with TestClient(app) as client:
+        yield client
 
-def test_upload_text_document():
+def wait_for_job(client, job_id, timeout=60):
+    """Yükleme işi bitene kadar bekler"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/documents/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.1)
+    raise TimeoutError(job_id)
+
+def test_upload_text_document(client):
     """Metin dosyası yükleme testi"""
     # Test dosyası oluştur
     with open("test.txt", "w", encoding="utf-8") as f:
@@ -21,10 +38,14 @@ def test_upload_text_document():
     # Dosyayı temizle
     os.remove("test.txt")
     
-    assert response.status_code == 201
+    assert response.status_code == 202
     assert "message" in response.json()
 
-def test_upload_duplicate_document():
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "completed"
+    assert job["progress"]["chunks"] == job["progress"]["embedded"] == 1
+
+def test_upload_duplicate_document(client):
     """Aynı dosyayı tekrar yükleme testi"""
     # Test dosyası oluştur
     with open("test.txt", "w", encoding="utf-8") as f:
@@ -47,14 +68,15 @@ def test_upload_duplicate_document():
     assert response.status_code == 200
     assert "message" in response.json()
 
-def test_vector_search():
+def test_vector_search(client):
     """Vektör arama testi"""
     # Önce test dökümanı yükle
     with open("test.txt", "w", encoding="utf-8") as f:
         f.write("Yapay zeka, bilgisayarların insan gibi düşünmesini sağlayan bir teknolojidir.")
     
     with open("test.txt", "rb") as f:
-        client.post("/documents/upload", files={"file": ("test.txt", f, "text/plain")})
+        upload = client.post("/documents/upload", files={"file": ("test.txt", f, "text/plain")})
+    wait_for_job(client, upload.json()["job_id"])
     
     # Arama yap
     response = client.post(
@@ -69,7 +91,242 @@ def test_vector_search():
     assert "results" in response.json()
     assert len(response.json()["results"]) > 0
 
-def test_solve_math_simple():
+def test_vector_search_with_filters(client):
+    """Kaynak filtresi yalnızca o dökümanın parçalarını döndürmeli"""
+    for name, text in [("kedi.txt", "Kediler evcil hayvanlardır."), ("uzay.txt", "Uzay araştırmaları hız kazandı.")]:
+        upload = client.post("/documents/upload", files={"file": (name, text.encode("utf-8"), "text/plain")})
+        if upload.status_code == 202:
+            wait_for_job(client, upload.json()["job_id"])
+
+    response = client.post(
+        "/vector/search",
+        json={"query": "hayvanlar", "top_k": 5, "filters": {"source": ["uzay.txt"], "page_max": 1}}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 1
+    assert results[0]["metadata"]["source"] == "uzay.txt"
+    assert results[0]["metadata"]["page"] == 1
+
+def test_source_filter_after_another_worker_writes(client):
+    """Başka bir işçinin yazmasından sonra kaynak filtresi eski ikincil indeksle sonuç kaçırmamalı"""
+    from app.database.cache import get_cache
+    from app.resources import get_embeddings, get_source_index, get_vectorstore
+
+    upload = client.post("/documents/upload", files={"file": ("yerel.txt", "Yerel işçi yüklemesi.".encode("utf-8"), "text/plain")})
+    if upload.status_code == 202:
+        wait_for_job(client, upload.json()["job_id"])
+    # Bu süreçteki yükleme indeksi güncel tutar
+    assert get_source_index().is_current(asyncio.run(get_cache().collection_version()))
+
+    # Başka bir işçi: koleksiyona yazar ve sürümü ilerletir, bu sürecin kaynak indeksi görmez
+    text = "Diğer işçinin yüklediği rüzgar enerjisi raporu."
+    get_vectorstore()._collection.add(
+        ids=["diger-isci-1"], embeddings=get_embeddings().embed_documents([text]),
+        metadatas=[{"source": "diger.txt", "page": 1}], documents=[text]
+    )
+    asyncio.run(get_cache().invalidate_collection())
+
+    response = client.post(
+        "/vector/search",
+        json={"query": "rüzgar enerjisi", "top_k": 3, "filters": {"source": "diger.txt"}}
+    )
+
+    assert [r["content"] for r in response.json()["results"]] == [text]
+
+def test_upload_empty_document_twice(client):
+    """Parçası olmayan boş döküman ikinci yüklemede yeniden işlenmemeli"""
+    upload = client.post("/documents/upload", files={"file": ("bos.txt", b"", "text/plain")})
+    assert upload.status_code == 202
+    job = wait_for_job(client, upload.json()["job_id"])
+    assert job["status"] == "completed"
+    assert job["progress"]["chunks"] == 0
+
+    again = client.post("/documents/upload", files={"file": ("bos.txt", b"", "text/plain")})
+
+    assert again.status_code == 200
+    assert again.json()["status"] == "unchanged"
+
+def test_reupload_of_previous_version(client):
+    """v1 -> v2 -> v1 yüklemesinde koleksiyon yeniden v1 içeriğini tutmalı"""
+    versions = ["Sürüm bir, rüzgar türbini bakım talimatı.", "Sürüm iki, güneş paneli temizlik talimatı."]
+    for text in versions + versions[:1]:
+        upload = client.post("/documents/upload", files={"file": ("surum.txt", text.encode("utf-8"), "text/plain")})
+        assert upload.status_code == 202
+        assert wait_for_job(client, upload.json()["job_id"])["status"] == "completed"
+
+    response = client.post(
+        "/vector/search",
+        json={"query": "bakım talimatı", "top_k": 5, "filters": {"source": "surum.txt"}}
+    )
+
+    assert [r["content"] for r in response.json()["results"]] == versions[:1]
+
+def test_vector_search_batch(client):
+    """Toplu arama sonuçları sorgu sırasıyla ve kendi top_k değerleriyle dönmeli"""
+    queries = [
+        {"query": "yapay zeka nedir", "top_k": 1},
+        {"query": "bilgisayarlar nasıl düşünür", "top_k": 2},
+    ]
+
+    response = client.post("/vector/search/batch", json={"queries": queries})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert len(results[0]["results"]) == 1
+    for query, batch_result in zip(queries, results):
+        single = client.post("/vector/search", json=query).json()
+        assert [r["content"] for r in batch_result["results"]] == [r["content"] for r in single["results"]]
+
+def test_vector_search_batch_empty(client):
+    """Boş sorgu listesi reddedilmeli"""
+    response = client.post("/vector/search/batch", json={"queries": []})
+
+    assert response.status_code == 422
+
+def test_vector_search_cache_header(client):
+    """Aynı arama ikinci kez önbellekten gelmeli"""
+    payload = {"query": "önbellek testi", "top_k": 2}
+
+    first = client.post("/vector/search", json=payload)
+    second = client.post("/vector/search", json={**payload, "query": "  önbellek   testi "})
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.json()["results"] == second.json()["results"]
+    assert "cache" in second.json()["timings"]
+
+def test_lexical_and_hybrid_search(client):
+    """Tanımlayıcılar BM25 ile bulunmalı; hibrit mod her yolun süresini raporlamalı"""
+    text = "Yedek parça numarası ZX-4471 olan pompa değiştirildi."
+    upload = client.post("/documents/upload", files={"file": ("parca.txt", text.encode("utf-8"), "text/plain")})
+    if upload.status_code == 202:
+        wait_for_job(client, upload.json()["job_id"])
+
+    lexical = client.post("/vector/search", json={"query": "zx-4471", "top_k": 1, "mode": "lexical"})
+    hybrid = client.post("/vector/search", json={"query": "ZX-4471 pompa", "top_k": 3, "mode": "hybrid"})
+
+    assert lexical.status_code == 200
+    assert lexical.json()["results"][0]["metadata"]["source"] == "parca.txt"
+    assert set(lexical.json()["timings"]) == {"lexical"}
+    assert hybrid.status_code == 200
+    assert hybrid.json()["results"][0]["metadata"]["source"] == "parca.txt"
+    assert {"embed", "vector", "lexical", "fusion"} <= set(hybrid.json()["timings"])
+
+def test_vector_search_projection_and_cursor(client):
+    """Alan seçimi ve alıntılar uygulanmalı; cursor sonraki sayfayı yeniden vektörlemeden getirmeli"""
+    text = " ".join(f"Bölüm {i}. Güneş enerjisi santralleri verimlilik raporu, dolgu metni." * 8 for i in range(30))
+    upload = client.post("/documents/upload", files={"file": ("gunes.txt", text.encode("utf-8"), "text/plain")})
+    if upload.status_code == 202:
+        wait_for_job(client, upload.json()["job_id"])
+    request = {
+        "query": "güneş enerjisi verimlilik", "top_k": 2, "include": ["snippet", "metadata"],
+        "metadata_fields": ["source", "page", "start"], "snippet_length": 80,
+        "filters": {"source": "gunes.txt"}
+    }
+
+    first = client.post("/vector/search", json=request)
+    ids_only = client.post("/vector/search", json={**request, "include": []})
+
+    assert first.status_code == 200
+    body = first.json()
+    assert len(body["results"]) == 2
+    for result in body["results"]:
+        assert "content" not in result
+        assert len(result["snippet"].strip("…")) <= 80
+        assert set(result["metadata"]) == {"source", "page", "start"}
+    assert set(ids_only.json()["results"][0]) == {"id", "similarity"}
+
+    second = client.post("/vector/search", json={**request, "cursor": body["next_cursor"]})
+
+    assert second.status_code == 200
+    assert "embed" not in second.json()["timings"]
+    first_ids = {r["id"] for r in body["results"]}
+    assert not first_ids & {r["id"] for r in second.json()["results"]}
+    full = client.post("/vector/search", json={**request, "top_k": 4}).json()["results"]
+    # Metin tekrarlandığından skorlar eşit; sayfalar yine de tek aramanın sırasını izlemeli
+    assert [r["id"] for r in full] == [r["id"] for r in body["results"] + second.json()["results"]]
+
+    other = client.post("/vector/search", json={**request, "query": "başka", "cursor": body["next_cursor"]})
+    assert other.status_code == 400
+
+def parse_events(body):
+    """SSE gövdesini (olay, veri) çiftlerine çevirir"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_ask_streams_answer(client):
+    """Yanıt parçaları üretildikçe gelmeli; süreler sondaki olayda raporlanmalı"""
+    from app.main import AskRequest, ask, get_ask_chain
+
+    text = "Kalibrasyon işlemi her altı ayda bir yapılır ve sonuçlar bakım defterine yazılır."
+    upload = client.post("/documents/upload", files={"file": ("kalibrasyon.txt", text.encode("utf-8"), "text/plain")})
+    if upload.status_code == 202:
+        wait_for_job(client, upload.json()["job_id"])
+    question = {"question": "Kalibrasyon ne sıklıkla yapılır?", "mode": "lexical"}
+
+    llm = get_ask_chain().chain.llm
+    saved = (llm.responses, llm.latency, llm.token_delay)
+    llm.responses, llm.latency, llm.token_delay = ["Kalibrasyon altı ayda bir yapılır [1]."], 0.05, 0.1
+    try:
+        response = client.post("/ask", json=question)
+
+        # TestClient gövdeyi biriktirdiği için varış zamanları akış üzerinden ölçülür
+        async def stream():
+            start = time.perf_counter()
+            arrivals = []
+            async for chunk in (await ask(AskRequest(**question))).body_iterator:
+                arrivals.append((parse_events(chunk)[0][0], time.perf_counter() - start))
+            return arrivals
+
+        arrivals = asyncio.run(stream())
+    finally:
+        llm.responses, llm.latency, llm.token_delay = saved
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "context" and names[-2:] == ["timings", "done"]
+    assert events[0][1]["passages"][0]["source"] == "kalibrasyon.txt"
+    answer = "".join(data["text"] for name, data in events if name == "token")
+    assert answer == "Kalibrasyon altı ayda bir yapılır [1]."
+    timings = events[-2][1]
+    assert {"lexical", "pack", "first_token", "generate", "total"} <= set(timings)
+    assert timings["first_token"] < timings["generate"]
+
+    # Bağlam hemen, ilk parça ilk gecikmeden sonra, son parça ise tüm akış bitince gelmeli
+    tokens = [arrived for name, arrived in arrivals if name == "token"]
+    assert arrivals[0][0] == "context"
+    assert tokens[0] < 0.5
+    assert tokens[-1] - tokens[0] >= 0.1 * (len(tokens) - 1) * 0.9
+
+def test_health_endpoints(client):
+    """Canlılık her zaman, hazırlık ısınma bitince 200 dönmeli"""
+    assert client.get("/health/live").json() == {"status": "alive"}
+
+    for _ in range(200):
+        ready = client.get("/health/ready")
+        if ready.status_code == 200:
+            break
+        assert ready.status_code == 503
+        time.sleep(0.05)
+
+    assert ready.status_code == 200
+    assert {"embeddings", "vectorstore"} <= set(ready.json()["timings"])
+
+def test_unknown_job(client):
+    """Olmayan iş 404 dönmeli"""
+    response = client.get("/documents/jobs/olmayan-is")
+
+    assert response.status_code == 404
+
+def test_solve_math_simple(client):
     """Basit matematik işlemi testi"""
     response = client.post(
         "/math/solve",
@@ -78,8 +335,9 @@ def test_solve_math_simple():
     
     assert response.status_code == 200
     assert response.json()["result"] == 14
+    assert response.json()["source"] == "local"
 
-def test_solve_math_complex():
+def test_solve_math_complex(client):
     """Karmaşık matematik işlemi testi"""
     response = client.post(
         "/math/solve",
@@ -88,8 +346,9 @@ def test_solve_math_complex():
     
     assert response.status_code == 200
     assert isinstance(response.json()["result"], float)
+    assert response.json()["source"] == "local"
 
-def test_solve_math_invalid():
+def test_solve_math_invalid(client):
     """Geçersiz matematik işlemi testi"""
     response = client.post(
         "/math/solve",
@@ -98,7 +357,37 @@ def test_solve_math_invalid():
     
     assert response.status_code == 500
 
-def test_extract_keywords():
+def test_solve_math_batch(client):
+    """Toplu matematik: değişken dizileri, eleman bazlı hatalar ve boyut sınırları"""
+    response = client.post("/math/solve/batch", json={
+        "expression": "sin(x) * 2 + log(y)",
+        "variables": {"x": [0, 30, 90], "y": [1, 10, 0]}
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == 3
+    item = body["items"][0]
+    assert item["results"][1] == pytest.approx(2.0)
+    assert item["results"][2] is None
+    assert item["errors"] == [{"index": 2, "error": "Tanımsız işlem"}]
+
+    many = client.post("/math/solve/batch", json={"expressions": ["2 ^ 10", "bilinmeyen(1)"]})
+    assert many.json()["items"][0]["results"] == [1024]
+    assert many.json()["items"][1]["error"]
+
+    assert client.post("/math/solve/batch", json={
+        "expression": "x + y", "variables": {"x": [1, 2], "y": [1]}
+    }).status_code == 422
+    assert client.post("/math/solve/batch", json={"expression": "1", "expressions": ["2"]}).status_code == 422
+
+    from app.config import MATH_BATCH_MAX_EXPRESSIONS, MATH_BATCH_MAX_RESULTS
+    size = MATH_BATCH_MAX_RESULTS // MATH_BATCH_MAX_EXPRESSIONS + 1
+    too_large = client.post("/math/solve/batch", json={
+        "expressions": ["x"] * MATH_BATCH_MAX_EXPRESSIONS, "variables": {"x": [1.0] * size}
+    })
+    assert too_large.status_code == 413
+
+def test_extract_keywords(client):
     """Anahtar kelime çıkarma testi"""
     response = client.post(
         "/keywords",
@@ -113,7 +402,79 @@ def test_extract_keywords():
     assert "total_keywords" in response.json()
     assert len(response.json()["keywords"]) == 3
 
-def test_extract_keywords_invalid_input():
+def test_extract_keywords_fast_and_auto(client):
+    """Yerel çıkarıcı LLM çağırmadan tam num_keywords sonuç döndürmeli"""
+    text = (
+        "Yapay zeka ve makine öğrenmesi, modern teknolojinin önemli alanlarıdır. "
+        "Makine öğrenmesi modelleri büyük veri setleri ile eğitilir. "
+        "Yapay zeka uygulamaları sağlıkta, finansta ve eğitimde kullanılır. "
+        "Veri setleri ne kadar temiz olursa makine öğrenmesi modelleri o kadar iyi sonuç verir."
+    )
+    for mode in ("fast", "auto"):
+        response = client.post("/keywords", json={"text": text, "num_keywords": 4, "mode": mode})
+
+        assert response.status_code == 200
+        assert response.json()["source"] == "local"
+        assert response.json()["total_keywords"] == 4
+        assert "makine öğrenmesi" in response.json()["keywords"]
+
+    short = client.post(
+        "/keywords", json={"text": "Kısa bir metin örneği", "num_keywords": 2, "mode": "fast"}
+    )
+    assert short.json()["keywords"] and short.json()["source"] == "local"
+
+    # Skorlar koleksiyonun terim sıklıklarını kullandığından yükleme önbelleği geçersiz kılmalı
+    request = {"text": text, "num_keywords": 4, "mode": "fast"}
+    assert client.post("/keywords", json=request).headers["X-Cache"] == "HIT"
+    upload = client.post(
+        "/documents/upload", files={"file": ("veri.txt", "Veri setleri ve modeller.".encode("utf-8"), "text/plain")}
+    )
+    wait_for_job(client, upload.json()["job_id"])
+    assert client.post("/keywords", json=request).headers["X-Cache"] == "MISS"
+
+def test_llm_outage_degrades_or_fails_fast(client):
+    """Devre açıkken anahtar kelimeler yerel çıkarıcıya düşmeli, LLM gerektiren matematik 503 dönmeli"""
+    from app.config import LLM_MODEL
+    from app.llm.registry import get_registry
+
+    breaker = get_registry().scheduler(LLM_MODEL).breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        keywords = client.post("/keywords", json={
+            "text": "Devre kesici açıkken anahtar kelime isteği yerel yedeğe düşmeli.",
+            "num_keywords": 3
+        })
+        math = client.post("/math/solve", json={"operation": "kırk iki artı bir"})
+    finally:
+        breaker.record_success()
+
+    assert keywords.status_code == 200
+    assert keywords.json()["source"] == "local"
+    assert keywords.json()["total_keywords"] == 3
+    assert math.status_code == 503
+    assert "Retry-After" in math.headers
+
+def test_metrics_and_server_timing(client):
+    """Aşama süreleri Server-Timing başlığında ve /metrics çıktısında görünmeli"""
+    search = client.post("/vector/search", json={"query": "ölçüm testi", "top_k": 2, "mode": "hybrid"})
+    assert search.status_code == 200
+    timing = search.headers["Server-Timing"]
+    assert "total;dur=" in timing
+    if search.headers.get("X-Cache") != "HIT":
+        assert "search.lexical;dur=" in timing
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'ai_tools_stage_duration_seconds_bucket{stage="search.lexical"' in text
+    assert 'ai_tools_http_requests_total{method="POST",endpoint="vector_search",status="200"}' in text
+    assert "ai_tools_response_cache_lookups_total" in text
+    assert "ai_tools_ingestion_queue_depth" in text
+    assert "ai_tools_embedding_queue_wait_seconds_bucket" in text
+
+def test_extract_keywords_invalid_input(client):
     """Geçersiz anahtar kelime çıkarma testi"""
     response = client.post(
         "/keywords",
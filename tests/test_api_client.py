@@ -0,0 +1,123 @@
+from app.api_client import APIClient, APIError, content_hash
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+import os
+import pytest
+import subprocess
+import sys
+import threading
+
+
+class FakeAPI(BaseHTTPRequestHandler):
+    """Yükleme, iş durumu ve arama uç noktalarını taklit eden yerel sunucu."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        state = self.server.state
+        job_id = self.path.rsplit("/", 1)[-1]
+        with state["lock"]:
+            polls = state["polls"][job_id] = state["polls"].get(job_id, 0) + 1
+        self.send_json(200, {"job_id": job_id, "status": "completed" if polls > 1 else "running", "error": None})
+
+    def do_POST(self):
+        state = self.server.state
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with state["lock"]:
+            state["requests"].append(self.path)
+            fail = state["failures"] > 0
+            state["failures"] -= fail
+        if fail:
+            self.send_json(503, {"detail": "Kuyruk dolu"}, {"Retry-After": "0"})
+        elif self.path == "/documents/upload":
+            digest = hashlib.sha256(body.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0]).hexdigest()
+            self.send_json(202, {"message": "kuyruğa alındı", "job_id": digest[:8], "status": "queued"})
+        elif self.path == "/vector/search":
+            payload = json.loads(body)
+            self.send_json(200, {"results": [], "echo": payload}, {"X-Cache": "HIT"})
+        else:
+            self.send_json(400, {"detail": "Geçersiz işlem"})
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPI)
+    httpd.state = {"lock": threading.Lock(), "requests": [], "failures": 0, "polls": {}}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = APIClient(f"http://127.0.0.1:{server.server_address[1]}", timeout=(1, 5), backoff_factor=0)
+    yield client
+    client.close()
+
+
+def test_transient_errors_are_retried(server, client):
+    server.state["failures"] = 2
+
+    body, is_cached = client.search("yapay zeka", top_k=3, include=["snippet"], metadata_fields=["source"])
+
+    assert server.state["requests"] == ["/vector/search"] * 3
+    assert is_cached
+    assert body["echo"] == {"query": "yapay zeka", "top_k": 3, "include": ["snippet"], "metadata_fields": ["source"]}
+
+
+def test_errors_carry_status_and_detail(server, client):
+    with pytest.raises(APIError) as error:
+        client.solve("1 +")
+    assert (error.value.status_code, error.value.detail) == (400, "Geçersiz işlem")
+
+    # Yeniden denemeler tükenince son yanıtın ayrıntısı döner
+    server.state["failures"] = 10
+    with pytest.raises(APIError) as error:
+        client.search("sorgu")
+    assert (error.value.status_code, error.value.detail) == (503, "Kuyruk dolu")
+
+
+def test_unreachable_server_raises_api_error():
+    client = APIClient("http://127.0.0.1:9", timeout=(0.5, 0.5), retries=0)
+    with pytest.raises(APIError) as error:
+        client.job("yok")
+    assert error.value.status_code is None
+
+
+def test_upload_many_uploads_concurrently_and_waits_for_jobs(server, client):
+    files = [(f"doc-{i}.txt", f"içerik {i}".encode("utf-8"), "text/plain") for i in range(6)]
+
+    results = list(client.upload_many(files, max_workers=3))
+
+    assert sorted(result.filename for result in results) == [name for name, _, _ in files]
+    for result in results:
+        assert result.error is None and result.status == "completed"
+        content = next(content for name, content, _ in files if name == result.filename)
+        assert result.content_hash == content_hash(content) == hashlib.sha256(content).hexdigest()
+        # Sunucunun gördüğü içerik istemcinin özetiyle aynı
+        assert result.job["job_id"] == result.content_hash[:8]
+    assert server.state["requests"].count("/documents/upload") == len(files)
+
+
+def test_client_does_not_import_server_modules():
+    """Arayüz istemcisi sunucu modüllerine (kuyruk, veritabanı, LLM) bağımlı olmamalı"""
+    code = "import sys, app.api_client; print(sorted(m for m in sys.modules if m.startswith('app')))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout
+
+    assert loaded.strip() == "['app', 'app.api_client', 'app.config', 'app.job_status']"
@@ -0,0 +1,34 @@
+from benchmarks.report import compare, flatten, summarize
+
+def test_summarize_reports_percentiles_in_ms():
+    summary = summarize([i / 1000 for i in range(1, 101)])
+
+    assert summary["p50_ms"] == 50.5
+    assert summary["p99_ms"] == 99.01
+    assert summary["max_ms"] == 100
+    assert summarize([]) == {}
+
+def test_flatten_nested_report():
+    flat = flatten({"endpoints": {"ask": {"c8": {"p95_ms": 12.5, "status_counts": {"200": 3}}}}, "name": "x"})
+
+    assert flat == {"endpoints.ask.c8.p95_ms": 12.5, "endpoints.ask.c8.status_counts.200": 3.0}
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {
+        "environment": {"cpu_count": 8},
+        "endpoints": {"search": {"c1": {"p95_ms": 10.0, "throughput_rps": 100.0, "errors": 0, "requests": 50}}},
+    }
+    current = {
+        "environment": {"cpu_count": 4},
+        "endpoints": {"search": {"c1": {"p95_ms": 10.5, "throughput_rps": 80.0, "errors": 2, "requests": 60}}},
+    }
+
+    rows = {row["metric"]: row for row in compare(baseline, current, threshold=0.1)}
+
+    # Gecikmedeki %5 artış eşiğin altında, throughput düşüşü ve yeni hatalar gerileme
+    assert not rows["endpoints.search.c1.p95_ms"]["regression"]
+    assert rows["endpoints.search.c1.throughput_rps"]["regression"]
+    assert rows["endpoints.search.c1.errors"]["regression"]
+    # Yönü olmayan metrikler ve ortam bilgisi karşılaştırılmaz
+    assert "endpoints.search.c1.requests" not in rows
+    assert not any(metric.startswith("environment.") for metric in rows)
@@ -0,0 +1,89 @@
+from app.database.bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+def test_tokenize_keeps_identifiers_and_turkish_case():
+    assert tokenize("Parça AB-1234 v1.2 İSTANBUL'da") == ["parça", "ab-1234", "v1.2", "istanbul", "da"]
+
+def test_rare_term_ranks_first():
+    index = BM25Index(path=None)
+    index.add([
+        ("a", "pompa bakımı yapıldı"),
+        ("b", "pompa ZX-4471 değiştirildi"),
+        ("c", "genel bakım raporu pompa"),
+    ])
+
+    hits = index.search("zx-4471 pompa", k=3)
+
+    assert hits[0][0] == "b"
+    assert len(hits) == 3
+    assert hits[0][1] > hits[1][1]
+
+def test_delete_and_readd(tmp_path):
+    """Silinen parçalar sonuç vermemeli; aynı kimlik tekrar eklenince geri gelmeli"""
+    index = BM25Index(path=str(tmp_path / "bm25.sqlite3"))
+    index.add([("a", "kırmızı elma"), ("b", "yeşil elma"), ("c", "mavi gök")])
+
+    assert index.delete(["a"]) == 1
+    assert [id_ for id_, _ in index.search("kırmızı", 5)] == []
+    assert len(index) == 2
+
+    assert index.add([("a", "kırmızı elma")]) == 1
+    assert [id_ for id_, _ in index.search("kırmızı", 5)] == ["a"]
+
+def test_index_persists_and_compacts(tmp_path):
+    path = str(tmp_path / "bm25.sqlite3")
+    index = BM25Index(path=path)
+    index.add([(f"doc-{i}", f"ortak kelime benzersiz{i}") for i in range(10)])
+    # Eşik aşıldığında silinen kayıtlar posting listelerinden temizlenir
+    index.delete([f"doc-{i}" for i in range(5)])
+    index.close()
+
+    reopened = BM25Index(path=path)
+
+    assert len(reopened) == 5
+    assert reopened.deleted_count == 0
+    assert reopened.search("benzersiz7", 1)[0][0] == "doc-7"
+    assert {id_ for id_, _ in reopened.search("ortak", 10)} == {f"doc-{i}" for i in range(5, 10)}
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert [key for key, _ in fused] == ["a", "c", "b"]
+
+def test_small_batches_keep_few_segments():
+    """Her ekleme yeni segment yazar; birleştirme sayesinde segment sayısı logaritmik kalmalı"""
+    batched, bulk = BM25Index(path=None), BM25Index(path=None)
+    items = [(f"doc-{i}", f"ortak kelime {'nadir' if i % 7 == 0 else 'sıradan'} {i}") for i in range(300)]
+    for i in range(0, len(items), 3):
+        batched.add(items[i:i + 3])
+        if i == 3:
+            # Birleştirmeler silinmiş parçanın posting'lerini korur; yeniden eklenince geri gelir
+            batched.delete(["doc-0"])
+    batched.add(items[:1])
+    bulk.add(items)
+
+    segments = batched._conn.execute("SELECT COUNT(*) FROM postings WHERE term = 'ortak'").fetchone()[0]
+    assert segments <= 8
+    for query in ("ortak", "nadir kelime", "sıradan 42"):
+        assert batched.search(query, 20) == bulk.search(query, 20)
+    assert batched.document_frequencies(["ortak", "nadir"]) == {"ortak": 300, "nadir": 43}
+
+def test_legacy_postings_are_migrated(tmp_path):
+    path = str(tmp_path / "bm25.sqlite3")
+    index = BM25Index(path=path)
+    index.add([("a", "eski biçim elma"), ("b", "eski armut")])
+    # Segmentsiz eski tabloyu üret
+    with index._conn:
+        index._conn.executescript("""
+            CREATE TABLE legacy (term TEXT PRIMARY KEY, docs BLOB NOT NULL, freqs BLOB NOT NULL);
+            INSERT INTO legacy SELECT term, docs, freqs FROM postings;
+            DROP TABLE postings;
+            DROP TABLE segments;
+            ALTER TABLE legacy RENAME TO postings;
+        """)
+    index.close()
+
+    reopened = BM25Index(path=path)
+    reopened.add([("c", "yeni elma")])
+
+    assert {id_ for id_, _ in reopened.search("elma", 5)} == {"a", "c"}
+    assert reopened.document_frequencies(["eski"]) == {"eski": 2}
@@ -0,0 +1,48 @@
+import asyncio
+from app.database.cache import LRUCacheBackend, ResponseCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_lru_backend_ttl_and_eviction():
+    """Süresi dolan ve en eski kayıtlar silinmeli"""
+    clock = FakeClock()
+    backend = LRUCacheBackend(max_entries=2, clock=clock)
+
+    async def run():
+        await backend.set("a", "1", ttl=10)
+        await backend.set("b", "2")
+        assert await backend.get("a") == "1"
+        await backend.set("c", "3")
+        # "b" en uzun süredir kullanılmayan kayıttı
+        assert await backend.get("b") is None
+        clock.now = 11
+        assert await backend.get("a") is None
+        assert await backend.get("c") == "3"
+
+    asyncio.run(run())
+
+def test_response_cache_invalidation():
+    """Koleksiyon değişince sürümlü kayıtlar geçersiz olmalı"""
+    cache = ResponseCache(LRUCacheBackend())
+
+    async def run():
+        search_key = await cache.make_key("search", {"query": "yapay zeka", "top_k": 1})
+        keyword_key = await cache.make_key("keywords", {"text": "metin"}, versioned=False)
+        await cache.set(search_key, {"results": [1]})
+        await cache.set(keyword_key, {"keywords": ["metin"]})
+        assert await cache.get(search_key) == {"results": [1]}
+
+        await cache.invalidate_collection()
+
+        new_key = await cache.make_key("search", {"query": "yapay zeka", "top_k": 1})
+        assert new_key != search_key
+        assert await cache.get(new_key) is None
+        assert await cache.make_key("keywords", {"text": "metin"}, versioned=False) == keyword_key
+
+    asyncio.run(run())
+    assert cache.stats == {"HIT": 1, "MISS": 1}
@@ -0,0 +1,84 @@
+import random
+import re
+from app.ingestion.chunker import SentenceChunker, normalize, sentence_spans
+
+def legacy_clean_text(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.,;!?-]', '', text)
+    return text.encode('utf-8', 'ignore').decode('utf-8').strip()
+
+def sentences(text):
+    return [text[start:end] for start, end in sentence_spans(text)]
+
+def test_normalize_matches_clean_text():
+    """Tek geçişli normalleştirme eski temizlikle aynı metni üretmeli (boşluklar birleşik)"""
+    rng = random.Random(0)
+    alphabet = list("ab çŞ.,;!?-_1\t\n\r•«»()#  ")
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert normalize(text).text == " ".join(legacy_clean_text(text).split())
+
+def test_normalize_maps_offsets_to_source():
+    """Normal metindeki her karakter kaynaktaki aynı karaktere eşlenmeli"""
+    source = "  Başlık:\n\n«Birinci» cümle.\t• İkinci   satır!  "
+    normalized = normalize(source)
+
+    assert normalized.text == "Başlık Birinci cümle. İkinci satır!"
+    for offset, char in enumerate(normalized.text):
+        if char != " ":
+            assert source[normalized.source_offset(offset)] == char
+
+def test_sentence_spans_respects_abbreviations():
+    """Kısaltmalar, baş harfler ve sıra sayıları cümleyi bitirmemeli"""
+    text = ("Prof. Dr. Ayşe Kaya geldi. 15. Yüzyıl bitti mi? Evet. "
+            "Mr. J. Smith, e.g. This one, stayed! Then left")
+
+    assert sentences(text) == [
+        "Prof. Dr. Ayşe Kaya geldi.",
+        "15. Yüzyıl bitti mi?",
+        "Evet.",
+        "Mr. J. Smith, e.g. This one, stayed!",
+        "Then left",
+    ]
+
+def test_chunks_end_at_sentence_boundaries_with_overlap():
+    """Parçalar cümle sınırında bitmeli ve önceki parçanın son cümleleriyle başlamalı"""
+    text = " ".join(f"Bu {i}. örnek cümle biraz uzunca yazıldı." for i in range(40))
+    chunker = SentenceChunker(chunk_size=200, chunk_overlap=60)
+
+    chunks = list(chunker.iter_chunks([(1, text)]))
+
+    assert len(chunks) > 1
+    assert all(len(chunk.text) <= 200 and chunk.text.endswith(".") for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        last = sentences(previous.text)[-1]
+        assert current.text.startswith(last)
+
+def test_chunk_offsets_point_into_source_across_pages():
+    """Parçaların start/end aralığı ham kaynakta aynı metne karşılık gelmeli"""
+    pages = [
+        (number, f"Sayfa {number} başlıyor.\n\n" + "Bir  cümle «daha» var. " * 15 + "Devamı\n")
+        for number in range(1, 6)
+    ]
+    source = "".join(text for _, text in pages)
+    chunker = SentenceChunker(chunk_size=150, chunk_overlap=40)
+
+    chunks = list(chunker.iter_chunks(iter(pages)))
+
+    assert chunks[0].page == 1 and chunks[-1].page == 5
+    for chunk in chunks:
+        assert normalize(source[chunk.start:chunk.end]).text == chunk.text
+
+def test_long_run_on_text_is_split_at_words():
+    """Noktalamasız uzun metin kelime sınırlarında, örtüşmeli ve sınırlı boyutta bölünmeli"""
+    words = [f"kelime{i}" for i in range(3000)]
+    text = " ".join(words)
+    chunker = SentenceChunker(chunk_size=100, chunk_overlap=20)
+
+    chunks = list(chunker.iter_chunks([(1, text)]))
+
+    assert all(len(chunk.text) <= 100 for chunk in chunks)
+    assert all(set(chunk.text.split()) <= set(words) for chunk in chunks)
+    assert chunks[-1].text.endswith("kelime2999")
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.text.split()[0] in previous.text.split()
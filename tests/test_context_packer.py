@@ -0,0 +1,67 @@
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.tools.context_packer import estimate_tokens, format_context, merge_passage, pack_context
+
+SENTENCES = [f"Bölüm {i}: pompa bakım adımı {i} dikkatle uygulanmalı ve kayıt altına alınmalıdır." for i in range(60)]
+TEXT = " ".join(SENTENCES)
+
+def split(text, size=400, overlap=100):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap, length_function=len)
+    return splitter.split_text(text)
+
+def as_results(chunks, source="kilavuz.pdf", numbers=None):
+    return [
+        (Document(page_content=chunk, metadata={"source": source, **({"chunk": numbers[i]} if numbers else {})}), 1.0 - i / 100)
+        for i, chunk in enumerate(chunks)
+    ]
+
+def test_overlapping_chunks_are_merged():
+    chunks = split(TEXT)
+    assert len(chunks) > 3
+
+    # Sıra alakaya göre karışık gelse de komşu parçalar tek pasajda birleşmeli
+    order = [2, 0, 1, 3]
+    passages = pack_context(as_results([chunks[i] for i in order], numbers=order), budget_tokens=10000)
+
+    assert len(passages) == 1
+    merged = passages[0]["text"]
+    assert merged == TEXT[TEXT.index(chunks[0]):TEXT.index(chunks[3]) + len(chunks[3])]
+    assert passages[0]["chunks"] == 4
+    assert passages[0]["tokens"] == estimate_tokens(merged)
+    assert passages[0]["span"] == (0, 3)
+
+def test_repeated_boilerplate_is_not_merged_across_gaps():
+    """Numaralı parçalar yalnızca komşularıyla birleşmeli; tekrar eden kalıp metin örtüşme sayılmamalı"""
+    chunks = split(TEXT)
+
+    passages = pack_context(as_results([chunks[0], chunks[2]], numbers=[0, 2]), budget_tokens=10000)
+
+    assert [p["text"] for p in passages] == [chunks[0], chunks[2]]
+
+def test_contained_duplicates_and_other_sources():
+    chunks = split(TEXT)
+    results = as_results([chunks[0], chunks[0][50:150]]) + as_results([chunks[0]], source="baska.pdf")
+
+    passages = pack_context(results, budget_tokens=10000)
+
+    assert [(p["source"], p["chunks"]) for p in passages] == [("kilavuz.pdf", 1), ("baska.pdf", 1)]
+
+def test_budget_is_respected():
+    chunks = split(TEXT, overlap=0)
+    budget = estimate_tokens(chunks[0]) * 2 + 5
+
+    passages = pack_context(as_results(chunks[::2]), budget_tokens=budget)
+
+    assert len(passages) == 2
+    assert sum(p["tokens"] for p in passages) <= budget
+
+def test_oversized_first_chunk_is_truncated():
+    passages = pack_context(as_results([TEXT]), budget_tokens=50)
+
+    assert len(passages) == 1
+    assert passages[0]["tokens"] <= 50
+    assert TEXT.startswith(passages[0]["text"])
+
+def test_merge_passage_without_overlap():
+    assert merge_passage("birinci parça metni burada", "tamamen farklı bir metin") is None
+    assert "[1] (a.txt)" in format_context([{"source": "a.txt", "text": "x"}])
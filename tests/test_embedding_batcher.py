@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from app.tools.embedding_batcher import EmbeddingBatcher
+
+def test_concurrent_queries_are_batched():
+    """Eşzamanlı sorgular toplu çağrılarla vektörlenmeli"""
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(embed, max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        queries = [f"sorgu {'x' * i}" for i in range(10)]
+        return queries, await asyncio.gather(*(batcher.embed(q) for q in queries))
+
+    queries, vectors = asyncio.run(run())
+
+    assert vectors == [[float(len(q))] for q in queries]
+    assert [len(c) for c in calls] == [4, 4, 2]
+    stats = batcher.stats()
+    assert stats["batch_sizes"] == {2: 1, 4: 2}
+    assert stats["avg_batch_size"] == pytest.approx(10 / 3)
+    # Her sorgunun kuyrukta bekleme süresi ayrı gözlenir
+    assert batcher.queue_wait.count() == 10
+
+def test_duplicate_queries_embedded_once():
+    """Aynı toplu çağrıdaki tekrar eden sorgular bir kez vektörlenmeli"""
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[1.0] for _ in texts]
+
+    batcher = EmbeddingBatcher(embed, max_batch_size=8, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed("aynı sorgu") for _ in range(3)))
+
+    assert asyncio.run(run()) == [[1.0]] * 3
+    assert calls == [["aynı sorgu"]]
+
+def test_errors_propagate_to_all_waiters():
+    """Embedding hatası bekleyen tüm isteklere iletilmeli"""
+    def embed(texts):
+        raise RuntimeError("model yüklenemedi")
+
+    batcher = EmbeddingBatcher(embed, max_batch_size=8, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
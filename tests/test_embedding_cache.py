@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
+from app.database.embedding_cache import CachedEmbeddings
+
+class CountingEmbeddings(Embeddings):
+    """Her metni uzunluğuna göre vektörleyen sahte model"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def test_embed_documents_only_computes_new_texts(tmp_path):
+    """Değişmeyen parçalar tekrar hesaplanmamalı"""
+    model = CountingEmbeddings()
+    cached = CachedEmbeddings(model, "test-model", path=str(tmp_path / "cache.sqlite3"))
+
+    first = cached.embed_documents(["bir", "iki", "bir"])
+    second = cached.embed_documents(["bir", "iki", "üç"])
+
+    assert first == [[3.0, 0.5], [3.0, 0.5], [3.0, 0.5]]
+    assert second[2] == [2.0, 0.5]
+    assert model.embedded == ["bir", "iki", "üç"]
+    assert cached.stats == {"memory_hits": 2, "disk_hits": 0, "misses": 3}
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Kalıcı katman yeni süreçte de kullanılmalı"""
+    path = str(tmp_path / "cache.sqlite3")
+    cached = CachedEmbeddings(CountingEmbeddings(), "test-model", path=path)
+    cached.embed_documents(["kalıcı metin"])
+    cached.close()
+
+    model = CountingEmbeddings()
+    reopened = CachedEmbeddings(model, "test-model", path=path, max_entries=1)
+
+    assert reopened.embed_query("kalıcı metin") == [12.0, 0.5]
+    assert model.embedded == []
+    assert reopened.stats["disk_hits"] == 1
+
+def test_model_name_is_part_of_key(tmp_path):
+    """Farklı model aynı metin için önbelleği paylaşmamalı"""
+    path = str(tmp_path / "cache.sqlite3")
+    model = CountingEmbeddings()
+    first = CachedEmbeddings(model, "model-a", path=path)
+    second = CachedEmbeddings(model, "model-b", path=path)
+
+    first.embed_query("metin")
+    second.embed_query("metin")
+
+    assert model.embedded == ["metin", "metin"]
+
+def test_stats_are_consistent_under_concurrency():
+    """Eşzamanlı aramalarda her anahtar tam bir kez sayılmalı"""
+    cached = CachedEmbeddings(CountingEmbeddings(), "test-model", path=None)
+    texts = [f"metin {i}" for i in range(100)]
+
+    def work(worker):
+        for i in range(200):
+            cached.embed_query(texts[(worker * 7 + i) % len(texts)])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(8)))
+
+    assert sum(cached.stats.values()) == 8 * 200
+    assert 0.0 < cached.hit_rate < 1.0
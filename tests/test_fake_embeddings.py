@@ -0,0 +1,23 @@
+from app.database.fake_embeddings import HashingEmbeddings
+import numpy as np
+import pytest
+
+def test_vectors_are_deterministic_and_normalized():
+    embeddings = HashingEmbeddings(dimension=64)
+    first = embeddings.embed_query("Yapay zeka ve makine öğrenmesi")
+
+    assert len(first) == 64
+    assert first == HashingEmbeddings(dimension=64).embed_query("Yapay zeka ve makine öğrenmesi")
+    assert np.linalg.norm(first) == pytest.approx(1.0, abs=1e-5)
+    # Kelimesi olmayan metin de birim vektör almalı
+    assert np.linalg.norm(embeddings.embed_query("")) == pytest.approx(1.0)
+
+def test_shared_words_are_closer():
+    embeddings = HashingEmbeddings()
+    query, related, unrelated = embeddings.embed_documents([
+        "pompa bakım takvimi",
+        "Pompa bakımı için takvim: pompa bakım takvimi her ay güncellenir",
+        "network security report for the customer",
+    ])
+
+    assert np.dot(query, related) > np.dot(query, unrelated)
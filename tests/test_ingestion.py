@@ -0,0 +1,99 @@
+import asyncio
+import io
+import threading
+import pytest
+from app.ingestion.jobs import (
+    IngestionJob, IngestionQueue, QueueFullError, spool_to_tempfile, COMPLETED, FAILED
+)
+
+def make_job(content: bytes, filename="test.txt"):
+    path, content_hash = spool_to_tempfile(io.BytesIO(content))
+    return IngestionJob(filename=filename, content_type="text/plain", content_hash=content_hash, path=path)
+
+async def wait_until_done(queue, job):
+    while queue.get(job.id).status not in (COMPLETED, FAILED):
+        await asyncio.sleep(0.01)
+
+def test_jobs_are_processed_and_deduplicated():
+    """Aynı içerik ikinci kez işlenmemeli"""
+    processed = []
+
+    def processor(job):
+        with open(job.path, "rb") as f:
+            processed.append(f.read())
+        job.progress["chunks"] = job.progress["embedded"] = 1
+        return {"chunks": 1}
+
+    async def run():
+        queue = IngestionQueue(processor, workers=1)
+        job, created = queue.submit(make_job(b"merhaba"))
+        duplicate, duplicate_created = queue.submit(make_job(b"merhaba"))
+        other, other_created = queue.submit(make_job(b"merhaba", "kopya.txt"))
+        await wait_until_done(queue, job)
+        await wait_until_done(queue, other)
+        await queue.stop()
+        return job, created, duplicate, duplicate_created, other_created
+
+    job, created, duplicate, duplicate_created, other_created = asyncio.run(run())
+
+    assert created and not duplicate_created
+    assert duplicate is job
+    # Aynı içerik farklı bir kaynak adıyla ayrıca işlenir
+    assert other_created
+    assert processed == [b"merhaba", b"merhaba"]
+    assert job.to_dict()["result"] == {"chunks": 1}
+    assert "total" in job.to_dict()["timings"]
+
+def test_completed_job_is_not_a_duplicate():
+    """Bitmiş iş yeni yüklemeyi engellememeli (v1 -> v2 -> v1 geri dönüşü işlenmeli)"""
+    async def run():
+        queue = IngestionQueue(lambda job: None, workers=1)
+        job, _ = queue.submit(make_job(b"v1"))
+        await wait_until_done(queue, job)
+        again, created = queue.submit(make_job(b"v1"))
+        await wait_until_done(queue, again)
+        await queue.stop()
+        return job, again, created
+
+    job, again, created = asyncio.run(run())
+
+    assert created and again is not job
+
+def test_queue_applies_backpressure():
+    """Kuyruk doluysa yeni iş reddedilmeli"""
+    release = threading.Event()
+
+    async def run():
+        queue = IngestionQueue(lambda job: release.wait(), workers=1, max_queue=1)
+        first, _ = queue.submit(make_job(b"1"))
+        # İşçinin ilk işi almasını bekle
+        while queue.depth:
+            await asyncio.sleep(0.01)
+        queue.submit(make_job(b"2"))
+        with pytest.raises(QueueFullError):
+            queue.submit(make_job(b"3"))
+        release.set()
+        await wait_until_done(queue, first)
+        await queue.stop()
+
+    asyncio.run(run())
+
+def test_failed_job_reports_error_and_can_be_retried():
+    """Başarısız iş hata mesajı taşımalı ve tekrar denenebilmeli"""
+    def processor(job):
+        raise ValueError("bozuk dosya")
+
+    async def run():
+        queue = IngestionQueue(processor, workers=1)
+        job, _ = queue.submit(make_job(b"bozuk"))
+        await wait_until_done(queue, job)
+        retry, created = queue.submit(make_job(b"bozuk"))
+        await wait_until_done(queue, retry)
+        await queue.stop()
+        return job, created
+
+    job, created = asyncio.run(run())
+
+    assert job.status == FAILED
+    assert job.error == "bozuk dosya"
+    assert created
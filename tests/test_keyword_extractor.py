@@ -0,0 +1,61 @@
+from app.database.bm25_index import BM25Index
+from app.tools.keyword_extractor import KeywordExtractor, STOPWORDS
+
+TEXT_TR = (
+    "Yapay zeka ve makine öğrenmesi, modern teknolojinin önemli alanlarıdır. "
+    "Makine öğrenmesi modelleri büyük veri setleri ile eğitilir. "
+    "Yapay zeka uygulamaları sağlıkta, finansta ve eğitimde kullanılır. "
+    "Veri setleri ne kadar temiz olursa makine öğrenmesi modelleri o kadar iyi sonuç verir. "
+    "Bu nedenle yapay zeka projelerinde veri hazırlığı en uzun adımdır."
+)
+
+TEXT_EN = (
+    "Vector databases store embeddings for semantic search. "
+    "A vector database compares embeddings with cosine similarity. "
+    "Semantic search returns documents that are close to the query embeddings, "
+    "and vector databases make this search fast for large collections."
+)
+
+def test_returns_exactly_n_keywords():
+    extractor = KeywordExtractor()
+
+    for n in range(1, 11):
+        assert len(extractor.extract(TEXT_TR, n)) == n
+
+def test_multiword_phrases_and_no_stopwords():
+    keywords = KeywordExtractor().extract(TEXT_TR, 5)
+
+    assert "makine öğrenmesi" in keywords
+    assert "yapay zeka" in keywords
+    for keyword in keywords:
+        assert keyword.split()[0].lower() not in STOPWORDS
+        assert keyword.split()[-1].lower() not in STOPWORDS
+
+def test_english_text():
+    keywords = [keyword.lower() for keyword in KeywordExtractor().extract(TEXT_EN, 3)]
+
+    assert any("search" in keyword for keyword in keywords)
+    assert not any(keyword in STOPWORDS for keyword in keywords)
+
+def test_document_frequencies_demote_common_terms():
+    """Koleksiyonda her dokümanda geçen terim, IDF ile geriye düşmeli"""
+    text = "Pompa bakımı yapıldı. Pompa ZX-4471 değiştirildi. Pompa ve ZX-4471 kontrol edildi."
+    index = BM25Index(path=None)
+    index.add([(str(i), f"pompa rapor {i}") for i in range(20)])
+
+    plain = KeywordExtractor().extract(text, 1)
+    weighted = KeywordExtractor(
+        document_frequencies=lambda terms: (index.document_frequencies(terms), len(index))
+    ).extract(text, 1)
+
+    assert plain == ["pompa"]
+    assert weighted == ["ZX-4471"]
+
+def test_short_or_ambiguous_text_is_not_confident():
+    extractor = KeywordExtractor(min_words=30)
+
+    assert extractor.extract_confident("Yapay zeka ve makine öğrenmesi.", 3) is None
+    assert extractor.extract_confident(TEXT_TR, 3) == extractor.extract(TEXT_TR, 3)
+
+def test_short_text_still_fills_slots():
+    assert KeywordExtractor().extract("Kısa bir metin", 3) == ["kısa", "metin", "bir"]
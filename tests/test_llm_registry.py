@@ -0,0 +1,87 @@
+import asyncio
+import time
+from app.config import LLM_MODEL
+from app.llm.fake import fake_backend
+from app.llm.registry import LLMRegistry
+from app.tools.math_operations import MathOperations
+
+def test_registry_reuses_clients():
+    """Aynı model için tek istemci oluşturulmalı"""
+    registry = LLMRegistry(fake_backend())
+    assert registry.get_llm("gemini-pro") is registry.get_llm("gemini-pro")
+    assert registry.get_llm("gemini-pro") is not registry.get_llm("gemini-flash")
+
+def test_chains_share_one_client_per_model(monkeypatch):
+    """Farklı çağrı ayarlı zincirler (matematik, anahtar kelime, soru-cevap) aynı istemciyi kullanmalı"""
+    from app import main
+
+    registry = LLMRegistry(fake_backend(responses=["3"]))
+    monkeypatch.setattr(main, "get_registry", lambda: registry)
+    math_chain = MathOperations(registry).chain.chain
+
+    assert math_chain.llm.bound is registry.get_llm(LLM_MODEL)
+    assert math_chain.llm.kwargs == {"generation_config": {"temperature": 0}}
+    assert main.get_keyword_chain().chain.llm is registry.get_llm(LLM_MODEL)
+    assert main.get_ask_chain().chain.llm is registry.get_llm(LLM_MODEL)
+    assert asyncio.run(MathOperations(registry).solve_operation("üç")) == 3.0
+
+def test_math_fallback_uses_shared_chain():
+    """Ayrıştırılamayan ifade paylaşılan LLM zincirine gitmeli"""
+    registry = LLMRegistry(fake_backend(responses=["42"]))
+    math_ops = MathOperations(registry)
+
+    result = asyncio.run(math_ops.solve("kırk iki"))
+
+    assert result == {"result": 42.0, "source": "llm"}
+    assert math_ops.chain is MathOperations(registry).chain
+
+def test_concurrency_limit_and_throughput():
+    """Eşzamanlı çağrılar model sınırını aşmamalı"""
+    latency, max_concurrency, total = 0.05, 4, 20
+    registry = LLMRegistry(fake_backend(responses=["1"], latency=latency), max_concurrency=max_concurrency)
+    math_ops = MathOperations(registry)
+
+    async def run():
+        return await asyncio.gather(*(math_ops.solve_operation(f"soru {i}") for i in range(total)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    llm = registry.get_llm(LLM_MODEL)
+    assert results == [1.0] * total
+    assert llm.calls == total
+    assert llm.max_in_flight == max_concurrency
+    # total / max_concurrency dalga halinde tamamlanmalı
+    assert elapsed >= latency * total / max_concurrency
+    print(f"\n{total / elapsed:.1f} çağrı/sn (sınır={max_concurrency})")
+
+def test_identical_requests_are_coalesced():
+    """Aynı anda gelen özdeş istekler tek LLM çağrısı yapmalı"""
+    registry = LLMRegistry(fake_backend(responses=["7"], latency=0.05))
+    math_ops = MathOperations(registry)
+
+    async def run():
+        return await asyncio.gather(
+            *(math_ops.solve_operation("yedi  ") for _ in range(5)),
+            math_ops.solve_operation("  yedi"),
+            math_ops.solve_operation("sekiz"),
+        )
+
+    results = asyncio.run(run())
+
+    llm = registry.get_llm(LLM_MODEL)
+    assert results == [7.0] * 7
+    assert llm.calls == 2
+    assert registry.single_flight.stats == {"upstream": 2, "coalesced": 5}
+
+def test_single_flight_can_be_disabled():
+    registry = LLMRegistry(fake_backend(responses=["7"], latency=0.01), single_flight=False)
+    math_ops = MathOperations(registry)
+
+    async def run():
+        return await asyncio.gather(*(math_ops.solve_operation("yedi") for _ in range(3)))
+
+    asyncio.run(run())
+
+    assert registry.get_llm(LLM_MODEL).calls == 3
@@ -0,0 +1,106 @@
+import math
+import pytest
+from app.tools.math_operations import (
+    SafeEvaluator,
+    MathOperations,
+    UnsupportedExpression,
+    MathDomainError,
+    DIVISION_BY_ZERO,
+    UNDEFINED,
+    NOT_REAL,
+)
+import numpy as np
+
+def test_evaluate_arithmetic():
+    """Temel aritmetik ve parantez testi"""
+    evaluator = SafeEvaluator()
+    assert evaluator.evaluate("3 * 4 + 2") == 14
+    assert evaluator.evaluate("(15 + 3) * 2") == 36
+    assert evaluator.evaluate("2 ^ 10") == 1024
+    assert evaluator.evaluate("-3 + 10 % 4") == -1
+
+def test_evaluate_functions_degrees():
+    """Derece modunda fonksiyon testi"""
+    evaluator = SafeEvaluator("degrees")
+    assert evaluator.evaluate("sqrt(16) + 5") == 9
+    assert evaluator.evaluate("sin(30) + cos(60)") == pytest.approx(1.0)
+    assert evaluator.evaluate("log(100) + 5") == pytest.approx(7.0)
+    assert evaluator.evaluate("ln(e)") == pytest.approx(1.0)
+
+def test_evaluate_functions_radians():
+    """Radyan modunda trigonometri testi"""
+    evaluator = SafeEvaluator("radians")
+    assert evaluator.evaluate("sin(pi / 2)") == pytest.approx(1.0)
+    assert evaluator.evaluate("atan(1)") == pytest.approx(math.pi / 4)
+
+@pytest.mark.parametrize("expression", [
+    "invalid",
+    "__import__('os').system('ls')",
+    "(1).__class__",
+    "[1, 2]",
+    "sqrt(x=4)",
+    "'abc' * 3",
+])
+def test_evaluate_unsupported(expression):
+    """Desteklenmeyen ifadeler LLM'e bırakılmalı"""
+    with pytest.raises(UnsupportedExpression):
+        SafeEvaluator().evaluate(expression)
+
+@pytest.mark.parametrize("expression", ["1 / 0", "sqrt(-1)", "10 ** 400", "log(0)"])
+def test_evaluate_domain_error(expression):
+    """Tanımsız işlemler hata vermeli"""
+    with pytest.raises(MathDomainError):
+        SafeEvaluator().evaluate(expression)
+
+@pytest.mark.parametrize("angle_mode", ["degrees", "radians"])
+def test_compiled_plan_matches_scalar_evaluation(angle_mode):
+    """Vektörel plan her eleman için tekil değerlendirmeyle aynı sonucu vermeli"""
+    evaluator = SafeEvaluator(angle_mode)
+    expression = "sin(x) * 2 + log(y, 2) - (x // 7) % 3 + abs(-x) ^ 0.5 + atan(1)"
+    xs, ys = [0.0, 12.5, 30.0, 45.0, 90.0], [1.0, 2.0, 8.0, 0.5, 1000.0]
+
+    plan = evaluator.compile(expression, ["x", "y"])
+    values, errors = plan.evaluate({"x": np.array(xs), "y": np.array(ys)}, len(xs))
+
+    assert plan.variables == ("x", "y")
+    assert not errors.any()
+    for x, y, value in zip(xs, ys, values):
+        scalar = evaluator.evaluate(expression.replace("x", repr(x)).replace("y", repr(y)))
+        assert value == pytest.approx(scalar)
+
+def test_compiled_plan_reports_errors_per_element():
+    """Tanımsız elemanlar işaretlenmeli, diğerleri hesaplanmalı; ilk hata korunmalı"""
+    plan = SafeEvaluator().compile("sqrt(x) / y + x ^ 0.5", ["x", "y"])
+    x, y = np.array([4.0, -1.0, 4.0, -4.0]), np.array([2.0, 1.0, 0.0, 0.0])
+
+    values, errors = plan.evaluate({"x": x, "y": y}, 4)
+
+    assert values[0] == pytest.approx(3.0)
+    assert errors.tolist() == [0, UNDEFINED, DIVISION_BY_ZERO, UNDEFINED]
+    assert SafeEvaluator().compile("0 ^ x", ["x"]).evaluate({"x": np.array([-1.0])}, 1)[1][0] == DIVISION_BY_ZERO
+    assert SafeEvaluator().compile("10 ^ x", ["x"]).evaluate({"x": np.array([400.0])}, 1)[1][0] == NOT_REAL
+
+def test_compile_rejects_unknown_names():
+    """Bağlanmamış değişkenler ve desteklenmeyen ifadeler derlenmemeli"""
+    with pytest.raises(UnsupportedExpression):
+        SafeEvaluator().compile("x + z", ["x"])
+    with pytest.raises(UnsupportedExpression):
+        SafeEvaluator().compile("x.real", ["x"])
+
+def test_solve_batch():
+    """Birden çok ifade aynı değişken dizileri üzerinde hesaplanmalı"""
+    items = MathOperations().solve_batch(
+        ["sin(x) * 2 + log(y)", "1 / (x - 30)", "toplam(x)"], {"x": [0, 30, 90], "y": [1, 10, -1]}
+    )
+
+    assert items[0]["results"][:2] == [pytest.approx(0.0), pytest.approx(2.0)]
+    assert items[0]["results"][2] is None
+    assert items[0]["errors"] == [{"index": 2, "error": "Tanımsız işlem"}]
+    assert items[1]["errors"] == [{"index": 1, "error": "Sıfıra bölme hatası"}]
+    assert items[2]["results"] == [] and items[2]["error"]
+
+@pytest.mark.parametrize("variables", [{"x": [1, 2], "y": [1]}, {"pi": [1]}, {"sqrt": [1]}, {"1x": [1]}])
+def test_solve_batch_invalid_variables(variables):
+    """Farklı uzunluktaki diziler ve geçersiz değişken adları reddedilmeli"""
+    with pytest.raises(ValueError):
+        MathOperations().solve_batch(["1"], variables)
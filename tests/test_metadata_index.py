@@ -0,0 +1,72 @@
+import random
+from langchain_core.embeddings import Embeddings
+from langchain.vectorstores import Chroma
+from app.database.metadata_index import SourceIndex, build_where, strip_source, exact_search
+
+class RandomEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[random.random() for _ in range(8)] for _ in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def test_build_where():
+    """Filtreler Chroma where ifadesine çevrilmeli"""
+    assert build_where(None) is None
+    assert build_where({"source": "a.pdf"}) == {"source": "a.pdf"}
+    assert build_where({"source": ["a.pdf"]}) == {"source": "a.pdf"}
+    assert build_where({"source": ["a.pdf", "b.pdf"], "type": "application/pdf", "min_size": 10}) == {
+        "$and": [
+            {"source": {"$in": ["a.pdf", "b.pdf"]}},
+            {"type": "application/pdf"},
+            {"size": {"$gte": 10}},
+        ]
+    }
+    assert strip_source(build_where({"source": "a.pdf", "page_max": 3})) == {"page": {"$lte": 3}}
+
+def test_source_index_add_remove():
+    index = SourceIndex()
+    index.add("a.txt", ["1", "2"])
+    index.add("b.txt", ["3"])
+    index.remove(["2", "3"])
+
+    assert index.candidates(["a.txt", "b.txt"]) == {"1"}
+
+def test_source_index_tracks_collection_version():
+    """İndeks yalnızca yansıttığı koleksiyon sürümünde güncel sayılmalı"""
+    index = SourceIndex()
+    assert not index.is_current(0)
+
+    index.ready, index.version = True, 3
+    assert index.is_current(3) and not index.is_current(None)
+
+    index.advance(3, 4)
+    assert index.is_current(4)
+    # Arada başka bir işçinin yazması (4 -> 5) varsa bu süreçteki yazma indeksi ilerletmez
+    index.advance(5, 6)
+    assert not index.is_current(6)
+
+def test_exact_search_matches_chroma(tmp_path):
+    """Yerel tam skorlama Chroma'nın filtreli aramasıyla aynı sonucu vermeli"""
+    random.seed(0)
+    vectorstore = Chroma(
+        persist_directory=str(tmp_path),
+        embedding_function=RandomEmbeddings(),
+        collection_name="test"
+    )
+    ids = [f"id-{i}" for i in range(60)]
+    metadatas = [{"source": f"doc-{i % 3}.txt", "page": i % 5} for i in range(60)]
+    vectorstore.add_texts([f"metin {i}" for i in range(60)], metadatas=metadatas, ids=ids)
+
+    index = SourceIndex()
+    index.load(vectorstore, version=2)
+    assert index.is_current(2)
+    assert len(index.candidates(["doc-1.txt"])) == 20
+
+    query = [random.random() for _ in range(8)]
+    where = build_where({"source": "doc-1.txt", "page_min": 2})
+    expected = vectorstore.similarity_search_by_vector_with_relevance_scores(query, k=4, filter=where)
+    found = exact_search(vectorstore, query, index.candidates(["doc-1.txt"]), 4, strip_source(where))
+
+    assert [text for text, _, _ in found] == [doc.page_content for doc, _ in expected]
+    assert all(meta["page"] >= 2 and meta["source"] == "doc-1.txt" for _, meta, _ in found)
@@ -0,0 +1,95 @@
+import asyncio
+from app.metrics import (
+    Counter, Histogram, MetricsRegistry, MetricsMiddleware, RESPONSE_BYTES, STAGE_SECONDS, server_timing, span, record,
+    _request_timings
+)
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests", "İstekler", ("endpoint",)))
+    requests.inc(endpoint="search")
+    requests.inc(2, endpoint='a"b')
+
+    text = registry.render()
+
+    assert "# HELP ai_tools_requests İstekler" in text
+    assert "# TYPE ai_tools_requests counter" in text
+    assert 'ai_tools_requests_total{endpoint="search"} 1' in text
+    assert 'ai_tools_requests_total{endpoint="a\\"b"} 2' in text
+    assert text.endswith("\n")
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Süre", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5, count=2)
+    histogram.observe(5.0)
+
+    samples = {(suffix, labels.get("le")): value for suffix, labels, value in histogram.samples()}
+
+    assert samples[("_bucket", "0.1")] == 1
+    assert samples[("_bucket", "1")] == 3
+    assert samples[("_bucket", "+Inf")] == 4
+    assert samples[("_count", None)] == 4
+    assert abs(samples[("_sum", None)] - 6.05) < 1e-9
+
+def test_collectors_are_read_at_render_time():
+    registry = MetricsRegistry()
+    depth = {"value": 0}
+
+    def collect():
+        gauge = Counter("queue_events", "Olaylar")
+        gauge.inc(depth["value"])
+        yield gauge
+
+    registry.add_collector(collect)
+    depth["value"] = 7
+
+    assert "ai_tools_queue_events_total 7" in registry.render()
+
+def test_span_records_stage_and_request_timing():
+    before = STAGE_SECONDS.count(stage="test.span")
+    timings = []
+    token = _request_timings.set(timings)
+    try:
+        with span("test.span") as stage:
+            pass
+        record("test.span", 0.002)
+    finally:
+        _request_timings.reset(token)
+
+    assert STAGE_SECONDS.count(stage="test.span") == before + 2
+    assert stage.seconds >= 0
+    assert [name for name, _ in timings] == ["test.span", "test.span"]
+    # İstek dışında ölçüm yalnızca histograma yazılır
+    record("test.span", 0.001)
+    assert len(timings) == 2
+
+def test_server_timing_merges_repeated_stages():
+    header = server_timing([("llm.math", 2.0), ("search.embed", 1.5), ("llm.math", 3.0)], 10.0)
+
+    assert header == "llm.math;dur=5.000, search.embed;dur=1.500, total;dur=10.000"
+
+def test_middleware_adds_server_timing_header():
+    async def endpoint_app(scope, receive, send):
+        with span("test.middleware"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        scope = {"type": "http", "method": "GET", "path": "/"}
+        await MetricsMiddleware(endpoint_app)(scope, None, send)
+
+    before = RESPONSE_BYTES.count(method="GET", endpoint="unmatched")
+    asyncio.run(run())
+
+    assert RESPONSE_BYTES.count(method="GET", endpoint="unmatched") == before + 1
+    headers = dict(sent[0]["headers"])
+    assert headers[b"server-timing"].startswith(b"test.middleware;dur=")
+    assert b"total;dur=" in headers[b"server-timing"]
+    assert sent[1]["body"] == b"ok"
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+from onnx import TensorProto, helper, numpy_helper
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from app.database.onnx_embeddings import MODEL_FILE, TOKENIZER_FILE, OnnxEmbeddings, quantize_model
+
+WORDS = ["yapay", "zeka", "belge", "arama", "model", "vektör", "search", "document", "the", "fast"]
+DIMENSION = 8
+
+def build_model(directory):
+    """Gather + MatMul'dan oluşan küçük bir kodlayıcı ve kelime tabanlı tokenizer üretir."""
+    vocab = {"[PAD]": 0, "[UNK]": 1, **{word: i + 2 for i, word in enumerate(WORDS)}}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(str(directory / TOKENIZER_FILE))
+
+    rng = np.random.default_rng(0)
+    table = rng.standard_normal((len(vocab), 64)).astype(np.float32)
+    weights = rng.standard_normal((64, DIMENSION)).astype(np.float32)
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["table", "input_ids"], ["embedded"]),
+            helper.make_node("MatMul", ["embedded", "weights"], ["last_hidden_state"]),
+        ],
+        "encoder",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"]),
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", DIMENSION])],
+        initializer=[numpy_helper.from_array(table, "table"), numpy_helper.from_array(weights, "weights")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 14)])
+    model.ir_version = 8
+    onnx.save(model, str(directory / MODEL_FILE))
+    return vocab, table @ weights
+
+def test_mean_pooling_matches_reference(tmp_path):
+    vocab, projected = build_model(tmp_path)
+    embeddings = OnnxEmbeddings(model_dir=str(tmp_path), quantized=False, intra_op_threads=1)
+
+    vector = embeddings.embed_query("yapay zeka arama")
+
+    expected = projected[[vocab["yapay"], vocab["zeka"], vocab["arama"]]].mean(axis=0)
+    assert np.allclose(vector, expected, atol=1e-5)
+
+def test_padding_does_not_change_vectors_or_order(tmp_path):
+    """Gruplama ve doldurma, metin tek başına kodlandığındaki sonucu değiştirmemeli"""
+    build_model(tmp_path)
+    embeddings = OnnxEmbeddings(model_dir=str(tmp_path), quantized=False, intra_op_threads=1, batch_size=2)
+    texts = ["yapay zeka belge arama model vektör", "the", "fast search document", "zeka"]
+
+    batched = embeddings.embed_documents(texts)
+
+    for text, vector in zip(texts, batched):
+        assert np.allclose(vector, embeddings.embed_query(text), atol=1e-5)
+
+def test_quantized_model_stays_close(tmp_path):
+    build_model(tmp_path)
+    quantize_model(str(tmp_path / MODEL_FILE), str(tmp_path / "model_quantized.onnx"))
+    full = OnnxEmbeddings(model_dir=str(tmp_path), quantized=False, intra_op_threads=1)
+    quantized = OnnxEmbeddings(model_dir=str(tmp_path), quantized=True, intra_op_threads=1)
+    texts = ["yapay zeka", "fast search document", "belge arama model"]
+
+    for a, b in zip(full.embed_documents(texts), quantized.embed_documents(texts)):
+        cosine = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+        assert cosine > 0.99
+
+def test_missing_model_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        OnnxEmbeddings(model_dir=str(tmp_path), quantized=True)
@@ -0,0 +1,33 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from app.ingestion.parallel import iter_pages_parallel, iter_document_pages
+from app.ingestion.pipeline import iter_pages
+from benchmarks.synthetic import make_pdf
+
+def write_pdf(tmp_path, pages):
+    path = tmp_path / "rapor.pdf"
+    path.write_bytes(make_pdf(pages, lines_per_page=5))
+    return str(path)
+
+def test_parallel_extraction_preserves_page_order(tmp_path):
+    """Paralel çıkarma seri çıkarmayla aynı sırayı üretmeli"""
+    path = write_pdf(tmp_path, 7)
+    with open(path, "rb") as f:
+        serial = list(iter_pages(f, path))
+
+    progress = {"pages": 0}
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parallel = list(iter_pages_parallel(path, 7, pool, pages_per_task=2, max_pending=2, progress=progress))
+
+    assert [number for number, _ in parallel] == list(range(1, 8))
+    assert parallel == serial
+    assert progress["pages"] == 7
+    assert all(text for _, text in parallel)
+
+def test_small_pdf_uses_serial_path(tmp_path):
+    """Eşiğin altındaki PDF'ler seri işlenmeli"""
+    path = write_pdf(tmp_path, 2)
+
+    pages = list(iter_document_pages(path, "rapor.pdf", threshold=100))
+
+    assert [number for number, _ in pages] == [1, 2]
@@ -0,0 +1,13 @@
+import io
+from app.ingestion.pipeline import iter_text_blocks, iter_batches
+
+def test_iter_text_blocks_does_not_split_words():
+    """Bloklar kelime ortasından bölünmemeli"""
+    text = "merhaba dünya " * 100 + "şğüçöı"
+    blocks = list(iter_text_blocks(io.BytesIO(text.encode("utf-8")), block_size=7))
+
+    assert "".join(blocks) == text
+    assert all(block.endswith(" ") for block in blocks[:-1])
+
+def test_iter_batches():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
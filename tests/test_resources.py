@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_importing_app_loads_no_resources(tmp_path):
+    """app.main içe aktarılırken model yüklenmemeli ve veri dizini açılmamalı"""
+    code = (
+        "import app.main, app.resources as r; "
+        "assert not any(r.loaded().values()), r.loaded(); "
+        "assert not r.is_ready()"
+    )
+    data_dir = tmp_path / "data"
+    env = {**os.environ, "CHROMA_PERSIST_DIRECTORY": str(data_dir), "PYTHONPATH": ROOT}
+
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=str(tmp_path), check=True)
+
+    assert not data_dir.exists()
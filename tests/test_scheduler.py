@@ -0,0 +1,223 @@
+import asyncio
+import random
+import time
+import pytest
+from langchain_core.prompts import PromptTemplate
+from app.config import LLM_MODEL
+from app.llm.fake import FakeLLMError, fake_backend
+from app.llm.registry import LLMRegistry
+from app.llm.scheduler import (
+    CLOSED, OPEN, PRIORITY_HIGH, PRIORITY_LOW, CircuitBreaker, CircuitOpenError, LLMScheduler,
+    LLMUnavailableError, QueueDeadlineError, SchedulerBusyError, is_retryable
+)
+from app.tools.math_operations import MathOperations
+
+def make_scheduler(**options):
+    defaults = dict(
+        max_concurrency=4, rate_per_minute=0, max_queue=100, queue_timeout=5, call_timeout=1,
+        max_retries=3, backoff_base=0.001, backoff_max=0.01, rng=random.Random(0)
+    )
+    return LLMScheduler(**{**defaults, **options})
+
+def test_retryable_errors():
+    assert is_retryable(FakeLLMError(429))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(FakeLLMError(400))
+    assert not is_retryable(ValueError("geçersiz çıktı"))
+    try:
+        raise RuntimeError("sarmalanmış") from FakeLLMError(503)
+    except RuntimeError as e:
+        assert is_retryable(e)
+
+def test_token_bucket_limits_rate():
+    scheduler = make_scheduler(rate_per_minute=600, burst=2)
+
+    async def run():
+        return await asyncio.gather(*(scheduler.submit(lambda: asyncio.sleep(0, "ok")) for _ in range(5)))
+
+    start = time.perf_counter()
+    assert asyncio.run(run()) == ["ok"] * 5
+    # 2 jeton hazır, kalan 3 çağrı saniyede 10 jetonla gelir
+    assert time.perf_counter() - start >= 0.25
+
+def test_priority_order_and_queue_bounds():
+    scheduler = make_scheduler(max_concurrency=1, max_queue=3)
+    order = []
+
+    def call(name, delay=0.0):
+        async def run():
+            await asyncio.sleep(delay)
+            order.append(name)
+        return run
+
+    async def run():
+        blocker = asyncio.ensure_future(scheduler.submit(call("blocker", 0.05)))
+        await asyncio.sleep(0)
+        low = asyncio.ensure_future(scheduler.submit(call("low"), PRIORITY_LOW))
+        high = asyncio.ensure_future(scheduler.submit(call("high"), PRIORITY_HIGH))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerBusyError):
+            await scheduler.submit(call("fazla"))
+        await asyncio.gather(blocker, low, high)
+
+    asyncio.run(run())
+
+    assert order == ["blocker", "high", "low"]
+    assert scheduler.stats["rejected"] == 1
+    assert scheduler.running == 0 and scheduler.waiting == 0
+
+def test_queue_deadline_drops_call_without_upstream():
+    scheduler = make_scheduler(max_concurrency=1)
+    calls = []
+
+    async def slow():
+        await asyncio.sleep(0.2)
+
+    async def record():
+        calls.append(1)
+
+    async def run():
+        blocker = asyncio.ensure_future(scheduler.submit(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueDeadlineError):
+            await scheduler.submit(record, queue_timeout=0.02)
+        await blocker
+
+    asyncio.run(run())
+
+    assert calls == []
+    assert scheduler.stats["expired"] == 1
+
+def test_transient_errors_are_retried():
+    registry = LLMRegistry(
+        fake_backend(responses=["5"], fail_first=2), rate_per_minute=0,
+        backoff_base=0.001, rng=random.Random(0)
+    )
+
+    assert asyncio.run(MathOperations(registry).solve_operation("beş")) == 5.0
+    scheduler = registry.scheduler(LLM_MODEL)
+    assert scheduler.stats["retries"] == 2
+    assert scheduler.breaker.state == CLOSED
+
+def test_timeout_exhausts_retries():
+    registry = LLMRegistry(
+        fake_backend(latency=0.2), rate_per_minute=0, call_timeout=0.02,
+        max_retries=1, backoff_base=0.001
+    )
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(MathOperations(registry).solve_operation("yavaş"))
+
+    scheduler = registry.scheduler(LLM_MODEL)
+    assert scheduler.stats["timeouts"] == 2
+    assert registry.get_llm(LLM_MODEL).calls == 2
+
+def test_non_retryable_error_is_not_retried():
+    scheduler = make_scheduler()
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise FakeLLMError(400)
+
+    with pytest.raises(FakeLLMError):
+        asyncio.run(scheduler.submit(bad_request))
+    assert attempts == [1]
+
+def test_circuit_breaker_fails_fast_and_recovers():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+    scheduler = make_scheduler(breaker=breaker, max_retries=0)
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        raise FakeLLMError(503)
+
+    async def healthy():
+        attempts.append(1)
+        return "ok"
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(LLMUnavailableError):
+                await scheduler.submit(failing)
+        assert breaker.state == OPEN
+        # Açık devre upstream'e gitmeden reddeder
+        with pytest.raises(CircuitOpenError):
+            await scheduler.submit(healthy)
+        assert len(attempts) == 3
+
+        now[0] = 11
+        assert await scheduler.submit(healthy) == "ok"
+
+    asyncio.run(run())
+
+    assert breaker.state == CLOSED
+    assert scheduler.stats["short_circuited"] == 1
+
+def test_half_open_allows_single_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 2
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+def test_flaky_fake_llm_under_load():
+    """Rastgele hata ve gecikme enjekte eden sahte LLM ile tüm çağrılar tamamlanmalı"""
+    registry = LLMRegistry(
+        fake_backend(responses=["3"], error_rate=0.2, latency=0.005, latency_jitter=0.01, seed=1),
+        max_concurrency=4, rate_per_minute=0, max_retries=5, backoff_base=0.001,
+        rng=random.Random(0)
+    )
+    math_ops = MathOperations(registry)
+
+    async def run():
+        return await asyncio.gather(*(math_ops.solve_operation(f"soru {i}") for i in range(40)))
+
+    assert asyncio.run(run()) == [3.0] * 40
+    llm = registry.get_llm(LLM_MODEL)
+    assert llm.errors > 0
+    assert llm.max_in_flight <= 4
+    assert registry.scheduler(LLM_MODEL).stats["retries"] == llm.errors
+
+def test_stream_retries_only_before_first_chunk():
+    scheduler = make_scheduler()
+    attempts = []
+
+    def flaky_stream(fail_after):
+        async def gen():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise FakeLLMError(503)
+            for i in range(3):
+                if i == fail_after:
+                    raise FakeLLMError(503)
+                yield i
+        return gen
+
+    async def collect(call):
+        return [item async for item in scheduler.stream(call)]
+
+    assert asyncio.run(collect(flaky_stream(None))) == [0, 1, 2]
+    assert len(attempts) == 2
+
+    attempts.clear()
+    attempts.append(1)
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(collect(flaky_stream(1)))
+    assert len(attempts) == 2
+    assert scheduler.running == 0
+
+def test_registry_stream_yields_text_chunks():
+    registry = LLMRegistry(fake_backend(responses=["bir iki üç"]), rate_per_minute=0)
+    chain = registry.chain("echo", PromptTemplate.from_template("{soru}"), model=LLM_MODEL)
+
+    async def run():
+        return [text async for text in chain.astream({"soru": "say"})]
+
+    assert asyncio.run(run()) == ["bir ", "iki ", "üç"]
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from app.llm.singleflight import SingleFlight
+
+def test_identical_calls_share_one_upstream():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"text": "42"}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("a", upstream) for _ in range(10)), flight.do("b", upstream))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert all(result == {"text": "42"} for result in results)
+    assert flight.stats == {"upstream": 2, "coalesced": 9}
+    assert flight.in_flight() == 0
+
+def test_error_reaches_all_waiters_and_is_not_cached():
+    flight = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("kota aşıldı")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("a", failing) for _ in range(3)), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flight.do("a", failing)
+        return results
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(attempts) == 2
+
+def test_cancelled_waiter_does_not_cancel_others():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "tamam"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("a", upstream))
+        second = asyncio.ensure_future(flight.do("a", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "tamam"
+
+def test_last_waiter_cancel_stops_upstream():
+    flight = SingleFlight()
+    state = {"cancelled": False, "calls": 0}
+
+    async def upstream():
+        state["calls"] += 1
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return "geç"
+
+    async def fast():
+        return "yeni"
+
+    async def run():
+        waiter = asyncio.ensure_future(flight.do("a", upstream))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # İptalden sonra gelen çağrı iptal edilen göreve katılmamalı
+        result = await flight.do("a", fast)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "yeni"
+    assert state == {"cancelled": True, "calls": 1}
+    assert flight.in_flight() == 0
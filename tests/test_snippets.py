@@ -0,0 +1,23 @@
+from app.tools.snippets import ELLIPSIS, make_snippet, query_pattern
+
+FILLER = " ".join(["dolgu kelime"] * 40)
+
+def test_snippet_centers_on_query_terms():
+    """Alıntı terimlerin en yoğun geçtiği yeri içermeli ve kelime ortasında kesilmemeli"""
+    text = f"{FILLER} Yapay zeka ve makine öğrenmesi burada. {FILLER}"
+
+    snippet = make_snippet(text, query_pattern("YAPAY zeka öğrenmesi"), 80)
+
+    assert "Yapay zeka ve makine öğrenmesi" in snippet
+    assert snippet.startswith(ELLIPSIS) and snippet.endswith(ELLIPSIS)
+    body = snippet.strip(ELLIPSIS)
+    assert len(body) <= 80
+    assert all(word in text.split() for word in body.split())
+
+def test_snippet_without_hits_returns_beginning():
+    snippet = make_snippet(FILLER, query_pattern("yok"), 50)
+
+    assert snippet.startswith("dolgu kelime") and snippet.endswith(ELLIPSIS)
+
+def test_short_text_is_returned_unchanged():
+    assert make_snippet("Kısa metin.", query_pattern("metin"), 50) == "Kısa metin."
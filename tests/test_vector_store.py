@@ -0,0 +1,151 @@
+from langchain_core.embeddings import Embeddings
+from app.database.vector_store import VectorStore, where_to_sql
+from app.ingestion.versioning import DocumentIndex
+from app.tools.vector_search import VectorSearchTool
+
+import numpy as np
+import pytest
+import threading
+
+class HashEmbeddings(Embeddings):
+    """Metinden deterministik rastgele vektör üretir."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(16).tolist()
+
+def brute_force(vectors, query, k):
+    matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = matrix @ (query / np.linalg.norm(query))
+    return list(np.argsort(-scores)[:k])
+
+def fill(store, count, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, 16)).astype(np.float32)
+    store.add(
+        ids=[f"id-{i}" for i in range(count)],
+        embeddings=vectors.tolist(),
+        documents=[f"parça {i}" for i in range(count)],
+        metadatas=[{"source": f"doc-{i % 3}.txt", "page": i} for i in range(count)]
+    )
+    return vectors
+
+def test_exact_search_matches_brute_force(tmp_path):
+    store = VectorStore(path=str(tmp_path))
+    vectors = fill(store, 200)
+    query = np.random.default_rng(1).standard_normal(16)
+
+    found = store.query([query.tolist()], n_results=5)
+
+    assert found["ids"][0] == [f"id-{i}" for i in brute_force(vectors, query, 5)]
+    assert found["distances"][0] == sorted(found["distances"][0])
+
+def test_batch_query_and_filters(tmp_path):
+    store = VectorStore(path=str(tmp_path))
+    fill(store, 60)
+    queries = np.random.default_rng(2).standard_normal((3, 16)).tolist()
+
+    found = store.query(queries, n_results=4, where={"$and": [{"source": "doc-1.txt"}, {"page": {"$lte": 30}}]})
+
+    assert len(found["ids"]) == 3
+    for metadatas in found["metadatas"]:
+        assert len(metadatas) == 4
+        assert all(m["source"] == "doc-1.txt" and m["page"] <= 30 for m in metadatas)
+
+def test_delete_uses_tombstones_and_persists(tmp_path):
+    store = VectorStore(path=str(tmp_path))
+    vectors = fill(store, 20)
+    best = store.query([vectors[7].tolist()], n_results=1)["ids"][0]
+    assert best == ["id-7"]
+
+    store.delete(ids=["id-7"])
+    store.close()
+    reopened = VectorStore(path=str(tmp_path))
+
+    assert reopened.count() == 19
+    assert "id-7" not in reopened.query([vectors[7].tolist()], n_results=5)["ids"][0]
+    assert reopened.get(ids=["id-3"], include=["metadatas"])["metadatas"] == [{"source": "doc-0.txt", "page": 3}]
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_storage_keeps_recall(tmp_path, dtype):
+    store = VectorStore(path=str(tmp_path), dtype=dtype)
+    vectors = fill(store, 500)
+    queries = np.random.default_rng(3).standard_normal((20, 16))
+
+    found = store.query(queries.tolist(), n_results=10)
+
+    recall = np.mean([
+        len(set(ids) & {f"id-{i}" for i in brute_force(vectors, query, 10)}) / 10
+        for ids, query in zip(found["ids"], queries)
+    ])
+    assert recall >= 0.9
+
+def test_dtype_mismatch_rejected(tmp_path):
+    fill(VectorStore(path=str(tmp_path)), 2)
+
+    with pytest.raises(ValueError):
+        VectorStore(path=str(tmp_path), dtype="int8")
+
+def test_where_to_sql():
+    clause, params = where_to_sql({"$and": [{"source": {"$in": ["a", "b"]}}, {"size": {"$gte": 10}}]})
+
+    assert "IN (?,?)" in clause and ">=" in clause
+    assert params == ['$."source"', "a", "b", '$."size"', 10]
+
+def test_document_index_and_search_tool(tmp_path):
+    """Versiyonlama ve arama aracı Chroma yerine bu depoyla da çalışmalı"""
+    store = VectorStore(embedding_function=HashEmbeddings(), path=str(tmp_path))
+    index = DocumentIndex(store)
+    existing, seen = set(index.chunks("a.txt")), set()
+    items = [(text, {"source": "a.txt", "doc_hash": "v1"}) for text in ["bir", "iki", "üç"]]
+
+    assert index.upsert("a.txt", items, existing, seen) == {"embedded": 3, "reused": 0}
+    assert index.is_current("a.txt", "v1")
+
+    results = VectorSearchTool(store).search("iki", n_results=1)
+    assert results[0]["content"] == "iki"
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+
+def test_search_while_adding(tmp_path):
+    """Arama sürerken eklenen satırlar, aramanın başta okuduğu satır sayısını bozmamalı"""
+    store = VectorStore(path=str(tmp_path), dtype="int8")
+    fill(store, 20000)
+    query = np.random.default_rng(3).standard_normal(16).tolist()
+    errors = []
+
+    def search():
+        try:
+            for _ in range(200):
+                assert len(store.query([query], n_results=3)["ids"][0]) == 3
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    rng = np.random.default_rng(4)
+    for batch in range(100):
+        store.add(
+            ids=[f"yeni-{batch}-{i}" for i in range(8)],
+            embeddings=rng.standard_normal((8, 16)).tolist(),
+            documents=["yeni"] * 8,
+            metadatas=[{"source": "yeni.txt"}] * 8
+        )
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+
+def test_ties_are_ordered_by_row(tmp_path):
+    """Eşit skorlu satırlar her k için aynı sırada gelmeli (cursor sayfaları örtüşmemeli)"""
+    store = VectorStore(path=str(tmp_path))
+    vector = np.random.default_rng(5).standard_normal(16).tolist()
+    store.add(ids=[f"id-{i}" for i in range(40)], embeddings=[vector] * 40, documents=["aynı"] * 40)
+
+    pages = [store.query([vector], n_results=k)["ids"][0] for k in (3, 5, 17, 40)]
+
+    for page in pages:
+        assert page == [f"id-{i}" for i in range(len(page))]
@@ -0,0 +1,94 @@
+from langchain_core.embeddings import Embeddings
+from langchain.vectorstores import Chroma
+from app.ingestion.versioning import DocumentIndex, SourceVersions, chunk_id
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+def ingest(index, source, texts, doc_hash):
+    index.begin_version(source)
+    existing = set(index.chunks(source))
+    seen = set()
+    items = [(text, {"source": source, "doc_hash": doc_hash, "chunk": i}) for i, text in enumerate(texts)]
+    counts = index.upsert(source, items, existing, seen)
+    counts["deleted"] = index.delete_stale(existing, seen)
+    index.commit_version(source, doc_hash)
+    return counts
+
+def make_index(tmp_path):
+    embeddings = CountingEmbeddings()
+    vectorstore = Chroma(
+        persist_directory=str(tmp_path),
+        embedding_function=embeddings,
+        collection_name="test"
+    )
+    return DocumentIndex(vectorstore), embeddings
+
+def test_chunk_ids_are_deterministic():
+    assert chunk_id("a.txt", "metin") == chunk_id("a.txt", "metin")
+    assert chunk_id("a.txt", "metin") != chunk_id("b.txt", "metin")
+
+def test_reupload_only_embeds_changed_chunks(tmp_path):
+    """Düzenlenmiş dökümanda yalnızca değişen parçalar vektörlenmeli"""
+    index, embeddings = make_index(tmp_path)
+
+    first = ingest(index, "rapor.txt", ["bir", "iki", "üç"], "v1")
+    assert first == {"embedded": 3, "reused": 0, "deleted": 0}
+    assert index.is_current("rapor.txt", "v1")
+
+    embeddings.embedded.clear()
+    second = ingest(index, "rapor.txt", ["bir", "iki", "dört"], "v2")
+
+    assert second == {"embedded": 1, "reused": 2, "deleted": 1}
+    assert embeddings.embedded == ["dört"]
+    assert index.is_current("rapor.txt", "v2")
+    assert not index.is_current("rapor.txt", "v1")
+    assert len(index.chunks("rapor.txt")) == 3
+
+def test_duplicate_chunks_stored_once(tmp_path):
+    """Döküman içinde tekrar eden parçalar bir kez saklanmalı"""
+    index, _ = make_index(tmp_path)
+
+    counts = ingest(index, "tekrar.txt", ["aynı", "aynı", "farklı"], "v1")
+
+    assert counts["embedded"] == 2
+    assert len(index.chunks("tekrar.txt")) == 2
+
+def test_empty_document_is_current(tmp_path):
+    """Parçası olmayan döküman da aynı özetle güncel sayılmalı"""
+    index, _ = make_index(tmp_path)
+
+    assert not index.is_current("bos.txt", "v1")
+    ingest(index, "bos.txt", [], "v1")
+
+    assert index.chunks("bos.txt") == {}
+    assert index.is_current("bos.txt", "v1")
+    assert not index.is_current("bos.txt", "v2")
+
+def test_interrupted_ingestion_is_not_current(tmp_path):
+    """Yarıda kalan işleme sonrası eski sürüm güncel sayılmamalı"""
+    index, _ = make_index(tmp_path)
+    ingest(index, "rapor.txt", ["bir"], "v1")
+
+    index.begin_version("rapor.txt")
+    index.upsert("rapor.txt", [("iki", {"source": "rapor.txt", "doc_hash": "v2"})], set(index.chunks("rapor.txt")), set())
+
+    assert not index.is_current("rapor.txt", "v1")
+    assert not index.is_current("rapor.txt", "v2")
+
+def test_source_versions_persist(tmp_path):
+    path = str(tmp_path / "sources.sqlite3")
+    versions = SourceVersions(path)
+    versions.set("a.txt", "v1")
+    versions.set("a.txt", "v2")
+    versions.close()
+
+    assert SourceVersions(path).get("a.txt") == "v2"